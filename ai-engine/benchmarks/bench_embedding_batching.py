@@ -0,0 +1,72 @@
+# ai-engine/benchmarks/bench_embedding_batching.py
+#
+# Mede round-trips ao provedor de embeddings usando o StubEmbeddingProvider
+# (sem rede, latência simulada):
+#   - upload em lote: generate_embeddings vs. uma chamada por documento
+#   - consultas concorrentes: EmbeddingCoalescer vs. chamadas individuais
+#
+# Uso:
+#   python ai-engine/benchmarks/bench_embedding_batching.py --docs 500 --threads 32
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "embeddings"))
+
+from embedding_provider import (  # noqa: E402
+    EmbeddingCoalescer,
+    StubEmbeddingProvider,
+    generate_embeddings,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--window-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    texts = [f"Documento {i}: política de follow-up e entregáveis " * 20 for i in range(args.docs)]
+
+    # Upload em lote
+    single = StubEmbeddingProvider(latency_ms=args.latency_ms)
+    start = time.perf_counter()
+    for text in texts:
+        single.embed([text])
+    single_s = time.perf_counter() - start
+
+    batched = StubEmbeddingProvider(latency_ms=args.latency_ms)
+    start = time.perf_counter()
+    generate_embeddings(texts, batched)
+    batched_s = time.perf_counter() - start
+
+    print(f"upload {args.docs} docs: {single.calls} chamadas/{single_s:.2f}s -> "
+          f"{batched.calls} chamadas/{batched_s:.2f}s")
+
+    # Consultas concorrentes
+    queries = [f"pergunta executiva {i}" for i in range(args.threads * 4)]
+
+    direct = StubEmbeddingProvider(latency_ms=args.latency_ms)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.threads) as pool:
+        list(pool.map(lambda q: direct.embed([q])[0], queries))
+    direct_s = time.perf_counter() - start
+
+    coalesced = StubEmbeddingProvider(latency_ms=args.latency_ms)
+    coalescer = EmbeddingCoalescer(coalesced, window_ms=args.window_ms)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.threads) as pool:
+        list(pool.map(coalescer.embed, queries))
+    coalesced_s = time.perf_counter() - start
+
+    print(f"{len(queries)} consultas/{args.threads} threads: {direct.calls} chamadas/{direct_s:.2f}s -> "
+          f"{coalesced.calls} chamadas/{coalesced_s:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
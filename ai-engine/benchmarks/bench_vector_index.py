@@ -0,0 +1,87 @@
+# ai-engine/benchmarks/bench_vector_index.py
+#
+# Benchmark da busca de embeddings:
+#   - legado: loop Python com np.array por documento (antigo search_relevant)
+#   - índice: matriz float32 pré-normalizada + argpartition (VectorIndex)
+#
+# Uso:
+#   python ai-engine/benchmarks/bench_vector_index.py --sizes 10000 100000 --dim 1536
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "embeddings"))
+
+from vector_index import VectorIndex  # noqa: E402
+
+
+def legacy_search(data, query_emb, top_k):
+    scored = []
+    for doc in data:
+        emb = np.array(doc["embedding"])
+        score = float(np.dot(query_emb, emb) / (np.linalg.norm(query_emb) * np.linalg.norm(emb)))
+        scored.append((score, doc))
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return [d for _, d in scored[:top_k]]
+
+
+def timeit(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--legacy-max", type=int, default=10_000,
+                        help="tamanho máximo em que o loop legado é medido")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+
+    print(f"{'docs':>8} {'dim':>5} {'build ms':>10} {'index ms':>10} {'legacy ms':>10} {'speedup':>8}")
+    for size in args.sizes:
+        vectors = rng.standard_normal((size, args.dim), dtype=np.float32)
+        query = rng.standard_normal(args.dim, dtype=np.float32)
+
+        start = time.perf_counter()
+        index = VectorIndex(dim=args.dim)
+        index._matrix = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        index._size = size
+        index.docs = [{"id": f"doc_{i}", "title": "", "content": ""} for i in range(size)]
+        build_ms = (time.perf_counter() - start) * 1000
+
+        index_ms = timeit(lambda: index.search(query, args.top_k), args.repeat)
+
+        legacy_ms = None
+        if size <= args.legacy_max:
+            data = [
+                {"id": f"doc_{i}", "embedding": vectors[i].tolist()}
+                for i in range(size)
+            ]
+            legacy_ms = timeit(lambda: legacy_search(data, query, args.top_k), 1)
+
+            expected = [d["id"] for d in legacy_search(data, query, args.top_k)]
+            got = [d["id"] for _, d in index.search(query, args.top_k)]
+            assert expected == got, (expected, got)
+
+        print(
+            f"{size:>8} {args.dim:>5} {build_ms:>10.1f} {index_ms:>10.2f} "
+            f"{(f'{legacy_ms:.1f}' if legacy_ms else '-'):>10} "
+            f"{(f'{legacy_ms / index_ms:.0f}x' if legacy_ms else '-'):>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+import os
+
+import numpy as np
+
+try:
+    from .vector_index import VectorIndex, normalize_rows
+except ImportError:
+    from vector_index import VectorIndex, normalize_rows
+
+# Modo do índice: "exact" (varredura completa) ou "ivf" (aproximado)
+INDEX_MODE = os.getenv("EMBED_INDEX", "exact")
+IVF_MIN_DOCS = int(os.getenv("EMBED_IVF_MIN_DOCS", "20000"))
+IVF_NLIST = int(os.getenv("EMBED_IVF_NLIST", "0"))      # 0 = ~sqrt(N)
+# nprobe fixo (0 = fração das listas). Medido com bench_ann_index.py
+# (100k docs, dim 384, nlist 316), recall@10: nprobe 32 -> 0.86,
+# 64 -> 0.93, 96 -> 0.97 (2.7x mais rápido que o exato), 128 -> 0.98.
+# A fração padrão (0.3 das listas) mira recall@10 >= 0.95.
+IVF_NPROBE = int(os.getenv("EMBED_IVF_NPROBE", "0"))
+IVF_PROBE_FRACTION = float(os.getenv("EMBED_IVF_PROBE_FRACTION", "0.3"))
+
+_ASSIGN_BLOCK = 8192
+
+
+# --------------------------------------------------
+# K-means esférico (cosseno) para os centróides
+# --------------------------------------------------
+def assign(matrix, centroids):
+    """Centróide mais próximo de cada linha, em blocos (limita memória)."""
+    labels = np.empty(len(matrix), dtype=np.int64)
+    for start in range(0, len(matrix), _ASSIGN_BLOCK):
+        block = np.asarray(matrix[start:start + _ASSIGN_BLOCK])
+        labels[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return labels
+
+
+def train_kmeans(matrix, nlist, iterations=10, sample_size=None, seed=42):
+    rng = np.random.default_rng(seed)
+    n = len(matrix)
+    sample_size = min(n, sample_size or nlist * 32)
+    sample = np.asarray(matrix[np.sort(rng.choice(n, sample_size, replace=False))])
+
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        labels = assign(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, sample)
+        empty = ~sums.any(axis=1)
+        if empty.any():
+            # Centróide sem pontos: reinicia em um ponto aleatório
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()), replace=False)]
+        centroids = normalize_rows(sums)
+    return centroids
+
+
+# --------------------------------------------------
+# Índice IVF (inverted file)
+# --------------------------------------------------
+class IVFIndex:
+    """
+    Índice aproximado: os vetores são agrupados em `nlist` listas pelo
+    centróide mais próximo e a busca só varre as `nprobe` listas mais
+    próximas da consulta. `nprobe` é o botão recall x latência
+    (nprobe = nlist equivale à busca exata; 0 = IVF_PROBE_FRACTION das listas).
+
+    Se as listas sondadas não têm `top_k` candidatos (filtro seletivo ou
+    listas pequenas), a busca vira exata sobre as listas que contêm os
+    documentos permitidos.
+    """
+
+    def __init__(self, centroids, nprobe=IVF_NPROBE):
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.dim = self.centroids.shape[1]
+        nlist = len(self.centroids)
+        self.nprobe = nprobe or max(1, int(np.ceil(nlist * IVF_PROBE_FRACTION)))
+        self.docs = []
+        self._ids = [np.empty(0, dtype=np.int64) for _ in range(nlist)]
+        self._vectors = [np.empty((0, self.dim), dtype=np.float32) for _ in range(nlist)]
+        self._sizes = np.zeros(nlist, dtype=np.int64)
+        self._list_of = np.empty(0, dtype=np.int64)  # documento -> lista
+
+    def __len__(self):
+        return len(self.docs)
+
+    @property
+    def nlist(self):
+        return len(self.centroids)
+
+    @classmethod
+    def from_vector_index(cls, index, nlist=None, nprobe=IVF_NPROBE):
+        """Treina os centróides sobre a matriz (normalizada) do índice exato."""
+        matrix = index.matrix
+        n = len(matrix)
+        nlist = min(n, nlist or max(1, int(np.sqrt(n))))
+        ivf = cls(train_kmeans(matrix, nlist), nprobe=nprobe)
+        ivf.docs = list(index.docs)
+
+        labels = assign(matrix, ivf.centroids)
+        order = np.argsort(labels, kind="stable")
+        bounds = np.searchsorted(labels[order], np.arange(nlist + 1))
+        ivf._list_of = labels
+        for l in range(nlist):
+            ids = order[bounds[l]:bounds[l + 1]]
+            ivf._ids[l] = ids
+            ivf._vectors[l] = np.asarray(matrix[ids], dtype=np.float32)
+            ivf._sizes[l] = len(ids)
+        return ivf
+
+    def add(self, doc, embedding):
+        """Inserção incremental: vai para a lista do centróide mais próximo."""
+        vector = normalize_rows(embedding)
+        if vector.shape[-1] != self.dim:
+            raise ValueError(
+                f"Dimensão do embedding ({vector.shape[-1]}) difere do índice ({self.dim})"
+            )
+
+        l = int(np.argmax(self.centroids @ vector))
+        size = self._sizes[l]
+        if size >= len(self._ids[l]):
+            capacity = max(16, size * 2)
+            ids = np.empty(capacity, dtype=np.int64)
+            vectors = np.empty((capacity, self.dim), dtype=np.float32)
+            ids[:size] = self._ids[l][:size]
+            vectors[:size] = self._vectors[l][:size]
+            self._ids[l], self._vectors[l] = ids, vectors
+
+        n = len(self.docs)
+        if n >= len(self._list_of):
+            list_of = np.empty(max(16, n * 2), dtype=np.int64)
+            list_of[:n] = self._list_of[:n]
+            self._list_of = list_of
+        self._list_of[n] = l
+
+        self._ids[l][size] = n
+        self._vectors[l][size] = vector
+        self._sizes[l] = size + 1
+        self.docs.append({k: v for k, v in doc.items() if k != "embedding"})
+
+    def search(self, query_embedding, top_k=3, nprobe=None, rows=None):
+        """
+        Retorna [(score, doc)] das `nprobe` listas mais próximas.
+        `rows` restringe aos documentos permitidos pelos filtros.
+        """
+        if not self.docs or top_k <= 0:
+            return []
+
+        query = normalize_rows(query_embedding)
+        if query.shape[-1] != self.dim:
+            return []
+
+        n = len(self.docs)
+        allowed = None
+        if rows is not None:
+            allowed = np.zeros(n, dtype=bool)
+            rows = np.asarray(rows, dtype=np.int64)
+            allowed[rows[rows < n]] = True
+            if not allowed.any():
+                return []
+
+        nprobe = min(self.nlist, nprobe or self.nprobe)
+        centroid_scores = self.centroids @ query
+        if nprobe < self.nlist:
+            probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        else:
+            probe = np.arange(self.nlist)
+
+        ids, scores = self._scan(probe, query, allowed)
+        candidates = n if allowed is None else int(allowed.sum())
+        if len(ids) < min(top_k, candidates):
+            # Poucos candidatos nas listas sondadas: exato sobre as listas
+            # que têm documentos permitidos
+            lists = np.arange(self.nlist) if allowed is None else np.unique(self._list_of[:n][allowed])
+            ids, scores = self._scan(lists, query, allowed)
+        if not len(ids):
+            return []
+
+        k = min(top_k, len(ids))
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(ids) else np.arange(len(ids))
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        return [(float(scores[i]), self.docs[ids[i]]) for i in top]
+
+    def _scan(self, lists, query, allowed=None):
+        """(ids, scores) dos documentos das listas, restritos a `allowed`."""
+        ids, scores = [], []
+        for l in lists:
+            size = self._sizes[l]
+            if not size:
+                continue
+            list_ids = self._ids[l][:size]
+            vectors = self._vectors[l][:size]
+            if allowed is not None:
+                keep = allowed[list_ids]
+                if not keep.any():
+                    continue
+                list_ids, vectors = list_ids[keep], vectors[keep]
+            ids.append(list_ids)
+            scores.append(vectors @ query)
+        if not ids:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        return np.concatenate(ids), np.concatenate(scores)
+
+
+def build_index(index: VectorIndex):
+    """Aplica EMBED_INDEX: IVF só compensa acima de EMBED_IVF_MIN_DOCS."""
+    if INDEX_MODE == "ivf" and len(index) >= IVF_MIN_DOCS:
+        return IVFIndex.from_vector_index(index, nlist=IVF_NLIST or None)
+    return index
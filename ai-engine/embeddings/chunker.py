@@ -0,0 +1,155 @@
+import hashlib
+import os
+import re
+
+import numpy as np
+
+try:
+    from .embedding_provider import estimate_tokens
+except ImportError:
+    from embedding_provider import estimate_tokens
+
+# Tamanho dos trechos e sobreposição entre trechos vizinhos (em tokens)
+CHUNK_TOKENS = int(os.getenv("EMBED_CHUNK_TOKENS", "512"))
+CHUNK_OVERLAP = int(os.getenv("EMBED_CHUNK_OVERLAP", "64"))
+
+_units = re.compile(r"(?<=[.!?;:])\s+|\n\s*\n")
+
+
+# --------------------------------------------------
+# Divisão em trechos
+# --------------------------------------------------
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.strip().encode("utf-8")).hexdigest()
+
+
+def _split_long(unit: str, max_tokens: int):
+    """Unidade maior que o limite (parágrafo sem pontuação): corta por palavras."""
+    piece, piece_tokens = [], 0
+    for word in unit.split():
+        tokens = estimate_tokens(word + " ")
+        if piece and piece_tokens + tokens > max_tokens:
+            yield " ".join(piece)
+            piece, piece_tokens = [], 0
+        piece.append(word)
+        piece_tokens += tokens
+    if piece:
+        yield " ".join(piece)
+
+
+def split_text(text: str, max_tokens: int = CHUNK_TOKENS, overlap: int = CHUNK_OVERLAP):
+    """
+    Empacota frases/parágrafos em trechos de até `max_tokens`. Cada trecho
+    começa com as últimas frases do anterior (até `overlap` tokens), para
+    que uma ideia cortada na fronteira apareça inteira em algum trecho.
+    """
+    units = []
+    for unit in _units.split(text or ""):
+        unit = unit.strip()
+        if not unit:
+            continue
+        tokens = estimate_tokens(unit)
+        if tokens > max_tokens:
+            units.extend((p, estimate_tokens(p)) for p in _split_long(unit, max_tokens))
+        else:
+            units.append((unit, tokens))
+
+    chunks, current, current_tokens = [], [], 0
+    for unit, tokens in units:
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(" ".join(u for u, _ in current))
+
+            # Sobreposição: reaproveita o final do trecho anterior
+            carried, carried_tokens = [], 0
+            for u, t in reversed(current):
+                if carried_tokens + t > overlap or carried_tokens + t + tokens > max_tokens:
+                    break
+                carried.insert(0, (u, t))
+                carried_tokens += t
+            current, current_tokens = carried, carried_tokens
+
+        current.append((unit, tokens))
+        current_tokens += tokens
+
+    if current:
+        chunks.append(" ".join(u for u, _ in current))
+    return chunks
+
+
+def chunk_document(doc_id: str, title: str, content: str,
+                   max_tokens: int = CHUNK_TOKENS, overlap: int = CHUNK_OVERLAP):
+    """
+    Trechos do documento com id estável "<doc_id>#<n>" e hash do conteúdo.
+    O mesmo texto gera sempre os mesmos ids e hashes.
+    """
+    return [
+        {
+            "id": f"{doc_id}#{n}",
+            "parent_id": doc_id,
+            "chunk": n,
+            "title": title,
+            "content": text,
+            "hash": content_hash(text),
+        }
+        for n, text in enumerate(split_text(content, max_tokens, overlap))
+    ]
+
+
+# --------------------------------------------------
+# Catálogo de versões (store append-only)
+# --------------------------------------------------
+class ChunkCatalog:
+    """
+    Sobre as linhas de um índice: qual revisão de cada documento está
+    valendo (o store é append-only, reindexar um documento alterado grava
+    uma revisão nova) e qual linha já tem o vetor de cada hash.
+
+    Documentos legados (sem parent_id/rev) contam como revisão única
+    cujo id é o próprio documento; a linha mais recente vale.
+    """
+
+    def __init__(self, docs=()):
+        self._revisions = {}   # parent_id -> (rev, [linhas], [hashes])
+        self._hashes = {}      # hash -> linha
+        self._superseded = 0
+        self._live = None
+        self.register(docs, start=0)
+
+    def register(self, docs, start: int):
+        for row, doc in enumerate(docs, start):
+            parent = doc.get("parent_id") or doc.get("id")
+            rev = doc.get("rev", row)
+            current = self._revisions.get(parent)
+
+            if current is None or rev > current[0]:
+                if current is not None:
+                    self._superseded += len(current[1])
+                self._revisions[parent] = (rev, [row], [doc.get("hash")])
+            elif rev == current[0]:
+                current[1].append(row)
+                current[2].append(doc.get("hash"))
+            else:
+                self._superseded += 1
+
+            if doc.get("hash"):
+                self._hashes[doc["hash"]] = row
+        self._live = None
+
+    def unchanged(self, parent_id: str, chunks) -> bool:
+        """True se a revisão atual tem exatamente os mesmos trechos."""
+        current = self._revisions.get(parent_id)
+        return current is not None and current[2] == [c["hash"] for c in chunks]
+
+    def row_for_hash(self, digest: str):
+        return self._hashes.get(digest)
+
+    def live_rows(self):
+        """Linhas das revisões atuais; None quando nada foi substituído."""
+        if not self._superseded:
+            return None
+        if self._live is None:
+            self._live = np.array(
+                sorted(row for _, rows, _ in self._revisions.values() for row in rows),
+                dtype=np.int64,
+            )
+        return self._live
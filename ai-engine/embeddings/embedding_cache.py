@@ -0,0 +1,199 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+
+# Caminho relativo é resolvido a partir desta pasta (não do CWD do processo);
+# EMBED_CACHE_PATH="" desliga o nível em disco
+_CACHE_FILE = os.getenv("EMBED_CACHE_PATH", "query_cache.sqlite3")
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), _CACHE_FILE) if _CACHE_FILE else ""
+CACHE_MEMORY_ITEMS = int(os.getenv("EMBED_CACHE_MEMORY_ITEMS", "2048"))
+CACHE_DISK_ITEMS = int(os.getenv("EMBED_CACHE_DISK_ITEMS", "100000"))
+# last_used no disco só é atualizado se mais velho que isso, e em lote
+CACHE_TOUCH_SECONDS = float(os.getenv("EMBED_CACHE_TOUCH_SECONDS", "600"))
+CACHE_TOUCH_BATCH = int(os.getenv("EMBED_CACHE_TOUCH_BATCH", "64"))
+
+_spaces = re.compile(r"\s+")
+
+
+# --------------------------------------------------
+# Chave
+# --------------------------------------------------
+def normalize_text(text: str) -> str:
+    """NFC + minúsculas + espaços colapsados: variações triviais batem no cache."""
+    text = unicodedata.normalize("NFC", text or "")
+    return _spaces.sub(" ", text).strip().lower()
+
+
+def cache_key(model: str, text: str) -> str:
+    digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    return f"{model}:{digest}"
+
+
+# --------------------------------------------------
+# Cache em dois níveis: LRU em memória + SQLite em disco
+# --------------------------------------------------
+class EmbeddingCache:
+    """
+    Cache de embeddings de consulta. O nível em memória é um LRU limitado
+    por quantidade; o nível em disco (SQLite) sobrevive a restarts e é
+    compartilhado entre workers, com despejo dos menos usados.
+
+    Hit no disco não escreve na hora: o last_used só é renovado quando
+    passou de `touch_seconds`, acumulado e gravado em lote (no próximo
+    put, ao juntar `touch_batch` chaves ou antes do despejo).
+    """
+
+    def __init__(self, path: str = CACHE_PATH, max_memory_items: int = CACHE_MEMORY_ITEMS,
+                 max_disk_items: int = CACHE_DISK_ITEMS, touch_seconds: float = CACHE_TOUCH_SECONDS,
+                 touch_batch: int = CACHE_TOUCH_BATCH):
+        self.path = path
+        self.max_memory_items = max_memory_items
+        self.max_disk_items = max_disk_items
+        self.touch_seconds = touch_seconds
+        self.touch_batch = touch_batch
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._disk_count = 0
+        self._touched = {}  # key -> last_used ainda não gravado
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS query_embeddings ("
+                " key TEXT PRIMARY KEY,"
+                " vector BLOB NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_query_embeddings_last_used"
+                " ON query_embeddings(last_used)"
+            )
+            self._conn.commit()
+            self._disk_count = self._conn.execute(
+                "SELECT COUNT(*) FROM query_embeddings"
+            ).fetchone()[0]
+
+    def get(self, model: str, text: str):
+        key = cache_key(model, text)
+
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return vector
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT vector, last_used FROM query_embeddings WHERE key = ?", (key,)
+                ).fetchone()
+                if row:
+                    now = time.time()
+                    if now - row[1] >= self.touch_seconds:
+                        self._touched[key] = now
+                        if len(self._touched) >= self.touch_batch:
+                            self._flush_touched()
+                            self._conn.commit()
+                    vector = np.frombuffer(row[0], dtype=np.float32)
+                    self._remember(key, vector)
+                    self.disk_hits += 1
+                    return vector
+
+            self.misses += 1
+            return None
+
+    def put(self, model: str, text: str, vector):
+        key = cache_key(model, text)
+        vector = np.asarray(vector, dtype=np.float32)
+
+        with self._lock:
+            self._remember(key, vector)
+
+            if self._conn is not None:
+                cursor = self._conn.execute(
+                    "INSERT OR REPLACE INTO query_embeddings (key, vector, last_used)"
+                    " VALUES (?, ?, ?)",
+                    (key, vector.tobytes(), time.time()),
+                )
+                self._disk_count += cursor.rowcount
+                self._touched.pop(key, None)
+                self._flush_touched()
+                if self._disk_count > self.max_disk_items:
+                    self._evict_disk()
+                self._conn.commit()
+
+    def _flush_touched(self):
+        """Grava os last_used pendentes (o commit fica com quem chamou)."""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE query_embeddings SET last_used = ? WHERE key = ?",
+                [(used, key) for key, used in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def flush(self):
+        with self._lock:
+            if self._conn is not None and self._touched:
+                self._flush_touched()
+                self._conn.commit()
+
+    def _remember(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+            self.memory_evictions += 1
+
+    def _evict_disk(self):
+        # Remove ~10% a mais que o excesso para não despejar a cada insert
+        self._disk_count = self._conn.execute(
+            "SELECT COUNT(*) FROM query_embeddings"
+        ).fetchone()[0]
+        excess = self._disk_count - int(self.max_disk_items * 0.9)
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM query_embeddings WHERE key IN ("
+                " SELECT key FROM query_embeddings ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+            self._disk_count -= excess
+            self.disk_evictions += excess
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "memory_evictions": self.memory_evictions,
+            "disk_evictions": self.disk_evictions,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "memory_items": len(self._memory),
+            "disk_items": self._disk_count,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM query_embeddings")
+                self._conn.commit()
+                self._disk_count = 0
@@ -1,11 +1,70 @@
 import json
 import os
+import time
+import weakref
 import numpy as np
-from  openai import OpenAI
 
-client = OpenAI()
+try:
+    from .vector_index import VectorIndex, get_index, touch_index, invalidate_index
+    from .ann_index import build_index
+    from .vector_store import EmbeddingStore
+    from .embedding_provider import get_provider, EmbeddingCoalescer
+    from .embedding_provider import generate_embeddings as _generate_batched
+    from .embedding_cache import EmbeddingCache
+    from .chunker import ChunkCatalog, chunk_document
+except ImportError:
+    from vector_index import VectorIndex, get_index, touch_index, invalidate_index
+    from ann_index import build_index
+    from vector_store import EmbeddingStore
+    from embedding_provider import get_provider, EmbeddingCoalescer
+    from embedding_provider import generate_embeddings as _generate_batched
+    from embedding_cache import EmbeddingCache
+    from chunker import ChunkCatalog, chunk_document
 
-EMBED_PATH = "ai-engine/embeddings/document_embeddings.json"
+# Provedor de embeddings (EMBED_PROVIDER=openai|stub) + micro-batching
+provider = get_provider()
+coalescer = EmbeddingCoalescer(provider)
+
+# Cache de embeddings de consulta (LRU + SQLite); EMBED_CACHE_PATH="" desliga o disco
+query_cache = EmbeddingCache()
+
+# Arquivos relativos a esta pasta (funciona com o processo rodando de
+# qualquer diretório: raiz do repo ou backend/)
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+EMBED_PATH = os.path.join(_HERE, "document_embeddings.json")
+
+# "binary" (store append-only + mmap) ou "json" (arquivo legado)
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "binary")
+STORE_PATH = os.path.join(_HERE, os.getenv("EMBED_STORE_PATH", "document_store"))
+
+store = EmbeddingStore(STORE_PATH)
+
+# --------------------------------------------------
+# Store binário (migra o JSON legado na primeira carga)
+# --------------------------------------------------
+def _get_store():
+    if not store.exists() and os.path.exists(EMBED_PATH):
+        count = store.import_json(EMBED_PATH, only_if_empty=True)
+        if count:
+            print(f"[Embeddings] {count} documentos migrados de {EMBED_PATH} para {STORE_PATH}")
+    return store
+
+# Catálogo de revisões/hashes por índice carregado (some junto com o índice)
+_catalogs = weakref.WeakKeyDictionary()
+
+def _get_catalog(index):
+    catalog = _catalogs.get(index)
+    if catalog is None:
+        catalog = _catalogs[index] = ChunkCatalog(index.docs)
+    return catalog
+
+def _get_index():
+    # EMBED_INDEX=ivf troca a busca exata pelo índice aproximado (ann_index)
+    if EMBED_BACKEND == "json":
+        return get_index(EMBED_PATH, lambda: build_index(VectorIndex.from_records(load_embeddings())))
+    _get_store()
+    return get_index(store.meta_path, lambda: build_index(store.load_index()))
 
 # --------------------------------------------------
 # Carregar embeddings
@@ -24,50 +83,132 @@ def save_embeddings(data):
         json.dump(data, f, indent=2, ensure_ascii=False)
 
 # --------------------------------------------------
-# Gerar embedding com OpenAI
+# Gerar embeddings
 # --------------------------------------------------
 def generate_embedding(text: str):
-    response = client.embeddings.create(
-        model="text-embedding-3-small",
-        input=text
-    )
-    return response.data[0].embedding
+    # Chamadas concorrentes de requests diferentes viram um único lote
+    return coalescer.embed(text)
+
+def generate_embeddings(texts: list[str]):
+    # Lotes limitados por orçamento de tokens (uma chamada por lote)
+    return _generate_batched(texts, provider)
+
+def embed_query(query: str):
+    # Perguntas repetidas pelos agentes não voltam à API
+    vector = query_cache.get(provider.model, query)
+    if vector is None:
+        vector = generate_embedding(query)
+        query_cache.put(provider.model, query, vector)
+    return vector
+
+def cache_stats():
+    return query_cache.stats()
 
 # --------------------------------------------------
 # Adicionar um novo documento à base
 # --------------------------------------------------
 def add_document(doc_id: str, title: str, content: str):
-    data = load_embeddings()
+    result = add_documents([{"id": doc_id, "title": title, "content": content}])
+    return {"status": "ok", "id": doc_id, "chunks": result["chunks"], "embedded": result["embedded"]}
+
+# --------------------------------------------------
+# Adicionar vários documentos (upload em lote)
+# --------------------------------------------------
+def add_documents(docs: list[dict]):
+    """
+    docs: [{"id", "title", "content"}]. Cada documento vira trechos
+    (chunker) e só os trechos com hash desconhecido vão para a API:
+    reindexar um documento sem mudanças não gera nenhuma chamada.
+    """
+    if not docs:
+        return {"status": "ok", "ids": [], "chunks": 0, "embedded": 0}
+
+    index = _get_index()
+    catalog = _get_catalog(index)
+    matrix = getattr(index, "matrix", None)  # IVFIndex não expõe a matriz
 
-    embedding = generate_embedding(content)
+    records, pending, changed = [], {}, set()
+    for d in docs:
+        chunks = chunk_document(d["id"], d.get("title"), d["content"])
+        if not chunks or catalog.unchanged(d["id"], chunks):
+            continue
 
-    data.append({
-        "id": doc_id,
-        "title": title,
-        "content": content,
-        "embedding": embedding
-    })
+        changed.add(d["id"])
+        rev = time.time_ns()
+        for chunk in chunks:
+            chunk["rev"] = rev
+            row = catalog.row_for_hash(chunk["hash"])
+            if row is not None and matrix is not None:
+                chunk["embedding"] = np.asarray(matrix[row], dtype=np.float32)
+            else:
+                # Trechos repetidos no lote também geram um só embedding
+                pending.setdefault(chunk["hash"], []).append(chunk)
+            records.append(chunk)
 
+    if pending:
+        embeddings = generate_embeddings([group[0]["content"] for group in pending.values()])
+        for group, embedding in zip(pending.values(), embeddings):
+            for chunk in group:
+                chunk["embedding"] = embedding
+
+    if records:
+        if EMBED_BACKEND == "json":
+            _save_records_json(records, changed)
+        else:
+            _append_records_binary(index, catalog, records)
+
+    return {
+        "status": "ok",
+        "ids": [d["id"] for d in docs],
+        "chunks": len(records),
+        "embedded": len(pending),
+    }
+
+def _save_records_json(records, changed):
+    # O JSON é reescrito inteiro: revisões antigas saem do arquivo
+    data = [
+        r for r in load_embeddings()
+        if (r.get("parent_id") or r.get("id")) not in changed
+    ]
+    data.extend(
+        dict(r, embedding=np.asarray(r["embedding"], dtype=float).tolist())
+        for r in records
+    )
     save_embeddings(data)
+    invalidate_index(EMBED_PATH)
+
+def _append_records_binary(index, catalog, records):
+    # Append O(trechos): vetores no .f32 e uma linha por trecho no sidecar
+    offsets = store.append_many(records)
 
-    return {"status": "ok", "id": doc_id}
+    # Mantém o índice do processo em dia sem reler o arquivo
+    try:
+        if len(index) == offsets[0]:
+            for record in records:
+                index.add(record, record["embedding"])
+            catalog.register([{k: v for k, v in r.items() if k != "embedding"} for r in records],
+                             start=offsets[0])
+            touch_index(store.meta_path, index)
+        else:
+            invalidate_index(store.meta_path)
+    except ValueError:
+        invalidate_index(store.meta_path)
 
 # --------------------------------------------------
 # Buscar documentos relevantes
 # --------------------------------------------------
 def search_relevant(query: str, top_k=3):
-    data = load_embeddings()
-    if not data:
+    # Índice carregado uma vez por processo (recarrega se o arquivo mudar)
+    index = _get_index()
+    if not len(index):
         return []
 
-    query_emb = np.array(generate_embedding(query))
-
-    scored = []
-    for doc in data:
-        emb = np.array(doc["embedding"])
-        score = float(np.dot(query_emb, emb) / (np.linalg.norm(query_emb) * np.linalg.norm(emb)))
-        scored.append((score, doc))
+    query_emb = np.asarray(embed_query(query), dtype=np.float32)
 
-    scored.sort(key=lambda x: x[0], reverse=True)
+    # Revisões antigas de documentos reindexados ficam fora da busca
+    live = _get_catalog(index).live_rows()
 
-    return [d for _, d in scored[:top_k]]
+    return [
+        dict(doc, score=score)
+        for score, doc in index.search(query_emb, top_k=top_k, rows=live)
+    ]
@@ -0,0 +1,220 @@
+import hashlib
+import os
+import threading
+import time
+
+import numpy as np
+
+EMBED_MODEL = os.getenv("EMBED_MODEL", "text-embedding-3-small")
+
+# Endpoint de embeddings (mesma base do gateway de LLM do backend)
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+EMBED_TIMEOUT_SECONDS = float(os.getenv("EMBED_TIMEOUT_SECONDS", "30"))
+EMBED_MAX_RETRIES = int(os.getenv("EMBED_MAX_RETRIES", "3"))
+
+# Limites da API de embeddings (por requisição)
+MAX_BATCH_TOKENS = int(os.getenv("EMBED_MAX_BATCH_TOKENS", "200000"))
+MAX_BATCH_SIZE = int(os.getenv("EMBED_MAX_BATCH_SIZE", "2048"))
+
+# Janela do micro-batching de chamadas concorrentes
+COALESCE_WINDOW_MS = float(os.getenv("EMBED_COALESCE_WINDOW_MS", "5"))
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _encoding = None
+
+
+# --------------------------------------------------
+# Contagem de tokens
+# --------------------------------------------------
+def estimate_tokens(text: str) -> int:
+    """Conta tokens com tiktoken se instalado; senão ~4 caracteres/token."""
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return len(text) // 4 + 1
+
+
+# --------------------------------------------------
+# Provedores
+# --------------------------------------------------
+class OpenAIEmbeddingProvider:
+    """
+    Provedor real: um POST /embeddings por lote via httpx (cliente com
+    conexões keep-alive; não depende da versão do SDK openai instalada).
+    429/5xx e falhas de rede são repetidos com backoff.
+    """
+
+    def __init__(self, model: str = EMBED_MODEL, api_key: str = None,
+                 base_url: str = OPENAI_BASE_URL, timeout: float = EMBED_TIMEOUT_SECONDS,
+                 max_retries: int = EMBED_MAX_RETRIES):
+        self.model = model
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            import httpx
+            with self._lock:
+                if self._client is None:
+                    self._client = httpx.Client(
+                        base_url=self.base_url,
+                        headers={"Authorization": f"Bearer {self.api_key}"},
+                        timeout=self.timeout,
+                    )
+        return self._client
+
+    def embed(self, texts):
+        import httpx
+
+        payload = {"model": self.model, "input": list(texts)}
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.client.post("/embeddings", json=payload)
+            except (httpx.TimeoutException, httpx.TransportError):
+                if attempt >= self.max_retries:
+                    raise
+            else:
+                if response.status_code != 429 and response.status_code < 500:
+                    response.raise_for_status()
+                    data = sorted(response.json()["data"], key=lambda d: d["index"])
+                    return [d["embedding"] for d in data]
+                if attempt >= self.max_retries:
+                    response.raise_for_status()
+            time.sleep(min(8.0, 0.5 * 2 ** attempt))
+
+
+class StubEmbeddingProvider:
+    """
+    Provedor local e determinístico (sem rede) para testes e desenvolvimento.
+    Conta chamadas e textos recebidos para medir o batching.
+    """
+
+    def __init__(self, dim: int = 64, model: str = "stub", latency_ms: float = 0):
+        self.dim = dim
+        self.model = model
+        self.latency_ms = latency_ms
+        self.calls = 0
+        self.texts_embedded = 0
+        self._lock = threading.Lock()
+
+    def embed(self, texts):
+        with self._lock:
+            self.calls += 1
+            self.texts_embedded += len(texts)
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+        vectors = []
+        for text in texts:
+            seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+            vectors.append(np.random.default_rng(seed).standard_normal(self.dim).tolist())
+        return vectors
+
+
+def get_provider():
+    """EMBED_PROVIDER=openai (padrão) ou stub."""
+    if os.getenv("EMBED_PROVIDER", "openai") == "stub":
+        return StubEmbeddingProvider(dim=int(os.getenv("EMBED_STUB_DIM", "64")))
+    return OpenAIEmbeddingProvider()
+
+
+# --------------------------------------------------
+# Geração em lote
+# --------------------------------------------------
+def iter_batches(texts, max_tokens: int = MAX_BATCH_TOKENS, max_size: int = MAX_BATCH_SIZE):
+    """Agrupa índices de `texts` em lotes que respeitam o orçamento de tokens."""
+    batch, batch_tokens = [], 0
+    for i, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if batch and (batch_tokens + tokens > max_tokens or len(batch) >= max_size):
+            yield batch
+            batch, batch_tokens = [], 0
+        batch.append(i)
+        batch_tokens += tokens
+    if batch:
+        yield batch
+
+
+def generate_embeddings(texts, provider, max_tokens: int = MAX_BATCH_TOKENS,
+                        max_size: int = MAX_BATCH_SIZE):
+    """Gera embeddings para vários textos com o mínimo de chamadas; mantém a ordem."""
+    texts = list(texts)
+    results = [None] * len(texts)
+    for batch in iter_batches(texts, max_tokens, max_size):
+        vectors = provider.embed([texts[i] for i in batch])
+        for i, vector in zip(batch, vectors):
+            results[i] = vector
+    return results
+
+
+# --------------------------------------------------
+# Micro-batching de chamadas concorrentes
+# --------------------------------------------------
+class _Pending:
+    __slots__ = ("text", "done", "result", "error")
+
+    def __init__(self, text):
+        self.text = text
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class EmbeddingCoalescer:
+    """
+    Junta chamadas `embed(text)` de threads diferentes (requests paralelas)
+    que chegam dentro de `window_ms` em uma única chamada ao provedor.
+    A primeira thread da janela vira "líder": espera a janela, envia o lote
+    e entrega o resultado às demais.
+    """
+
+    def __init__(self, provider, window_ms: float = COALESCE_WINDOW_MS,
+                 max_size: int = MAX_BATCH_SIZE):
+        self.provider = provider
+        self.window = window_ms / 1000
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._pending = []
+        self._batch_full = threading.Event()
+
+    def embed(self, text: str):
+        request = _Pending(text)
+
+        with self._lock:
+            self._pending.append(request)
+            leader = len(self._pending) == 1
+            if len(self._pending) >= self.max_size:
+                self._batch_full.set()
+
+        if leader:
+            if self.window > 0:
+                self._batch_full.wait(self.window)
+            self._flush()
+
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+            self._batch_full.clear()
+
+        try:
+            vectors = generate_embeddings([r.text for r in batch], self.provider)
+            for request, vector in zip(batch, vectors):
+                request.result = vector
+        except Exception as e:
+            for request in batch:
+                request.error = e
+        finally:
+            for request in batch:
+                request.done.set()
@@ -0,0 +1,180 @@
+import os
+import threading
+import numpy as np
+
+# --------------------------------------------------
+# Normalização
+# --------------------------------------------------
+def normalize_rows(matrix):
+    """Normaliza as linhas (norma L2) em float32; linhas nulas ficam zeradas."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+# --------------------------------------------------
+# Índice vetorial exato (cosseno)
+# --------------------------------------------------
+class VectorIndex:
+    """
+    Índice em memória: matriz float32 contígua com linhas pré-normalizadas.
+    Uma busca é um único produto matriz-vetor + argpartition para o top-k.
+    """
+
+    def __init__(self, dim=None, capacity=0):
+        self.dim = dim
+        self.docs = []
+        self._size = 0
+        self._matrix = (
+            np.empty((capacity, dim), dtype=np.float32) if dim else None
+        )
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def matrix(self):
+        if self._matrix is None:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        return self._matrix[:self._size]
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Monta o índice a partir dos registros do JSON
+        ({id, title, content, embedding}). Registros com dimensão
+        diferente da maioria são descartados.
+        """
+        records = [r for r in records if r.get("embedding")]
+        if not records:
+            return cls()
+
+        dims = [len(r["embedding"]) for r in records]
+        dim = max(set(dims), key=dims.count)
+        records = [r for r, d in zip(records, dims) if d == dim]
+
+        index = cls(dim=dim)
+        index._matrix = normalize_rows([r["embedding"] for r in records])
+        index._size = len(records)
+        index.docs = [
+            {k: v for k, v in r.items() if k != "embedding"} for r in records
+        ]
+        return index
+
+    @classmethod
+    def from_matrix(cls, matrix, docs):
+        """
+        Usa uma matriz já normalizada (ex.: np.memmap do store binário)
+        sem copiá-la; a cópia só acontece no primeiro `add`.
+        """
+        index = cls(dim=matrix.shape[1] if matrix.ndim == 2 and matrix.shape[1] else None)
+        index._matrix = matrix
+        index._size = len(docs)
+        index.docs = [{k: v for k, v in d.items() if k != "offset"} for d in docs]
+        return index
+
+    def add(self, doc, embedding):
+        """Acrescenta um documento (O(1) amortizado, capacidade dobra)."""
+        vector = normalize_rows(embedding)
+        if self.dim is None:
+            self.dim = vector.shape[-1]
+        if vector.shape[-1] != self.dim:
+            raise ValueError(
+                f"Dimensão do embedding ({vector.shape[-1]}) difere do índice ({self.dim})"
+            )
+
+        if self._matrix is None or self._size >= self._matrix.shape[0]:
+            capacity = max(16, self._size * 2)
+            grown = np.empty((capacity, self.dim), dtype=np.float32)
+            if self._size:
+                grown[:self._size] = self._matrix[:self._size]
+            self._matrix = grown
+
+        self._matrix[self._size] = vector
+        self.docs.append({k: v for k, v in doc.items() if k != "embedding"})
+        self._size += 1
+
+    def search(self, query_embedding, top_k=3, rows=None):
+        """
+        Retorna [(score, doc)] ordenado por similaridade de cosseno.
+        `rows` (posições das linhas) restringe a busca a um subconjunto:
+        filtros aplicados antes, só as linhas permitidas são pontuadas.
+        """
+        if not self._size or top_k <= 0:
+            return []
+
+        query = normalize_rows(query_embedding)
+        if query.shape[-1] != self.dim:
+            return []
+
+        if rows is None:
+            candidates = None
+            scores = self.matrix @ query
+        else:
+            candidates = np.asarray(rows, dtype=np.int64)
+            candidates = candidates[candidates < self._size]
+            if not len(candidates):
+                return []
+            scores = self.matrix[candidates] @ query
+
+        n = len(scores)
+        k = min(top_k, n)
+        if k < n:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(n)
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        if candidates is None:
+            return [(float(scores[i]), self.docs[i]) for i in top]
+        return [(float(scores[i]), self.docs[candidates[i]]) for i in top]
+
+
+# --------------------------------------------------
+# Cache de processo (invalidado pelo mtime do arquivo)
+# --------------------------------------------------
+_lock = threading.Lock()
+_cache = {}
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def get_index(path, loader):
+    """
+    Retorna o índice do arquivo `path`, carregado uma única vez por processo.
+    `loader()` só é chamado quando o mtime do arquivo muda e pode devolver
+    registros do JSON ou um índice pronto (VectorIndex/IVFIndex).
+    """
+    mtime = _mtime(path)
+    with _lock:
+        cached = _cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        if mtime is None:
+            index = VectorIndex()
+        else:
+            loaded = loader()
+            index = VectorIndex.from_records(loaded) if isinstance(loaded, list) else loaded
+        _cache[path] = (mtime, index)
+        return index
+
+
+def touch_index(path, index):
+    """Registra o mtime atual após uma escrita feita por este processo."""
+    with _lock:
+        _cache[path] = (_mtime(path), index)
+
+
+def invalidate_index(path=None):
+    with _lock:
+        if path is None:
+            _cache.clear()
+        else:
+            _cache.pop(path, None)
@@ -0,0 +1,252 @@
+import json
+import os
+import sys
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: só o lock entre threads
+    fcntl = None
+
+try:
+    from .vector_index import VectorIndex, normalize_rows
+except ImportError:
+    from vector_index import VectorIndex, normalize_rows
+
+DTYPE = np.float32
+
+_BASE_FIELDS = {"id", "title", "offset", "content", "embedding"}
+
+
+# --------------------------------------------------
+# Store binário append-only
+# --------------------------------------------------
+class EmbeddingStore:
+    """
+    Armazenamento append-only de embeddings:
+      <base>.f32         vetores float32 crus (já normalizados), um por linha
+      <base>.meta.jsonl  sidecar com {id, title, offset, content} por linha
+      <base>.header.json dimensão e dtype
+
+    Inserir custa O(1) (escreve só o novo vetor e uma linha de metadados)
+    e a carga é um mmap sem cópia do arquivo de vetores.
+    """
+
+    def __init__(self, base_path: str):
+        self.base_path = base_path
+        self.vectors_path = base_path + ".f32"
+        self.meta_path = base_path + ".meta.jsonl"
+        self.header_path = base_path + ".header.json"
+        self.lock_path = base_path + ".lock"
+        self._thread_lock = threading.Lock()
+
+    # --------------------------------------------------
+    # Lock entre threads e processos
+    # --------------------------------------------------
+    @contextmanager
+    def _locked(self):
+        with self._thread_lock:
+            os.makedirs(os.path.dirname(self.lock_path) or ".", exist_ok=True)
+            with open(self.lock_path, "a") as lock_file:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.header_path)
+
+    @property
+    def dim(self):
+        if not self.exists():
+            return None
+        with open(self.header_path, "r", encoding="utf-8") as f:
+            return json.load(f)["dim"]
+
+    def mtime(self):
+        try:
+            return os.stat(self.meta_path).st_mtime_ns
+        except OSError:
+            return None
+
+    # --------------------------------------------------
+    # Escrita
+    # --------------------------------------------------
+    def append(self, doc_id: str, title: str, content: str, embedding) -> int:
+        """Acrescenta um documento e retorna a linha (offset) do vetor."""
+        return self.append_many([{
+            "id": doc_id,
+            "title": title,
+            "content": content,
+            "embedding": embedding,
+        }])[0]
+
+    def append_many(self, records) -> list:
+        """Acrescenta vários documentos com um único lock e um único fsync."""
+        if not records:
+            return []
+
+        with self._locked():
+            return self._append_unlocked(records)
+
+    def _append_unlocked(self, records) -> list:
+        vectors = normalize_rows([r["embedding"] for r in records])
+
+        dim = self.dim
+        if dim is None:
+            dim = vectors.shape[1]
+            self._write_header(dim)
+        if vectors.shape[1] != dim:
+            raise ValueError(
+                f"Dimensão do embedding ({vectors.shape[1]}) difere do store ({dim}); "
+                "reexporte/reimporte a base com o novo modelo"
+            )
+
+        row_bytes = dim * np.dtype(DTYPE).itemsize
+
+        with open(self.vectors_path, "ab") as vf:
+            size = os.fstat(vf.fileno()).st_size
+            start = size // row_bytes
+            if size % row_bytes:
+                # Escrita anterior interrompida no meio de uma linha
+                vf.truncate(start * row_bytes)
+            vf.write(np.ascontiguousarray(vectors, dtype=DTYPE).tobytes())
+            vf.flush()
+            os.fsync(vf.fileno())
+
+        offsets = list(range(start, start + len(records)))
+
+        # O sidecar é o "commit": só linhas com metadados são visíveis.
+        # Campos extras do registro (parent_id, chunk, hash, rev) vão junto.
+        lines = "".join(
+            json.dumps({
+                "id": r["id"],
+                "title": r.get("title"),
+                "offset": offset,
+                "content": r.get("content"),
+                **{k: v for k, v in r.items() if k not in _BASE_FIELDS},
+            }, ensure_ascii=False) + "\n"
+            for r, offset in zip(records, offsets)
+        )
+        with open(self.meta_path, "ab+") as mf:
+            if mf.tell():
+                # Linha anterior truncada: fecha-a para não "colar" nesta
+                mf.seek(-1, os.SEEK_END)
+                if mf.read(1) != b"\n":
+                    lines = "\n" + lines
+            mf.write(lines.encode("utf-8"))
+            mf.flush()
+            os.fsync(mf.fileno())
+
+        return offsets
+
+    def _write_header(self, dim: int):
+        tmp = self.header_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"dim": dim, "dtype": "float32"}, f)
+        os.replace(tmp, self.header_path)
+
+    # --------------------------------------------------
+    # Leitura
+    # --------------------------------------------------
+    def load(self):
+        """Retorna (matriz mmap [linhas, dim], metadados válidos)."""
+        dim = self.dim
+        if dim is None:
+            return np.empty((0, 0), dtype=DTYPE), []
+
+        row_bytes = dim * np.dtype(DTYPE).itemsize
+        size = os.path.getsize(self.vectors_path) if os.path.exists(self.vectors_path) else 0
+        rows = size // row_bytes
+
+        matrix = (
+            np.memmap(self.vectors_path, dtype=DTYPE, mode="r", shape=(rows, dim))
+            if rows else np.empty((0, dim), dtype=DTYPE)
+        )
+
+        docs = []
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        meta = json.loads(line)
+                    except ValueError:
+                        continue  # linha final incompleta
+                    if meta.get("offset", rows) < rows:
+                        docs.append(meta)
+
+        return matrix, docs
+
+    def load_index(self) -> VectorIndex:
+        matrix, docs = self.load()
+        offsets = [d["offset"] for d in docs]
+        if offsets != list(range(len(docs))):
+            # Há linhas órfãs: seleciona só as confirmadas (copia)
+            matrix = np.asarray(matrix[offsets]) if offsets else matrix[:0]
+        else:
+            matrix = matrix[:len(docs)]
+        return VectorIndex.from_matrix(matrix, docs)
+
+    # --------------------------------------------------
+    # Importação / exportação do JSON legado
+    # --------------------------------------------------
+    def import_json(self, json_path: str, only_if_empty: bool = False) -> int:
+        """
+        Importa document_embeddings.json; retorna quantos docs entraram.
+        Com `only_if_empty`, não faz nada se o store já existir (migração).
+        """
+        with open(json_path, "r", encoding="utf-8") as f:
+            records = [r for r in json.load(f) if r.get("embedding")]
+
+        with self._locked():
+            if only_if_empty and self.exists():
+                return 0
+            if not records:
+                return 0
+
+            dim = self.dim
+            if dim is None:
+                dims = [len(r["embedding"]) for r in records]
+                dim = max(set(dims), key=dims.count)
+            records = [r for r in records if len(r["embedding"]) == dim]
+
+            self._append_unlocked(records)
+            return len(records)
+
+    def export_json(self, json_path: str) -> int:
+        """Exporta para o formato JSON legado (vetores normalizados)."""
+        matrix, docs = self.load()
+        data = [
+            {
+                **{k: v for k, v in d.items() if k != "offset"},
+                "embedding": matrix[d["offset"]].tolist(),
+            }
+            for d in docs
+        ]
+        tmp = json_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, json_path)
+        return len(data)
+
+
+# --------------------------------------------------
+# CLI: python vector_store.py import|export <json> <base>
+# --------------------------------------------------
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] not in ("import", "export"):
+        print("Uso: python vector_store.py import|export <arquivo.json> <base_do_store>")
+        sys.exit(1)
+
+    command, json_file, base = sys.argv[1:]
+    store = EmbeddingStore(base)
+    if command == "import":
+        print(f"✅ {store.import_json(json_file)} documentos importados para {base}")
+    else:
+        print(f"✅ {store.export_json(json_file)} documentos exportados para {json_file}")
@@ -1,7 +1,7 @@
+import asyncio
 import os
 import sys
 from pathlib import Path
-from openai import OpenAI
 
 # Add parent directory to path to resolve imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -12,14 +12,14 @@ except ImportError:
     # Fallback if import fails
     from backend.ai_engine.embeddings.embedding_loader import search_relevant
 
+from core.llm.gateway import llm
 
-class CEOAgent: pass
 
-client = OpenAI()
+class CEOAgent: pass
 
-def run_ceo_agent(question: str):
-    # Buscando contexto
-    docs = search_relevant(question)
+async def run_ceo_agent(question: str):
+    # Buscando contexto (embedding + busca fora do event loop)
+    docs = await asyncio.to_thread(search_relevant, question)
 
     context = "\n\n".join(
         [f"[Documento: {d['title']}]\n{d['content']}" for d in docs]
@@ -40,7 +40,7 @@ Contexto relevante:
 {context}
 """
 
-    response = client.chat.completions.create(
+    response = await llm.chat(
         model="gpt-4o",
         messages=[
             {"role": "system", "content": system_prompt},
@@ -48,4 +48,4 @@ Contexto relevante:
         ]
     )
 
-    return response.choices[0].message["content"]
+    return response.content
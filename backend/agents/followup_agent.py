@@ -1,12 +1,12 @@
 class FollowUpAgent: pass
+import asyncio
 import os
-from openai import OpenAI
 from ai_engine.embeddings.embedding_loader import search_relevant
 
-client = OpenAI()
+from core.llm.gateway import llm
 
-def generate_followup(task: str, responsible: str):
-    docs = search_relevant(task)
+async def generate_followup(task: str, responsible: str):
+    docs = await asyncio.to_thread(search_relevant, task)
     context = "\n".join([d["content"] for d in docs])
 
     system_prompt = f"""
@@ -30,7 +30,7 @@ Tarefa: {task}
 Responsável: {responsible}
 """
 
-    response = client.chat.completions.create(
+    response = await llm.chat(
         model="gpt-4o-mini",
         messages=[
             {"role": "system", "content": system_prompt},
@@ -38,4 +38,4 @@ Responsável: {responsible}
         ]
     )
 
-    return response.choices[0].message["content"]
+    return response.content
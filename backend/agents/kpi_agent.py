@@ -1,14 +1,14 @@
+import asyncio
 import os
-from openai import OpenAI
 from ai_engine.embeddings.embedding_loader import search_relevant
 
+from core.llm.gateway import llm
 
-class KPIAgent: pass
 
-client = OpenAI()
+class KPIAgent: pass
 
-def analyze_kpi(text: str):
-    docs = search_relevant(text)
+async def analyze_kpi(text: str):
+    docs = await asyncio.to_thread(search_relevant, text)
     context = "\n".join([d["content"] for d in docs])
 
     system_prompt = f"""
@@ -24,7 +24,7 @@ Contexto relevante:
 {context}
 """
 
-    response = client.chat.completions.create(
+    response = await llm.chat(
         model="gpt-4o-mini",
         messages=[
             {"role": "system", "content": system_prompt},
@@ -32,4 +32,4 @@ Contexto relevante:
         ]
     )
 
-    return response.choices[0].message["content"]
+    return response.content
@@ -1,13 +1,13 @@
 class MeetingAgent: pass
 
+import asyncio
 import os
-from openai import OpenAI
 from ai_engine.embeddings.embedding_loader import search_relevant
 
-client = OpenAI()
+from core.llm.gateway import llm
 
-def summarize_meeting(notes: str):
-    docs = search_relevant(notes)
+async def summarize_meeting(notes: str):
+    docs = await asyncio.to_thread(search_relevant, notes)
     context = "\n".join([d["content"] for d in docs])
 
     system_prompt = f"""
@@ -26,7 +26,7 @@ Contexto relevante:
 
     user_prompt = f"Notas da reunião:\n{notes}"
 
-    response = client.chat.completions.create(
+    response = await llm.chat(
         model="gpt-4o-mini",
         messages=[
             {"role": "system", "content": system_prompt},
@@ -34,4 +34,4 @@ Contexto relevante:
         ]
     )
 
-    return response.choices[0].message["content"]
+    return response.content
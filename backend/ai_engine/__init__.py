@@ -0,0 +1,13 @@
+# backend/ai_engine/__init__.py
+#
+# Pacote `ai_engine`: o código fica em <repo>/ai-engine (o hífen impede o
+# import direto). Este é o único lugar que liga os dois; os subpacotes
+# (ai_engine.embeddings...) são resolvidos dentro de ai-engine/.
+
+import os
+
+AI_ENGINE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "ai-engine"
+)
+
+__path__.append(AI_ENGINE_DIR)
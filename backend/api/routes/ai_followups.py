@@ -10,8 +10,9 @@ from ...middleware.auth import require_any_auth
 
 # 🔹 EVENTOS / MEMÓRIA
 from core.events.activity_log import ActivityEvent
-from db.repositories.activity_log_repository import ActivityLogRepository
+from core.events.log_writer import activity_log_writer
 from db.session import get_db  # usa sua session padrão
+from core.llm.gateway import llm
 
 router = APIRouter(prefix="/ai/followups", tags=["AI FollowUps"])
 
@@ -72,12 +73,8 @@ Equipe MAWDSLEYS
         else:
             try:
                 from agents.followup_agent import generate_followup as ai_generate
-                followup_text = ai_generate(data.task, data.responsible)
+                followup_text = await ai_generate(data.task, data.responsible)
             except ImportError:
-                import openai
-
-                client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
                 system_prompt = f"""
 Você é um assistente que gera follow-ups profissionais.
 Tom: {data.tone}
@@ -89,7 +86,7 @@ Tarefa: {data.task}
 Responsável: {data.responsible}
 """
 
-                completion = client.chat.completions.create(
+                completion = await llm.chat(
                     model="gpt-4o-mini",
                     messages=[
                         {"role": "system", "content": system_prompt},
@@ -97,7 +94,7 @@ Responsável: {data.responsible}
                     ]
                 )
 
-                followup_text = completion.choices[0].message.content
+                followup_text = completion.content
 
             generated_by = "gpt-4o-mini"
 
@@ -118,8 +115,7 @@ Responsável: {data.responsible}
             }
         )
 
-        repo = ActivityLogRepository(db)
-        await repo.save(event)
+        activity_log_writer.enqueue(event)
 
         # ============================
         # RESPOSTA FINAL
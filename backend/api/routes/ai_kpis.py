@@ -6,6 +6,7 @@ import os
 from  datetime import datetime
 
 from middleware.auth import require_any_auth
+from core.llm.gateway import llm
 
 router = APIRouter(prefix="/ai/kpis", tags=["AI KPIs"])
 
@@ -68,13 +69,9 @@ Recomenda-se definir metas claras e acompanhar o progresso semanalmente.
         # IA real
         try:
             from agents.kpi_agent import analyze_kpi as ai_analyze
-            response = ai_analyze(data.kpi_data)
+            response = await ai_analyze(data.kpi_data)
         except ImportError:
             # Fallback
-            import openai
-            
-            client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-            
             system_prompt = """
 Você é um analista especializado em KPIs corporativos.
 Analise o KPI fornecido e forneça insights sobre performance, riscos e recomendações.
@@ -88,7 +85,7 @@ Timeframe: {data.timeframe}
 Metrics: {data.metrics}
 """
             
-            completion = client.chat.completions.create(
+            completion = await llm.chat(
                 model="gpt-3.5-turbo",
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -97,7 +94,7 @@ Metrics: {data.metrics}
                 max_tokens=800
             )
             
-            response = completion.choices[0].message.content
+            response = completion.content
         
         # Extrair nível de risco da resposta (simplificado)
         risk_level = "medium"
@@ -20,12 +20,14 @@ def get_alerts(
         .all()
     )
 
+    # O id do alerta vem no payload (activity_logs não tem entity_id);
+    # alertas antigos, sem ele, usam o id da linha
     return [
         {
-            "id": a.entity_id,
-            "level": a.payload.get("level"),
-            "title": a.payload.get("title"),
-            "description": a.payload.get("description"),
+            "id": (a.payload or {}).get("alert_id") or str(a.id),
+            "level": (a.payload or {}).get("level"),
+            "title": (a.payload or {}).get("title"),
+            "description": (a.payload or {}).get("description"),
             "timestamp": a.timestamp.isoformat()
         }
         for a in alerts
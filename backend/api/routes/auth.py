@@ -1,6 +1,6 @@
 # backend/api/routes/auth.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, EmailStr
 from sqlalchemy.orm import Session
@@ -8,6 +8,7 @@ from typing import Optional, Dict, Any
 
 from database.session import get_db
 from services.auth_service import register_user
+from security.auth_cache import auth_cache
 from security.jwt import create_access_token, decode_access_token
 from security.password import verify_password
 
@@ -39,12 +40,14 @@ class TokenResponse(BaseModel):
 # DEPENDENCY / MIDDLEWARE
 # ==========================
 async def require_any_auth(
+    request: Request,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
     db: Session = Depends(get_db)
 ) -> Dict[str, Any]:
     """
     Dependency para rotas que requerem autenticação.
-    Valida o token JWT e retorna o usuário autenticado.
+    Valida o token JWT e retorna o usuário autenticado
+    (também em request.state.auth). Tokens já vistos vêm do auth_cache.
     """
     if credentials is None:
         raise HTTPException(
@@ -55,9 +58,19 @@ async def require_any_auth(
 
     token = credentials.credentials
 
+    # Token já visto: sem decodificar o JWT e sem ir ao banco
+    found, auth, error = auth_cache.get(token)
+    if found:
+        if auth is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=error)
+        auth["token"] = token
+        request.state.auth = auth
+        return auth
+
     try:
         payload = decode_access_token(token)
         if payload is None:
+            auth_cache.put_negative(token, "Token inválido ou expirado")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token inválido ou expirado"
@@ -69,24 +82,31 @@ async def require_any_auth(
         user = db.query(User).filter(User.id == user_id).first()
 
         if not user:
+            auth_cache.put_negative(token, "Usuário não encontrado", user_id)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Usuário não encontrado"
             )
 
         if hasattr(user, "is_active") and not user.is_active:
+            auth_cache.put_negative(token, "Usuário inativo", user.id)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Usuário inativo"
             )
 
-        return {
+        auth = {
             "authenticated": True,
             "user_id": user.id,
             "user_email": user.email,
             "user_name": user.name,
             "token": token
         }
+        auth_cache.put(token, auth, exp=payload.get("exp"))
+
+        # Fica no scope ASGI: o ActivityLogMiddleware reaproveita sem decodificar o JWT de novo
+        request.state.auth = auth
+        return auth
 
     except HTTPException:
         raise
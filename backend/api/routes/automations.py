@@ -1,16 +1,17 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from sqlalchemy.sql import func
 
 from database.session import get_db
 from api.routes.auth import require_any_auth
 
-from db.repositories.kpi_repository import KPIRepository
+from db.repositories.meeting_stats_repository import MeetingStatsRepository
 from db.repositories.activity_log_repository import ActivityLogRepository
 from core.events.activity_log import ActivityEvent
-from db.models.activity_log import ActivityLog
 
 
+# Chave do alerta semanal no payload (deduplicação por usuário/semana)
+WEEKLY_RULE = "weekly_no_meetings"
+
 router = APIRouter(
     prefix="/api/v1/automations",
     tags=["Automations"]
@@ -29,43 +30,33 @@ def check_weekly_meetings(db: Session = Depends(get_db)):
     SEM duplicar alertas
     """
 
-    kpi_repo = KPIRepository(db)
     activity_repo = ActivityLogRepository(db)
 
-    results = kpi_repo.weekly_meetings_by_user()
-
-    alerts_created = []
-
-    for row in results:
-
-        # 🔒 EVITA ALERTA DUPLICADO NA SEMANA
-        already_exists = (
-            db.query(ActivityLog)
-            .filter(
-                ActivityLog.type == "alert",
-                ActivityLog.action == "created",
-                ActivityLog.entity == f"user:{row.user_id}",
-                ActivityLog.details == "Usuário sem reuniões registradas na semana atual",
-                ActivityLog.created_at >= func.date_trunc("week", func.now())
-            )
-            .first()
+    # 🔒 EVITA ALERTA DUPLICADO NA SEMANA
+    # (uma consulta: meeting_weekly_stats + alertas já emitidos, todos os usuários)
+    user_ids = MeetingStatsRepository(db).users_without_meetings(WEEKLY_RULE)
+
+    # 🔴 REGRA DE NEGÓCIO
+    alerts = [
+        ActivityEvent(
+            type="alert.created",
+            entity="user",
+            entity_id=str(user_id),
+            actor="system",
+            payload={
+                "rule": WEEKLY_RULE,
+                "level": "warning",
+                "user_id": f"user_{user_id}",
+                "title": "Semana sem reuniões",
+                "description": "Usuário sem reuniões registradas na semana atual"
+            }
         )
+        for user_id in user_ids
+    ]
 
-        if already_exists:
-            continue
-
-        # 🔴 REGRA DE NEGÓCIO
-        if row.total_meetings == 0:
-            event = ActivityEvent(
-                type="alert",
-                action="created",
-                entity=f"user:{row.user_id}",
-                user_id=row.user_id,
-                details="Usuário sem reuniões registradas na semana atual"
-            )
-
-            activity_repo.log(event)
-            alerts_created.append(row.user_id)
+    # Grava já (não pelo writer): a próxima chamada precisa enxergar
+    activity_repo.insert_many(alerts)
+    alerts_created = [int(event.entity_id) for event in alerts]
 
     return {
         "status": "ok",
@@ -6,6 +6,7 @@ import os
 from  datetime import datetime
 
 from middleware.auth import require_any_auth
+from core.llm.gateway import llm
 
 router = APIRouter(prefix="/ceo", tags=["CEO Agent"])
 
@@ -40,7 +41,7 @@ async def ask_ceo(
         # Tentar importar o agente CEO
         try:
             from agents.ceo_agent import run_ceo_agent
-            response = run_ceo_agent(data.question)
+            response = await run_ceo_agent(data.question)
             
             return {
                 "reply": response,
@@ -51,13 +52,9 @@ async def ask_ceo(
             }
         except ImportError:
             # Se não encontrar o módulo, usar fallback
-            import openai
-            
-            client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-            
             system_prompt = "Você é o MAWDSLEYS — Agente Executivo de Diretoria. Forneça respostas claras, diretas e profissionais."
             
-            response = client.chat.completions.create(
+            response = await llm.chat(
                 model="gpt-3.5-turbo",
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -67,14 +64,12 @@ async def ask_ceo(
                 temperature=data.temperature
             )
             
-            ai_reply = response.choices[0].message.content
-            
             return {
-                "reply": ai_reply,
+                "reply": response.content,
                 "context_used": False,
                 "model": response.model,
                 "timestamp": datetime.utcnow().isoformat(),
-                "tokens_used": response.usage.total_tokens if response.usage else 0
+                "tokens_used": response.total_tokens
             }
         
     except Exception as e:
@@ -1,24 +1,30 @@
 # E:\MAWDSLEYS-AGENTE\backend\api\routes\chat.py — PRODUÇÃO (SEM DEMO)
 
+import asyncio
 import os
+import json
+import time
+from collections import deque
 from datetime import datetime
 from typing import List, Optional
 import hashlib
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
 
-from database.session import get_db
+from database.session import get_db, db_session
 from api.routes.auth import require_any_auth
 
 # 🔹 EVENTOS / MEMÓRIA / ORQUESTRAÇÃO
 from core.events.activity_log import ActivityEvent
-from db.repositories.activity_log_repository import ActivityLogRepository
+from core.events.log_writer import activity_log_writer
 from core.memory.memory_engine import MemoryEngine
 
-# 🔹 OpenAI
-import openai
+# 🔹 LLM (gateway assíncrono compartilhado)
+from core.llm.gateway import llm, LLMError
 
 # =========================
 # CONFIG
@@ -28,11 +34,12 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
     raise RuntimeError("OPENAI_API_KEY não configurada no ambiente")
 
-openai.api_key = OPENAI_API_KEY
-
 
 router = APIRouter(prefix="/api/v1/chat", tags=["Chat MAWDSLEYS"])
 
+# Amostras recentes de time-to-first-token do /stream (ms)
+_ttft_samples = deque(maxlen=int(os.getenv("CHAT_TTFT_SAMPLES", "500")))
+
 # =========================
 # SCHEMAS
 # =========================
@@ -95,7 +102,6 @@ def _generate_suggestions(user_message: str) -> List[str]:
 def _log_chat_event_safe(db: Session, user_id: str, user_message: str, ai_response: str):
     """Registra evento de chat de forma segura"""
     try:
-        repo = ActivityLogRepository(db)
         event = ActivityEvent(
             type="chat.interaction",
             entity="chat",
@@ -107,11 +113,77 @@ def _log_chat_event_safe(db: Session, user_id: str, user_message: str, ai_respon
                 "timestamp": datetime.utcnow().isoformat()
             }
         )
-        import asyncio
-        asyncio.create_task(repo.save(event))
+        activity_log_writer.enqueue(event)
     except Exception as e:
         print(f"[Chat] Erro ao registrar evento: {e}")
 
+def _load_memory_context(memory: MemoryEngine, user_id: str, message: str):
+    """
+    Consulta a memória e monta o contexto: (texto, ids usados, eventos carregados).
+    Bloqueia (embedding da pergunta + consultas): chamar via asyncio.to_thread
+    """
+    # Busca contexto relevante na memória
+    context_memories = memory.search(
+        query=message,
+        user_id=user_id,
+        limit=5,
+        entity_types=["meeting", "follow_up", "task", "alert", "chat_interaction"]
+    )
+
+    # Busca histórico recente do usuário
+    user_history = memory.get_user_recent_memories(
+        user_id=user_id,
+        limit=3
+    )
+
+    # Constrói contexto para a IA
+    context_parts = []
+    context_ids = []
+
+    for mem in context_memories:
+        context_parts.append(f"[{mem.entity_type.upper()}] {mem.content}")
+        context_ids.append(str(mem.id))
+
+    for mem in user_history:
+        if str(mem.id) not in context_ids:
+            context_parts.append(f"[HISTÓRICO] {mem.content}")
+            context_ids.append(str(mem.id))
+
+    memory_context = "\n".join(context_parts) if context_parts else "Sem contexto prévio relevante."
+    return memory_context, context_ids, len(context_memories) + len(user_history)
+
+def _build_system_prompt(memory_context: str, user_name: str, user_id: str) -> str:
+    return f"""
+Você é o Agente Executivo MAWDSLEYS.
+
+Você tem acesso ao histórico REAL da empresa e memória do usuário.
+Use o contexto abaixo para responder de forma relevante.
+
+=== MEMÓRIA E CONTEXTO DO USUÁRIO ===
+{memory_context}
+
+=== REGRAS DO AGENTE MAWDSLEYS ===
+1. Seja objetivo e executivo
+2. Baseie respostas nos fatos do histórico quando disponível
+3. Se algo não existir no histórico, seja transparente
+4. Ofereça sugestões úteis quando apropriado
+5. Formate respostas de forma clara e profissional
+6. Use emojis relevantes para melhorar a legibilidade
+
+Usuário: {user_name} (ID: {user_id})
+"""
+
+def _sse(data: dict, event: Optional[str] = None) -> str:
+    """Formata um evento Server-Sent Events"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))], 1)
+
 # =========================
 # CHAT COM MEMÓRIA REAL E INTELIGENTE
 # =========================
@@ -129,42 +201,15 @@ async def chat(
         if not user_id:
             raise HTTPException(status_code=401, detail="Usuário não autenticado")
 
-        repo = ActivityLogRepository(db)
-
         # =========================
         # 1️⃣ CONSULTA MEMÓRIA (INTELIGENTE) - ANTES DE RESPONDER
         # =========================
         memory = MemoryEngine(db)
         
-        # Busca contexto relevante na memória
-        context_memories = memory.search(
-            query=data.message,
-            user_id=user_id,
-            limit=5,
-            entity_types=["meeting", "follow_up", "task", "alert", "chat_interaction"]
+        memory_context, context_ids, events_loaded = await asyncio.to_thread(
+            _load_memory_context, memory, user_id, data.message
         )
         
-        # Busca histórico recente do usuário
-        user_history = memory.get_user_recent_memories(
-            user_id=user_id,
-            limit=3
-        )
-        
-        # Constrói contexto para a IA
-        context_parts = []
-        context_ids = []
-        
-        for mem in context_memories:
-            context_parts.append(f"[{mem.entity_type.upper()}] {mem.content}")
-            context_ids.append(str(mem.id))
-        
-        for mem in user_history:
-            if str(mem.id) not in context_ids:
-                context_parts.append(f"[HISTÓRICO] {mem.content}")
-                context_ids.append(str(mem.id))
-        
-        memory_context = "\n".join(context_parts) if context_parts else "Sem contexto prévio relevante."
-        
         # 🔹 Log de consulta à memória (explicabilidade)
         memory_event = ActivityEvent(
             type="memory.consulted",
@@ -172,12 +217,12 @@ async def chat(
             entity_id="chat_context",
             actor="MAWDSLEYS_AI",
             payload={
-                "events_loaded": len(context_memories) + len(user_history),
+                "events_loaded": events_loaded,
                 "context_ids": context_ids[:5],  # Apenas os primeiros IDs
                 "query": data.message[:100]
             }
         )
-        await repo.save(memory_event)
+        activity_log_writer.enqueue(memory_event)
 
         # =========================
         # 2️⃣ LOG MENSAGEM DO USUÁRIO
@@ -192,35 +237,17 @@ async def chat(
                 "user_id": user_id
             }
         )
-        await repo.save(user_event)
+        activity_log_writer.enqueue(user_event)
 
         # =========================
         # 3️⃣ PROMPT EXECUTIVO COM CONTEXTO INTELIGENTE
         # =========================
-        system_prompt = f"""
-Você é o Agente Executivo MAWDSLEYS.
-
-Você tem acesso ao histórico REAL da empresa e memória do usuário.
-Use o contexto abaixo para responder de forma relevante.
-
-=== MEMÓRIA E CONTEXTO DO USUÁRIO ===
-{memory_context}
-
-=== REGRAS DO AGENTE MAWDSLEYS ===
-1. Seja objetivo e executivo
-2. Baseie respostas nos fatos do histórico quando disponível
-3. Se algo não existir no histórico, seja transparente
-4. Ofereça sugestões úteis quando apropriado
-5. Formate respostas de forma clara e profissional
-6. Use emojis relevantes para melhorar a legibilidade
-
-Usuário: {user_name} (ID: {user_id})
-"""
+        system_prompt = _build_system_prompt(memory_context, user_name, user_id)
 
         # =========================
         # 4️⃣ OPENAI COM CONTEXTO ENRIQUECIDO
         # =========================
-        completion = openai.ChatCompletion.create(
+        completion = await llm.chat(
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -229,7 +256,7 @@ Usuário: {user_name} (ID: {user_id})
             temperature=0.3
         )
 
-        reply_text = completion["choices"][0]["message"]["content"]
+        reply_text = completion.content
 
         # =========================
         # 5️⃣ REGISTRA INTERAÇÃO NA MEMÓRIA DO AGENTE
@@ -248,6 +275,7 @@ Usuário: {user_name} (ID: {user_id})
                 "timestamp": datetime.utcnow().isoformat()
             }
         )
+        db.commit()
 
         # =========================
         # 6️⃣ LOG RESPOSTA DA IA
@@ -263,7 +291,7 @@ Usuário: {user_name} (ID: {user_id})
                 "context_used_count": len(context_ids)
             }
         )
-        await repo.save(ai_event)
+        activity_log_writer.enqueue(ai_event)
 
         # =========================
         # 7️⃣ REGISTRA EVENTO DE CHAT (BACKUP)
@@ -295,6 +323,171 @@ Usuário: {user_name} (ID: {user_id})
             detail=f"Erro no Chat MAWDSLEYS: {str(e)}"
         )
 
+# =========================
+# CHAT EM STREAMING (SSE)
+# =========================
+
+def _persist_stream_chat(state: dict, user_id: str, user_name: str, message: str,
+                         context_ids: List[str], events_loaded: int):
+    """
+    Roda depois que o stream fecha (BackgroundTask): memória e ActivityLog
+    ficam fora do caminho do primeiro token. Os eventos vão para o
+    ActivityLogWriter; a memória usa sessão própria, pois a do request
+    pode já ter sido fechada. Função síncrona de propósito: o Starlette
+    a executa no threadpool, sem bloquear o event loop com o banco.
+    """
+    reply_text = "".join(state["parts"])
+
+    activity_log_writer.enqueue(ActivityEvent(
+        type="memory.consulted",
+        entity="memory",
+        entity_id="chat_context",
+        actor="MAWDSLEYS_AI",
+        payload={
+            "events_loaded": events_loaded,
+            "context_ids": context_ids[:5],
+            "query": message[:100]
+        }
+    ))
+    activity_log_writer.enqueue(ActivityEvent(
+        type="chat.user_message",
+        entity="chat",
+        entity_id="conversation",
+        actor=user_name,
+        payload={
+            "message": message,
+            "user_id": user_id
+        }
+    ))
+    activity_log_writer.enqueue(ActivityEvent(
+        type="chat.ai_response",
+        entity="chat",
+        entity_id="conversation",
+        actor="MAWDSLEYS_AI",
+        payload={
+            "reply_preview": reply_text[:200] + "..." if len(reply_text) > 200 else reply_text,
+            "model": "gpt-4o-mini",
+            "context_used_count": len(context_ids),
+            "streamed": True,
+            "completed": state["completed"],
+            "error": state["error"],
+            "ttft_ms": state["ttft_ms"],
+            "total_ms": state["total_ms"]
+        }
+    ))
+
+    if not reply_text:
+        return
+    try:
+        with db_session() as db:
+            MemoryEngine(db).add_memory(
+                user_id=user_id,
+                entity_type="chat_interaction",
+                entity_id=f"chat_{datetime.utcnow().timestamp()}",
+                content=f"Usuário {user_name} perguntou: '{message}'. IA respondeu: '{reply_text[:100]}...'",
+                metadata={
+                    "user_message": message,
+                    "ai_response": reply_text,
+                    "context_used": context_ids,
+                    "timestamp": datetime.utcnow().isoformat()
+                }
+            )
+    except Exception as e:
+        print(f"[Chat Stream] Erro ao registrar interação: {e}")
+
+
+@router.post("/stream")
+async def chat_stream(
+    data: ChatRequest,
+    current_user: dict = Depends(require_any_auth),
+    db: Session = Depends(get_db),
+):
+    """
+    Mesmo fluxo do /chat, mas entrega os tokens via Server-Sent Events
+    conforme o modelo gera:
+
+        data: {"token": "..."}             (um por trecho)
+        event: error / data: {"detail"}    (falha do provedor no meio)
+        event: done  / data: {...}         (context_used, suggestions, ttft_ms, total_ms)
+    """
+    user_id = current_user.get("user_id")
+    user_name = current_user.get("name", "Executivo")
+
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Usuário não autenticado")
+
+    # Contexto antes de abrir o stream: falhas aqui ainda viram HTTP 500
+    try:
+        memory = MemoryEngine(db)
+        memory_context, context_ids, events_loaded = await asyncio.to_thread(
+            _load_memory_context, memory, user_id, data.message
+        )
+    except Exception as e:
+        print(f"[Chat Stream Error] {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erro no Chat MAWDSLEYS: {str(e)}"
+        )
+
+    messages = [
+        {"role": "system", "content": _build_system_prompt(memory_context, user_name, user_id)},
+        {"role": "user", "content": data.message}
+    ]
+    state = {"parts": [], "ttft_ms": None, "total_ms": None, "completed": False, "error": None}
+
+    async def event_stream():
+        started = time.perf_counter()
+        try:
+            async for token in llm.chat_stream(model="gpt-4o-mini", messages=messages, temperature=0.3):
+                if state["ttft_ms"] is None:
+                    state["ttft_ms"] = round((time.perf_counter() - started) * 1000, 1)
+                    _ttft_samples.append(state["ttft_ms"])
+                state["parts"].append(token)
+                yield _sse({"token": token})
+            state["completed"] = True
+        except LLMError as e:
+            state["error"] = str(e)
+            print(f"[Chat Stream] ❌ Falha do provedor: {e}")
+            yield _sse({"detail": f"Erro no Chat MAWDSLEYS: {e}"}, event="error")
+        except Exception as e:
+            # Qualquer outra falha também fecha o stream com error + done
+            state["error"] = str(e)
+            print(f"[Chat Stream] ❌ Erro inesperado: {e}")
+            yield _sse({"detail": "Erro no Chat MAWDSLEYS"}, event="error")
+        finally:
+            state["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+        print(f"[Chat Stream] ⚡ TTFT {state['ttft_ms']} ms | total {state['total_ms']} ms")
+        yield _sse({
+            "context_used": context_ids[:3] if context_ids else None,
+            "suggestions": _generate_suggestions(data.message),
+            "ttft_ms": state["ttft_ms"],
+            "total_ms": state["total_ms"],
+            "timestamp": datetime.utcnow().isoformat()
+        }, event="done")
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(
+            _persist_stream_chat, state, user_id, user_name, data.message, context_ids, events_loaded
+        ),
+    )
+
+
+@router.get("/stream/metrics")
+def chat_stream_metrics():
+    """Time-to-first-token das últimas respostas em streaming"""
+    samples = list(_ttft_samples)
+    return {
+        "samples": len(samples),
+        "ttft_ms_p50": _percentile(samples, 0.50),
+        "ttft_ms_p95": _percentile(samples, 0.95),
+        "llm": llm.stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
 # =========================
 # CHAT SIMPLES (FALLBACK)
 # =========================
@@ -306,7 +499,7 @@ async def chat_simple(
 ):
     """Chat simplificado sem consulta de memória (fallback)"""
     try:
-        completion = openai.ChatCompletion.create(
+        completion = await llm.chat(
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": "Você é o assistente corporativo MAWDSLEYS. Responda de forma profissional e útil."},
@@ -315,7 +508,7 @@ async def chat_simple(
             temperature=0.3
         )
         
-        reply_text = completion["choices"][0]["message"]["content"]
+        reply_text = completion.content
         
         return ChatResponse(
             reply=reply_text,
@@ -343,7 +536,7 @@ async def chat_public(
         user_name = "Test User"
         
         # Versão simplificada para teste:
-        completion = openai.ChatCompletion.create(
+        completion = await llm.chat(
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": "Você é o assistente corporativo MAWDSLEYS. Responda de forma profissional."},
@@ -352,11 +545,10 @@ async def chat_public(
             temperature=0.3
         )
         
-        reply_text = completion["choices"][0]["message"]["content"]
+        reply_text = completion.content
         
         # Registra evento do chat público (opcional)
         try:
-            repo = ActivityLogRepository(db)
             event = ActivityEvent(
                 type="chat.public_message",
                 entity="chat",
@@ -368,7 +560,7 @@ async def chat_public(
                     "timestamp": datetime.utcnow().isoformat()
                 }
             )
-            await repo.save(event)
+            activity_log_writer.enqueue(event)
         except Exception as e:
             print(f"[Chat Public] Erro ao registrar evento: {e}")
         
@@ -2,14 +2,19 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
 from database.session import get_db
+from api.routes.auth import require_any_auth
 from services.ingest_service import process_ingest
 
 router = APIRouter(tags=["Ingest"])
 
 @router.post("/ingest")
-def ingest(payload: dict, db: Session = Depends(get_db)):
+def ingest(
+    payload: dict,
+    current_user: dict = Depends(require_any_auth),
+    db: Session = Depends(get_db),
+):
     """
-    Endpoint oficial de ingestão.
+    Endpoint oficial de ingestão (em nome do usuário autenticado).
     Recebe texto bruto e persiste:
     - capture
     - note
@@ -27,6 +32,7 @@ def ingest(payload: dict, db: Session = Depends(get_db)):
     result = process_ingest(
         db=db,
         raw_text=raw_text,
+        user_id=current_user["user_id"],
         source="api"
     )
 
@@ -4,9 +4,10 @@ from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
 from sqlalchemy.orm import Session
 import tempfile
 import os
-import openai
 
 from database.session import get_db
+from api.routes.auth import require_any_auth
+from core.llm.gateway import llm
 from services.ingest_service import process_ingest
 
 router = APIRouter(tags=["Ingest Audio"])
@@ -15,6 +16,7 @@ router = APIRouter(tags=["Ingest Audio"])
 @router.post("/ingest/audio")
 async def ingest_audio(
     audio: UploadFile = File(...),
+    current_user: dict = Depends(require_any_auth),
     db: Session = Depends(get_db),
 ):
     """
@@ -39,13 +41,14 @@ async def ingest_audio(
         # 2. Transcrição (Whisper)
         # =====================================================
         with open(temp_path, "rb") as audio_file:
-            transcript = openai.Audio.transcribe(
+            transcript = await llm.transcribe(
+                audio_file.read(),
+                filename=os.path.basename(temp_path),
                 model="whisper-1",
-                file=audio_file,
                 language="pt"
             )
 
-        text = transcript.get("text", "").strip()
+        text = transcript.strip()
 
         if not text:
             raise HTTPException(
@@ -59,6 +62,7 @@ async def ingest_audio(
         result = process_ingest(
             db=db,
             raw_text=text,
+            user_id=current_user["user_id"],
             source="audio"
         )
 
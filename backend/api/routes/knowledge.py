@@ -1,30 +1,26 @@
 # backend/api/routes/knowledge.py
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Body, Request
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
+import json
+import os
 import uuid
+import time
 
 from database.session import get_db
 from api.routes.auth import require_any_auth
-# Tenta importar o motor de embeddings; se não disponível, define um fallback leve
-try:
-    from ai_engine.embeddings.embedding_loader import search_relevant
-except Exception:
-    def search_relevant(query, limit=10, **kwargs):
-        """
-        Fallback simples para search_relevant: utiliza o serviço mock local se disponível
-        ou retorna lista vazia para evitar erro de importação.
-        """
-        try:
-            # KnowledgeService é definido abaixo neste arquivo; resolução ocorre em tempo de execução.
-            return KnowledgeService.search_knowledge(query=query, limit=limit)
-        except NameError:
-            return []
+from services.knowledge_service import KnowledgeService
 
 router = APIRouter(prefix="/knowledge", tags=["Knowledge"])
 
+# Ingestão NDJSON: itens por transação e tamanho máximo de uma linha
+INGEST_BATCH_SIZE = int(os.getenv("KNOWLEDGE_INGEST_BATCH", "200"))
+INGEST_MAX_LINE_BYTES = int(os.getenv("KNOWLEDGE_INGEST_MAX_LINE_BYTES", str(16 * 1024 * 1024)))
+
 # ==========================
 # SCHEMAS
 # ==========================
@@ -54,7 +50,8 @@ class SearchQuery(BaseModel):
     """Schema para busca"""
     query: str = Field(..., min_length=1, example="Como fazer instalação?")
     limit: int = Field(10, ge=1, le=100)
-    threshold: float = Field(0.7, ge=0.0, le=1.0)
+    # Relevância mínima do score fundido (RRF normalizado); None = sem corte
+    threshold: Optional[float] = Field(None, ge=0.0, le=1.0)
     categories: Optional[List[str]] = None
     tags: Optional[List[str]] = None
     language: Optional[str] = "pt-BR"
@@ -120,168 +117,6 @@ class ChatResponse(BaseModel):
     conversation_id: str
     search_time: float
 
-# ==========================
-# MOCK DATA & SERVICES (para desenvolvimento)
-# ==========================
-class KnowledgeService:
-    """Serviço mock para desenvolvimento"""
-    
-    _knowledge_bases = [
-        {
-            "id": "kb_001",
-            "name": "Manual do Produto X",
-            "description": "Documentação completa do produto X",
-            "category": "Produtos",
-            "tags": ["produto", "manual", "documentação"],
-            "is_public": True,
-            "item_count": 15,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow(),
-            "created_by": 1
-        },
-        {
-            "id": "kb_002", 
-            "name": "FAQ Suporte",
-            "description": "Perguntas frequentes de suporte",
-            "category": "Suporte",
-            "tags": ["faq", "suporte", "ajuda"],
-            "is_public": True,
-            "item_count": 42,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow(),
-            "created_by": 2
-        }
-    ]
-    
-    _knowledge_items = [
-        {
-            "id": "ki_001",
-            "title": "Como instalar o produto X",
-            "content": "Passo 1: Desembale o produto. Passo 2: Conecte na energia. Passo 3: Siga o assistente de configuração.",
-            "content_type": "text",
-            "category": "Instalação",
-            "tags": ["instalação", "setup", "início"],
-            "source": "Manual do Fabricante",
-            "source_url": "https://exemplo.com/manual",
-            "language": "pt-BR",
-            "priority": 1,
-            "knowledge_base_id": "kb_001",
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow(),
-            "created_by": 1
-        },
-        {
-            "id": "ki_002",
-            "title": "Solução para erro 'Dispositivo não encontrado'",
-            "content": "1. Verifique a conexão USB. 2. Reinicie o computador. 3. Atualize os drivers.",
-            "content_type": "text",
-            "category": "Troubleshooting",
-            "tags": ["erro", "suporte", "solução"],
-            "source": "Base de Conhecimento Interna",
-            "language": "pt-BR",
-            "priority": 2,
-            "knowledge_base_id": "kb_002",
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow(),
-            "created_by": 2
-        },
-        {
-            "id": "ki_003",
-            "title": "Configuração de rede avançada",
-            "content": "Para configurar rede avançada, acesse Configurações > Rede > Avançado.",
-            "content_type": "text",
-            "category": "Configuração",
-            "tags": ["rede", "configuração", "avançado"],
-            "language": "pt-BR",
-            "priority": 3,
-            "knowledge_base_id": "kb_001",
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow(),
-            "created_by": 1
-        }
-    ]
-    
-    @classmethod
-    def search_knowledge(cls, query: str, limit: int = 10, **filters) -> List[Dict]:
-        """Busca em conhecimento (mock)"""
-        results = []
-        
-        for item in cls._knowledge_items:
-            # Simulação de busca simples
-            score = 0.0
-            query_lower = query.lower()
-            
-            # Verifica no título
-            if query_lower in item["title"].lower():
-                score += 0.7
-            
-            # Verifica no conteúdo
-            if query_lower in item["content"].lower():
-                score += 0.3
-            
-            # Verifica nas tags
-            for tag in item["tags"]:
-                if query_lower in tag.lower():
-                    score += 0.2
-            
-            # Aplica filtros
-            if filters.get("category") and item["category"] not in filters["category"]:
-                continue
-            
-            if filters.get("tags"):
-                if not any(tag in item["tags"] for tag in filters["tags"]):
-                    continue
-            
-            if filters.get("language") and item["language"] != filters["language"]:
-                continue
-            
-            if score > 0:
-                item_with_score = item.copy()
-                item_with_score["relevance_score"] = min(score, 1.0)
-                results.append(item_with_score)
-        
-        # Ordena por score
-        results.sort(key=lambda x: x["relevance_score"], reverse=True)
-        return results[:limit]
-    
-    @classmethod
-    def chat_with_knowledge(cls, question: str, max_results: int = 5) -> Dict:
-        """Chat com base de conhecimento (mock)"""
-        results = cls.search_knowledge(question, limit=max_results)
-        
-        # Gera resposta baseada nos resultados
-        if results:
-            answer = f"Baseado na nossa base de conhecimento sobre '{question}':\n\n"
-            for i, result in enumerate(results[:3], 1):
-                answer += f"{i}. {result['title']}: {result['content'][:100]}...\n"
-            answer += "\nPara mais detalhes, consulte os itens completos."
-            confidence = 0.8
-        else:
-            answer = "Desculpe, não encontrei informações específicas sobre isso na base de conhecimento. Posso ajudar com outras questões?"
-            confidence = 0.2
-        
-        return {
-            "answer": answer,
-            "sources": results,
-            "confidence": confidence
-        }
-    
-    @classmethod
-    def get_knowledge_base(cls, kb_id: str) -> Optional[Dict]:
-        """Obtém uma base de conhecimento"""
-        for kb in cls._knowledge_bases:
-            if kb["id"] == kb_id:
-                return kb
-        return None
-    
-    @classmethod
-    def get_knowledge_item(cls, item_id: str) -> Optional[Dict]:
-        """Obtém um item de conhecimento"""
-        for item in cls._knowledge_items:
-            if item["id"] == item_id:
-                return item
-        return None
-
 # ==========================
 # ROTAS DE CONHECIMENTO
 # ==========================
@@ -290,68 +125,33 @@ def search_knowledge(
     search_query: SearchQuery,
     current_user: dict = Depends(require_any_auth)
 ):
-    """Buscar na base de conhecimento"""
-    try:
-        # Primeiro tenta usar o motor de embeddings real
-        if hasattr(search_relevant, '__call__'):
-            # Se a função existe, tenta usá-la
-            ai_results = search_relevant(search_query.query)
-            # Converte resultados para o formato esperado
-            results = []
-            for result in ai_results[:search_query.limit]:
-                results.append({
-                    "id": str(uuid.uuid4()),
-                    "title": result.get("title", "Resultado da busca"),
-                    "content": result.get("content", result.get("text", "")),
-                    "content_type": "text",
-                    "category": "Busca AI",
-                    "tags": ["ai_search"],
-                    "language": search_query.language,
-                    "priority": 1,
-                    "relevance_score": result.get("score", 0.8),
-                    "knowledge_base_id": "ai_search",
-                    "created_at": datetime.utcnow(),
-                    "updated_at": datetime.utcnow(),
-                    "created_by": current_user.get("user_id")
-                })
-        else:
-            # Fallback para mock
-            results = KnowledgeService.search_knowledge(
-                query=search_query.query,
-                limit=search_query.limit,
-                category=search_query.categories,
-                tags=search_query.tags,
-                language=search_query.language
-            )
-        
-        # Gera sugestões de busca
-        suggested_queries = [
-            f"{search_query.query} avançado",
-            f"tutorial {search_query.query}",
-            f"como fazer {search_query.query}"
-        ]
-        
-        return SearchResponse(
-            query=search_query.query,
-            results=results,
-            total_results=len(results),
-            search_time=0.5,  # Mock
-            suggested_queries=suggested_queries[:3]
-        )
-        
-    except Exception as e:
-        # Fallback completo para mock em caso de erro
-        results = KnowledgeService.search_knowledge(
-            query=search_query.query,
-            limit=search_query.limit
-        )
-        
-        return SearchResponse(
-            query=search_query.query,
-            results=results,
-            total_results=len(results),
-            search_time=0.3
-        )
+    """Buscar na base de conhecimento (híbrida: BM25 + vetorial, fundidas por RRF)"""
+    start = time.perf_counter()
+    
+    # Filtros aplicados dentro dos índices, antes da pontuação
+    results = KnowledgeService.search_knowledge(
+        query=search_query.query,
+        limit=search_query.limit,
+        threshold=search_query.threshold,
+        category=search_query.categories,
+        tags=search_query.tags,
+        language=search_query.language
+    )
+    
+    # Gera sugestões de busca
+    suggested_queries = [
+        f"{search_query.query} avançado",
+        f"tutorial {search_query.query}",
+        f"como fazer {search_query.query}"
+    ]
+    
+    return SearchResponse(
+        query=search_query.query,
+        results=results,
+        total_results=len(results),
+        search_time=round(time.perf_counter() - start, 4),
+        suggested_queries=suggested_queries[:3]
+    )
 
 @router.post("/chat", response_model=ChatResponse)
 def chat_with_knowledge(
@@ -384,7 +184,7 @@ def list_knowledge_bases(
     current_user: dict = Depends(require_any_auth)
 ):
     """Listar bases de conhecimento"""
-    bases = KnowledgeService._knowledge_bases
+    bases = KnowledgeService.list_bases()
     
     # Aplica filtros
     if category:
@@ -421,7 +221,7 @@ def list_knowledge_items(
     current_user: dict = Depends(require_any_auth)
 ):
     """Listar itens de conhecimento"""
-    items = KnowledgeService._knowledge_items
+    items = KnowledgeService.list_items()
     
     # Aplica filtros
     if kb_id:
@@ -450,6 +250,7 @@ def get_knowledge_item(
 @router.post("/bases", response_model=KnowledgeBaseResponse, status_code=status.HTTP_201_CREATED)
 def create_knowledge_base(
     kb_data: KnowledgeBaseCreate,
+    db: Session = Depends(get_db),
     current_user: dict = Depends(require_any_auth)
 ):
     """Criar nova base de conhecimento"""
@@ -471,13 +272,14 @@ def create_knowledge_base(
         "metadata": kb_data.metadata
     }
     
-    KnowledgeService._knowledge_bases.append(new_kb)
+    KnowledgeService.add_base(new_kb, db=db)
     return new_kb
 
 @router.post("/items", response_model=KnowledgeItemResponse, status_code=status.HTTP_201_CREATED)
 def create_knowledge_item(
     item_data: KnowledgeItemCreate,
     kb_id: str = Query(..., description="ID da base de conhecimento"),
+    db: Session = Depends(get_db),
     current_user: dict = Depends(require_any_auth)
 ):
     """Criar novo item de conhecimento"""
@@ -512,12 +314,8 @@ def create_knowledge_item(
         "metadata": item_data.metadata
     }
     
-    KnowledgeService._knowledge_items.append(new_item)
-    
-    # Atualiza contagem na base
-    kb["item_count"] = len([i for i in KnowledgeService._knowledge_items 
-                           if i["knowledge_base_id"] == kb_id])
-    kb["updated_at"] = datetime.utcnow()
+    # Persiste, indexa e incrementa item_count da base
+    KnowledgeService.add_items(kb, [new_item], db=db)
     
     return new_item
 
@@ -548,18 +346,20 @@ def get_knowledge_stats(
     current_user: dict = Depends(require_any_auth)
 ):
     """Obter estatísticas da base de conhecimento"""
-    total_bases = len(KnowledgeService._knowledge_bases)
-    total_items = len(KnowledgeService._knowledge_items)
+    bases = KnowledgeService.list_bases()
+    items = KnowledgeService.list_items()
+    total_bases = len(bases)
+    total_items = len(items)
     
     # Contagem por categoria
     categories = {}
-    for item in KnowledgeService._knowledge_items:
+    for item in items:
         cat = item["category"] or "Sem categoria"
         categories[cat] = categories.get(cat, 0) + 1
     
     # Top tags
     tags_count = {}
-    for item in KnowledgeService._knowledge_items:
+    for item in items:
         for tag in item["tags"]:
             tags_count[tag] = tags_count.get(tag, 0) + 1
     
@@ -568,7 +368,7 @@ def get_knowledge_stats(
     return {
         "total_bases": total_bases,
         "total_items": total_items,
-        "public_bases": len([b for b in KnowledgeService._knowledge_bases if b["is_public"]]),
+        "public_bases": len([b for b in bases if b["is_public"]]),
         "items_by_category": categories,
         "top_tags": dict(top_tags),
         "last_updated": datetime.utcnow().isoformat()
@@ -578,6 +378,7 @@ def get_knowledge_stats(
 def batch_upload(
     items: List[KnowledgeItemCreate],
     kb_id: str = Body(...),
+    db: Session = Depends(get_db),
     current_user: dict = Depends(require_any_auth)
 ):
     """Upload em lote de itens de conhecimento"""
@@ -610,13 +411,10 @@ def batch_upload(
             "metadata": item_data.metadata
         }
         
-        KnowledgeService._knowledge_items.append(new_item)
         created_items.append(new_item)
     
-    # Atualiza contagem
-    kb["item_count"] = len([i for i in KnowledgeService._knowledge_items 
-                           if i["knowledge_base_id"] == kb_id])
-    kb["updated_at"] = datetime.utcnow()
+    # Uma transação para o lote; contagem incrementada (sem recontar)
+    KnowledgeService.add_items(kb, created_items, db=db)
     
     return {
         "message": f"{len(created_items)} itens criados com sucesso",
@@ -625,6 +423,150 @@ def batch_upload(
         "kb_new_count": kb["item_count"]
     }
 
+class _DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse que lê o corpo da requisição enquanto responde.
+    A versão padrão escuta desconexão em paralelo chamando receive(),
+    o que consumiria os pedaços do corpo; aqui a desconexão aparece
+    como ClientDisconnect em request.stream().
+    """
+    
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+async def _iter_ndjson_lines(request: Request):
+    """
+    Lê o corpo em streaming e produz (número da linha, bytes | None).
+    None = linha acima de INGEST_MAX_LINE_BYTES (descartada sem bufferizar).
+    """
+    buffer = bytearray()
+    line_no = 0
+    oversized = False
+
+    async for chunk in request.stream():
+        scan = len(buffer)  # o que já estava no buffer não tem "\n"
+        buffer.extend(chunk)
+        start = 0
+        while True:
+            newline = buffer.find(b"\n", max(start, scan))
+            if newline < 0:
+                break
+            line_no += 1
+            yield line_no, None if oversized else bytes(buffer[start:newline])
+            oversized = False
+            start = newline + 1
+        del buffer[:start]
+
+        if len(buffer) > INGEST_MAX_LINE_BYTES:
+            oversized = True
+            buffer.clear()
+
+    if buffer.strip() or oversized:
+        yield line_no + 1, None if oversized else bytes(buffer)
+
+@router.post("/batch/stream")
+async def batch_upload_stream(
+    request: Request,
+    kb_id: str = Query(..., description="ID da base de conhecimento"),
+    current_user: dict = Depends(require_any_auth)
+):
+    """
+    Upload em streaming (application/x-ndjson): um KnowledgeItemCreate por linha.
+    
+    O corpo é lido incrementalmente; conteúdos longos são divididos em
+    partes, os embeddings saem em lote e cada KNOWLEDGE_INGEST_BATCH itens
+    são gravados em uma transação. A resposta é NDJSON com o status de
+    cada linha e um resumo final. Em cada linha, `id` é o item enviado e
+    `item_ids` são os itens gravados (as partes `<id>_1`, `<id>_2`... quando
+    o conteúdo foi dividido; senão o próprio `id`).
+    """
+    user_id = current_user.get("user_id")
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Usuário não autenticado")
+    
+    kb = KnowledgeService.get_knowledge_base(kb_id)
+    if not kb:
+        raise HTTPException(status_code=404, detail="Base de conhecimento não encontrada")
+    
+    if not kb["is_public"] and kb["created_by"] != user_id:
+        raise HTTPException(status_code=403, detail="Sem permissão para adicionar itens")
+    
+    async def process():
+        batch, pending = [], []  # itens do lote / (linha, id, ids gravados) a confirmar
+        created = errors = 0
+        
+        async def flush():
+            nonlocal created, errors, batch, pending
+            items, lines = batch, pending
+            batch, pending = [], []
+            try:
+                # item_count conta as linhas do NDJSON, não as partes
+                await run_in_threadpool(KnowledgeService.add_items, kb, items, None, len(lines))
+            except Exception as e:
+                errors += len(lines)
+                return [{"line": n, "id": i, "status": "error", "error": f"Falha ao gravar lote: {e}"}
+                        for n, i, _ in lines]
+            created += len(lines)
+            return [{"line": n, "id": i, "item_ids": ids, "status": "ok"} for n, i, ids in lines]
+        
+        async for line_no, raw in _iter_ndjson_lines(request):
+            if raw is None:
+                errors += 1
+                yield json.dumps({"line": line_no, "status": "error", "error": "Linha muito grande"}) + "\n"
+                continue
+            if not raw.strip():
+                continue
+            
+            try:
+                item_data = KnowledgeItemCreate(**json.loads(raw))
+            except (ValueError, TypeError, ValidationError) as e:
+                errors += 1
+                yield json.dumps({"line": line_no, "status": "error", "error": str(e)}, ensure_ascii=False) + "\n"
+                continue
+            
+            now = datetime.utcnow()
+            new_item = {
+                "id": f"ki_{uuid.uuid4().hex[:8]}",
+                "title": item_data.title,
+                "content": item_data.content,
+                "content_type": item_data.content_type,
+                "category": item_data.category,
+                "tags": item_data.tags,
+                "source": item_data.source,
+                "source_url": item_data.source_url,
+                "language": item_data.language,
+                "priority": item_data.priority,
+                "knowledge_base_id": kb_id,
+                "created_at": now,
+                "updated_at": now,
+                "created_by": user_id,
+                "metadata": item_data.metadata
+            }
+            
+            parts = KnowledgeService.split_item(new_item)
+            batch.extend(parts)
+            pending.append((line_no, new_item["id"], [part["id"] for part in parts]))
+            
+            if len(batch) >= INGEST_BATCH_SIZE:
+                for status_line in await flush():
+                    yield json.dumps(status_line) + "\n"
+        
+        if batch:
+            for status_line in await flush():
+                yield json.dumps(status_line) + "\n"
+        
+        yield json.dumps({
+            "done": True,
+            "items_created": created,
+            "errors": errors,
+            "kb_id": kb_id,
+            "kb_new_count": kb["item_count"]
+        }) + "\n"
+    
+    return _DuplexStreamingResponse(process(), media_type="application/x-ndjson")
+
 @router.get("/health")
 def knowledge_health():
     """Health check do módulo de conhecimento"""
@@ -633,8 +575,8 @@ def knowledge_health():
         "service": "knowledge",
         "timestamp": datetime.utcnow().isoformat(),
         "stats": {
-            "bases_count": len(KnowledgeService._knowledge_bases),
-            "items_count": len(KnowledgeService._knowledge_items),
-            "ai_search_available": hasattr(search_relevant, '__call__')
+            "bases_count": len(KnowledgeService.list_bases()),
+            "items_count": len(KnowledgeService.list_items()),
+            "ai_search_available": KnowledgeService.vector_search_available()
         }
     }
\ No newline at end of file
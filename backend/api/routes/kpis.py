@@ -1,14 +1,11 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 
 from database.session import get_db
 from api.routes.auth import require_any_auth
 
-from models.followup import FollowUp
-from models.ritual import Ritual
-from db.models.activity_log import ActivityLog
 from db.repositories.kpi_repository import KPIRepository
+from core.memory.insight_engine import insights
 
 
 router = APIRouter(
@@ -32,33 +29,16 @@ def followups_summary(db: Session = Depends(get_db)):
     - abertos
     - em andamento
     - concluídos
+    (uma leitura do followup_stats)
     """
 
-    total = db.query(FollowUp).count()
-
-    abertos = (
-        db.query(FollowUp)
-        .filter(FollowUp.status == "ABERTO")
-        .count()
-    )
-
-    em_andamento = (
-        db.query(FollowUp)
-        .filter(FollowUp.status == "EM_ANDAMENTO")
-        .count()
-    )
-
-    concluidos = (
-        db.query(FollowUp)
-        .filter(FollowUp.status == "CONCLUIDO")
-        .count()
-    )
+    counts = KPIRepository(db).followup_status_counts()
 
     return {
-        "total_followups": total,
-        "abertos": abertos,
-        "em_andamento": em_andamento,
-        "concluidos": concluidos,
+        "total_followups": sum(counts.values()),
+        "abertos": counts.get("ABERTO", 0),
+        "em_andamento": counts.get("EM_ANDAMENTO", 0),
+        "concluidos": counts.get("CONCLUIDO", 0),
     }
 
 
@@ -72,24 +52,7 @@ def followups_by_ritual(db: Session = Depends(get_db)):
     KPI de FollowUps agrupados por Ritual
     """
 
-    rows = (
-        db.query(
-            Ritual.code.label("ritual"),
-            func.count(FollowUp.id).label("total")
-        )
-        .outerjoin(FollowUp, FollowUp.ritual_id == Ritual.id)
-        .group_by(Ritual.code)
-        .order_by(func.count(FollowUp.id).desc())
-        .all()
-    )
-
-    return [
-        {
-            "ritual": r.ritual,
-            "total_followups": r.total
-        }
-        for r in rows
-    ]
+    return KPIRepository(db).followups_by_ritual()
 
 
 # =========================================================
@@ -110,3 +73,21 @@ def weekly_meetings_kpi(db: Session = Depends(get_db)):
 
     repo = KPIRepository(db)
     return repo.weekly_meetings_by_user()
+
+
+# =========================================================
+# INSIGHTS — ESTADO INCREMENTAL (SEM VARRER EVENTOS)
+# =========================================================
+
+@router.get(
+    "/insights",
+    dependencies=[Depends(require_any_auth)]
+)
+
+def insights_snapshot():
+    """
+    Pressão de follow-ups por responsável, riscos regulatórios e
+    volume de reuniões, mantidos evento a evento pelo InsightAggregator
+    """
+
+    return insights.snapshot()
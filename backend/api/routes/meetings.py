@@ -1,9 +1,9 @@
 # E:\MAWDSLEYS-AGENTE\backend\api\routes\meetings.py - VERSÃO ATUALIZADA
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from fastapi import APIRouter
 
 # 🔹 IMPORTS DO SISTEMA
@@ -20,22 +20,16 @@ from controllers.meeting import (
     start_meeting as db_start_meeting,
     complete_meeting as db_complete_meeting,
     get_meeting_stats as db_get_meeting_stats,
+    encode_cursor,
     test_automation_system as controller_test_automation
 )
 
 # 🔹 SCHEMAS
 from schemas.meeting import MeetingCreate as DBCreateSchema, MeetingUpdate as DBUpdateSchema
 
-# 🔹 AUTOMAÇÃO / EVENTOS
-from core.events.activity_log import ActivityEvent
-from db.repositories.activity_log_repository import ActivityLogRepository
-
 # 🔹 ALERTAS
 from core.alerts.alert_engine import AlertEngine
 
-# 🔹 AUTOMAÇÃO COMPLETA
-import asyncio
-
 router = APIRouter(prefix="/meetings", tags=["Meetings"])
 
 # =====================================================
@@ -53,21 +47,6 @@ def meetings_health():
     }
 
 
-# ==========================
-# 🔹 UTIL — LOG DE EVENTOS (SAFE)
-# ==========================
-def log_event_safe(db: Session, event: ActivityEvent):
-    """
-    Registra evento sem quebrar o fluxo principal
-    """
-    try:
-        repo = ActivityLogRepository(db)
-        # como estamos em rota sync, chamamos o método async via loop
-        asyncio.create_task(repo.save(event))
-    except Exception as e:
-        print(f"[WARN] Falha ao registrar evento: {e}")
-
-
 # ==========================
 # SCHEMAS LOCAIS (para compatibilidade)
 # ==========================
@@ -86,6 +65,12 @@ class MeetingResponse(BaseModel):
     updated_at: datetime
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
+
+    @field_validator("participants", mode="before")
+    @classmethod
+    def participant_ids(cls, value):
+        # Relação do ORM (MeetingParticipant) -> ids dos usuários
+        return [getattr(p, "user_id", p) for p in value or []]
     
     class Config:
         from_attributes = True
@@ -97,18 +82,30 @@ class MeetingResponse(BaseModel):
 
 @router.get("/", response_model=List[MeetingResponse])
 def get_user_meetings(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     status: Optional[str] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_any_auth)
 ):
-    """Listar reuniões do usuário autenticado"""
+    """
+    Listar reuniões do usuário autenticado.
+    Próxima página: repita a chamada com `cursor` = header X-Next-Cursor
+    (ausente na última página).
+    """
     user_id = current_user.get("user_id")
     if not user_id:
         raise HTTPException(status_code=401, detail="Usuário não autenticado")
     
-    meetings = db_get_meetings(db, user_id=user_id, skip=skip, limit=limit, status=status)
+    try:
+        meetings = db_get_meetings(db, user_id=user_id, skip=skip, limit=limit, status=status, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if meetings and len(meetings) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(meetings[-1])
     return meetings
 
 
@@ -124,24 +121,9 @@ def create_new_meeting(
         raise HTTPException(status_code=401, detail="Usuário não autenticado")
     
     # Usa o controller real do banco de dados
+    # (o evento meeting.created vai no mesmo commit, via outbox)
     new_meeting = db_create_meeting(db, meeting, user_id)
 
-    # 🔹 EVENTO: reunião criada
-    log_event_safe(
-        db,
-        ActivityEvent(
-            type="meeting.created",
-            entity="meeting",
-            entity_id=str(new_meeting.id),
-            actor=str(user_id),
-            payload={
-                "title": new_meeting.title,
-                "scheduled_time": new_meeting.scheduled_time.isoformat(),
-                "participants": meeting.participants or []
-            }
-        )
-    )
-
     # 🔔 ALERT ENGINE: alertas inteligentes
     try:
         alert_engine = AlertEngine(db)
@@ -189,7 +171,7 @@ def get_single_meeting(
     if not user_id:
         raise HTTPException(status_code=401, detail="Usuário não autenticado")
     
-    meeting = db_get_meeting(db, meeting_id)
+    meeting = db_get_meeting(db, meeting_id, with_participants=True)
     if not meeting:
         raise HTTPException(status_code=404, detail="Reunião não encontrada")
     
@@ -220,24 +202,10 @@ def update_existing_meeting(
     if existing_meeting.organizer_id != user_id:
         raise HTTPException(status_code=403, detail="Apenas o organizador pode atualizar a reunião")
     
-    updated = db_update_meeting(db, meeting_id, meeting)
+    updated = db_update_meeting(db, meeting_id, meeting, actor=str(user_id))
     if not updated:
         raise HTTPException(status_code=404, detail="Reunião não encontrada")
 
-    # 🔹 EVENTO: reunião atualizada
-    log_event_safe(
-        db,
-        ActivityEvent(
-            type="meeting.updated",
-            entity="meeting",
-            entity_id=str(updated.id),
-            actor=str(user_id),
-            payload={
-                "updated_fields": list(meeting.model_dump(exclude_unset=True).keys())
-            }
-        )
-    )
-
     return updated
 
 
@@ -260,7 +228,7 @@ def delete_existing_meeting(
     if existing_meeting.organizer_id != user_id:
         raise HTTPException(status_code=403, detail="Apenas o organizador pode deletar a reunião")
     
-    success = db_delete_meeting(db, meeting_id)
+    success = db_delete_meeting(db, meeting_id, actor=str(user_id))
     if not success:
         raise HTTPException(status_code=404, detail="Reunião não encontrada")
     
@@ -286,24 +254,10 @@ def start_meeting_route(
     if existing_meeting.organizer_id != user_id:
         raise HTTPException(status_code=403, detail="Apenas o organizador pode iniciar a reunião")
     
-    started = db_start_meeting(db, meeting_id)
+    started = db_start_meeting(db, meeting_id, actor=str(user_id))
     if not started:
         raise HTTPException(status_code=404, detail="Reunião não encontrada")
 
-    # 🔹 EVENTO: reunião iniciada
-    log_event_safe(
-        db,
-        ActivityEvent(
-            type="meeting.started",
-            entity="meeting",
-            entity_id=str(started.id),
-            actor=str(user_id),
-            payload={
-                "started_at": started.started_at.isoformat() if started.started_at else None
-            }
-        )
-    )
-
     # 🔔 ALERT ENGINE: alertas inteligentes
     try:
         alert_engine = AlertEngine(db)
@@ -345,24 +299,10 @@ def complete_meeting_route(
     if existing_meeting.organizer_id != user_id:
         raise HTTPException(status_code=403, detail="Apenas o organizador pode concluir a reunião")
     
-    completed = db_complete_meeting(db, meeting_id)
+    completed = db_complete_meeting(db, meeting_id, actor=str(user_id))
     if not completed:
         raise HTTPException(status_code=404, detail="Reunião não encontrada")
 
-    # 🔹 EVENTO: reunião concluída
-    log_event_safe(
-        db,
-        ActivityEvent(
-            type="meeting.completed",
-            entity="meeting",
-            entity_id=str(completed.id),
-            actor=str(user_id),
-            payload={
-                "completed_at": completed.completed_at.isoformat() if completed.completed_at else None
-            }
-        )
-    )
-
     # 🔔 ALERT ENGINE: alertas inteligentes
     try:
         alert_engine = AlertEngine(db)
@@ -380,18 +320,8 @@ def complete_meeting_route(
     except Exception as e:
         print(f"[Alerts] Erro ao emitir alerta: {e}")
 
-    # 🚀 AUTOMAÇÃO: Tenta disparar orquestração em background
-    try:
-        from core.orchestrator.automation_orchestrator import AutomationOrchestrator
-        orchestrator = AutomationOrchestrator(db)
-        asyncio.create_task(
-            orchestrator.process_meeting_completion(completed)
-        )
-        print(f"[Automation] Automação disparada para reunião {completed.id}")
-    except ImportError:
-        print("[Automation] Módulo de automação não encontrado")
-    except Exception as e:
-        print(f"[Automation] Erro ao disparar automação: {e}")
+    # 🚀 AUTOMAÇÃO: o evento meeting.completed (gravado no outbox junto com
+    # a conclusão) é entregue pelo OutboxRelay ao handler do orquestrador
 
     return completed
 
@@ -407,7 +337,7 @@ def get_meeting_participants(
     if not user_id:
         raise HTTPException(status_code=401, detail="Usuário não autenticado")
     
-    meeting = db_get_meeting(db, meeting_id)
+    meeting = db_get_meeting(db, meeting_id, with_participants=True)
     if not meeting:
         raise HTTPException(status_code=404, detail="Reunião não encontrada")
     
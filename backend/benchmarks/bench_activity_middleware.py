@@ -0,0 +1,111 @@
+# backend/benchmarks/bench_activity_middleware.py
+#
+# Requests por segundo de um endpoint trivial com:
+#   - sem middleware
+#   - ActivityLogMiddleware antigo (BaseHTTPMiddleware + SessionLocal por request)
+#   - ActivityLogMiddleware atual (ASGI puro)
+#
+# Roda tudo em processo (httpx + ASGITransport), sem rede e sem banco:
+# o writer descarta os lotes e o EventProcessor é desligado, então a
+# diferença medida é só o custo do middleware.
+#
+# Uso:
+#   python benchmarks/bench_activity_middleware.py --requests 5000 --concurrency 50
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import httpx  # noqa: E402
+from fastapi import FastAPI, Request  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+from core.events.log_writer import activity_log_writer  # noqa: E402
+from core.middleware.activity_logger import ActivityLogMiddleware  # noqa: E402
+from database.session import SessionLocal  # noqa: E402
+
+activity_log_writer._write = lambda batch: len(batch)
+ActivityLogMiddleware._trigger_automated_processing = lambda self, event: None
+
+
+class LegacyActivityLogMiddleware(BaseHTTPMiddleware):
+    """Reproduz o desenho anterior: sessão por request + BaseHTTPMiddleware."""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.logger = ActivityLogMiddleware(app)
+
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.perf_counter()
+        db = SessionLocal()
+        request.state.db = db
+        try:
+            response = await call_next(request)
+            if self.logger._should_log_request(request.method, request.url.path):
+                self.logger._log_event(
+                    scope=request.scope,
+                    status_code=response.status_code,
+                    process_time=time.perf_counter() - start_time,
+                    ttfb=None,
+                    user_id=None,
+                )
+            return response
+        finally:
+            db.close()
+
+
+def build_app(middleware=None) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id, "status": "ok"}
+
+    if middleware is not None:
+        app.add_middleware(middleware)
+    return app
+
+
+async def run(app: FastAPI, requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(i):
+            async with semaphore:
+                response = await client.get(f"/api/items/{i}")
+                response.raise_for_status()
+
+        await one(0)  # aquecimento
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        return requests / (time.perf_counter() - start)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    activity_log_writer.start()
+    for name, middleware in [
+        ("sem middleware", None),
+        ("BaseHTTPMiddleware", LegacyActivityLogMiddleware),
+        ("ASGI puro", ActivityLogMiddleware),
+    ]:
+        rps = await run(build_app(middleware), args.requests, args.concurrency)
+        print(f"{name:<20} {rps:8.0f} req/s")
+
+    await activity_log_writer.close()
+    print(activity_log_writer.stats())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+# backend/benchmarks/bench_chat_stream.py
+#
+# Compara o tempo até o primeiro conteúdo visível:
+#   - POST /api/v1/chat         (resposta inteira de uma vez)
+#   - POST /api/v1/chat/stream  (SSE, primeiro token)
+#
+# Rode o backend apontando para o benchmarks/fake_llm_server.py
+# (OPENAI_BASE_URL) para números estáveis e sem custo.
+#
+# Uso:
+#   python benchmarks/bench_chat_stream.py --token <jwt> --requests 20 --concurrency 4
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+
+async def _blocking(client: httpx.AsyncClient, message: str):
+    start = time.perf_counter()
+    response = await client.post("/api/v1/chat", json={"message": message})
+    response.raise_for_status()
+    elapsed = (time.perf_counter() - start) * 1000
+    return elapsed, elapsed
+
+
+async def _streaming(client: httpx.AsyncClient, message: str):
+    start = time.perf_counter()
+    first = None
+    async with client.stream("POST", "/api/v1/chat/stream", json={"message": message}) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if first is None and line.startswith("data:") and '"token"' in line:
+                first = (time.perf_counter() - start) * 1000
+            if line.startswith("event: error"):
+                raise RuntimeError("stream retornou erro")
+    total = (time.perf_counter() - start) * 1000
+    return first if first is not None else total, total
+
+
+async def _run(call, client, args):
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(i):
+        async with semaphore:
+            return await call(client, f"Resumo das reuniões da semana ({i})")
+
+    return await asyncio.gather(*(one(i) for i in range(args.requests)))
+
+
+def _report(name: str, results):
+    firsts = sorted(r[0] for r in results)
+    totals = sorted(r[1] for r in results)
+    p95 = firsts[min(len(firsts) - 1, int(len(firsts) * 0.95))]
+    print(f"{name:<8} primeiro conteúdo p50 {statistics.median(firsts):7.1f} ms  p95 {p95:7.1f} ms"
+          f" | total p50 {statistics.median(totals):7.1f} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--token", required=True)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    headers = {"Authorization": f"Bearer {args.token}"}
+    async with httpx.AsyncClient(base_url=args.url, headers=headers, timeout=120) as client:
+        _report("/chat", await _run(_blocking, client, args))
+        _report("/stream", await _run(_streaming, client, args))
+
+        metrics = (await client.get("/api/v1/chat/stream/metrics")).json()
+        print(json.dumps(metrics, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,144 @@
+# backend/benchmarks/bench_meeting_stats.py
+#
+# /meetings/stats/summary: consultas e latência por chamada de
+#   - get_meeting_stats antigo (3 count() + próxima reunião = 4 consultas)
+#   - consulta única (contagens condicionais + próxima reunião), sem cache
+#   - consulta única com o cache por usuário (MEETING_STATS_TTL)
+#
+# Banco SQLite em memória com a tabela meetings populada; as consultas são
+# contadas pelo evento before_cursor_execute do engine.
+#
+# Uso:
+#   python benchmarks/bench_meeting_stats.py --users 50 --meetings 20000 --calls 2000
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, event, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from controllers.meeting import get_meeting_stats, meeting_stats_cache  # noqa: E402
+from models.meeting import Meeting  # noqa: E402
+from benchmarks.orm_stubs import configure_user_stubs  # noqa: E402
+
+configure_user_stubs()
+
+STATUSES = ["scheduled", "in_progress", "completed", "cancelled"]
+
+
+def legacy_meeting_stats(db, user_id: int):
+    """Reproduz o desenho anterior: uma consulta por número."""
+    scheduled = db.query(Meeting).filter(
+        Meeting.organizer_id == user_id, Meeting.status == "scheduled"
+    ).count()
+    in_progress = db.query(Meeting).filter(
+        Meeting.organizer_id == user_id, Meeting.status == "in_progress"
+    ).count()
+    completed = db.query(Meeting).filter(
+        Meeting.organizer_id == user_id, Meeting.status == "completed"
+    ).count()
+    next_meeting = db.query(Meeting).filter(
+        Meeting.organizer_id == user_id,
+        Meeting.status == "scheduled",
+        Meeting.scheduled_time >= datetime.utcnow()
+    ).order_by(Meeting.scheduled_time).first()
+    return {
+        "scheduled": scheduled,
+        "in_progress": in_progress,
+        "completed": completed,
+        "next_meeting": next_meeting.id if next_meeting else None,
+    }
+
+
+def build_db(users: int, meetings: int):
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    # Sem a FK para users (a tabela de usuários não entra no benchmark)
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE meetings (
+                id INTEGER PRIMARY KEY, title VARCHAR(200) NOT NULL, description TEXT,
+                scheduled_time DATETIME NOT NULL, duration_minutes INTEGER, location VARCHAR(200),
+                status VARCHAR(50), organizer_id INTEGER NOT NULL, agenda TEXT,
+                started_at DATETIME, completed_at DATETIME, created_at DATETIME, updated_at DATETIME
+            )
+        """))
+        conn.execute(text(
+            "CREATE INDEX idx_meetings_organizer_status_time ON meetings(organizer_id, status, scheduled_time)"
+        ))
+        now = datetime.utcnow()
+        conn.execute(
+            text("INSERT INTO meetings (title, scheduled_time, status, organizer_id) VALUES (:t, :s, :st, :o)"),
+            [
+                {
+                    "t": f"Reunião {i}",
+                    "s": now + timedelta(hours=random.randint(-2000, 2000)),
+                    "st": random.choice(STATUSES),
+                    "o": random.randint(1, users),
+                }
+                for i in range(meetings)
+            ],
+        )
+    return engine
+
+
+def measure(engine, fn, users: int, calls: int):
+    counter = {"queries": 0}
+
+    def count(*args):
+        counter["queries"] += 1
+
+    event.listen(engine, "before_cursor_execute", count)
+    db = sessionmaker(bind=engine)()
+    try:
+        start = time.perf_counter()
+        for i in range(calls):
+            fn(db, i % users + 1)
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+        event.remove(engine, "before_cursor_execute", count)
+    return counter["queries"] / calls, elapsed / calls * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--meetings", type=int, default=20000)
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+
+    engine = build_db(args.users, args.meetings)
+
+    # Mesmo resultado nas duas versões
+    db = sessionmaker(bind=engine)()
+    for user_id in range(1, args.users + 1):
+        new = get_meeting_stats(db, user_id)
+        old = legacy_meeting_stats(db, user_id)
+        assert {k: new[k] for k in old} == old, (user_id, old, new)
+    db.close()
+
+    def uncached(db, user_id):
+        meeting_stats_cache.clear()
+        return get_meeting_stats(db, user_id)
+
+    meeting_stats_cache.clear()
+    for name, fn in [
+        ("4 consultas (antigo)", legacy_meeting_stats),
+        ("consulta única", uncached),
+        ("consulta única + cache", get_meeting_stats),
+    ]:
+        queries, ms = measure(engine, fn, args.users, args.calls)
+        print(f"{name:<24} {queries:5.2f} consultas/chamada  {ms:7.3f} ms/chamada")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+# backend/benchmarks/check_meeting_queries.py
+#
+# Contagem de consultas SQL por request no router de /meetings.
+# Falha (exit 1) se alguma rota passar do limite ou se o número de
+# consultas crescer com o número de reuniões (regressão N+1).
+#
+# Roda em processo (TestClient) com SQLite em memória; auth e sessão
+# entram por dependency_overrides. As consultas são contadas pelo evento
+# before_cursor_execute do engine.
+#
+# Uso:
+#   python benchmarks/check_meeting_queries.py --small 5 --large 200
+
+import argparse
+import os
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "check-meeting-queries")
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import create_engine, event, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from api.routes.auth import require_any_auth  # noqa: E402
+from api.routes.meetings import router as meetings_router  # noqa: E402
+from controllers.meeting import meeting_stats_cache  # noqa: E402
+from database.session import get_db  # noqa: E402
+from models.meeting import Meeting, MeetingParticipant  # noqa: E402
+from benchmarks.orm_stubs import configure_user_stubs  # noqa: E402
+
+configure_user_stubs()
+
+USER_ID = 1
+PAGE = 20
+
+# Máximo de consultas por request (reunião + participantes num SELECT ... IN)
+BUDGETS = {
+    "GET /meetings/": 2,
+    "GET /meetings/?cursor": 2,
+    "GET /meetings/{id}": 2,
+    "GET /meetings/{id}/participants": 2,
+    "GET /meetings/stats/summary": 1,
+}
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+    @contextmanager
+    def measure(self):
+        start = self.count
+        result = {}
+        yield result
+        result["queries"] = self.count - start
+
+
+def build_client(meetings: int):
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    # Sem as FKs para users (a tabela de usuários não entra na verificação)
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE meetings (
+                id INTEGER PRIMARY KEY, title VARCHAR(200) NOT NULL, description TEXT,
+                scheduled_time DATETIME NOT NULL, duration_minutes INTEGER, location VARCHAR(200),
+                status VARCHAR(50), organizer_id INTEGER NOT NULL, agenda TEXT,
+                started_at DATETIME, completed_at DATETIME, created_at DATETIME, updated_at DATETIME
+            )
+        """))
+        conn.execute(text("""
+            CREATE TABLE meeting_participants (
+                id INTEGER PRIMARY KEY, meeting_id INTEGER NOT NULL, user_id INTEGER NOT NULL,
+                status VARCHAR(50), joined_at DATETIME, created_at DATETIME, updated_at DATETIME
+            )
+        """))
+        now = datetime.utcnow()
+        base = now.replace(minute=0, second=0, microsecond=0)
+        # Inserção pelas tabelas dos modelos: datas no mesmo formato que o ORM compara
+        conn.execute(
+            Meeting.__table__.insert(),
+            [
+                {
+                    "id": i,
+                    "title": f"Reunião {i}",
+                    # Horários repetidos de propósito: o cursor desempata pelo id
+                    "scheduled_time": base + timedelta(hours=(i // 3) - meetings // 6),
+                    "duration_minutes": 60,
+                    "status": "scheduled",
+                    "organizer_id": USER_ID if i % 2 else 2,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for i in range(1, meetings + 1)
+            ],
+        )
+        conn.execute(
+            MeetingParticipant.__table__.insert(),
+            [
+                {"meeting_id": i, "user_id": u, "status": "invited"}
+                for i in range(1, meetings + 1) for u in (USER_ID, 3, 4)
+            ],
+        )
+
+    SessionLocal = sessionmaker(bind=engine)
+
+    def override_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(meetings_router)
+    app.dependency_overrides[get_db] = override_db
+    app.dependency_overrides[require_any_auth] = lambda: {"user_id": USER_ID, "authenticated": True}
+    return TestClient(app), QueryCounter(engine)
+
+
+def run(meetings: int):
+    client, counter = build_client(meetings)
+    meeting_stats_cache.clear()
+    counts = {}
+
+    def call(name, url):
+        with counter.measure() as m:
+            response = client.get(url)
+        assert response.status_code == 200, (name, response.status_code, response.text)
+        counts[name] = max(counts.get(name, 0), m["queries"])
+        return response
+
+    first = call("GET /meetings/", f"/meetings/?limit={PAGE}")
+
+    # Keyset: percorre todas as páginas e compara com a listagem completa
+    seen = [m["id"] for m in first.json()]
+    cursor = first.headers.get("x-next-cursor")
+    while cursor:
+        page = call("GET /meetings/?cursor", f"/meetings/?limit={PAGE}&cursor={cursor}")
+        seen.extend(m["id"] for m in page.json())
+        cursor = page.headers.get("x-next-cursor")
+    full = [m["id"] for m in client.get(f"/meetings/?limit={meetings + 1}").json()]
+    assert seen == full, "paginação por cursor diferente da listagem completa"
+    assert len(seen) == len(set(seen)), "paginação por cursor repetiu reuniões"
+
+    meeting_id = full[0]
+    call("GET /meetings/{id}", f"/meetings/{meeting_id}")
+    call("GET /meetings/{id}/participants", f"/meetings/{meeting_id}/participants")
+    call("GET /meetings/stats/summary", "/meetings/stats/summary")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--small", type=int, default=5)
+    parser.add_argument("--large", type=int, default=200)
+    args = parser.parse_args()
+
+    small = run(args.small)
+    large = run(args.large)
+
+    failures = []
+    print(f"{'rota':<34} {'limite':>6} {args.small:>6} {args.large:>6}")
+    for name, budget in BUDGETS.items():
+        got = [small.get(name), large.get(name)]
+        measured = [g for g in got if g is not None]
+        ok = all(g <= budget for g in measured) and len(set(measured)) <= 1
+        cells = " ".join(f"{'-' if g is None else g:>6}" for g in got)
+        print(f"{name:<34} {budget:>6} {cells}  {'ok' if ok else 'FALHOU'}")
+        if not ok:
+            failures.append(name)
+
+    if failures:
+        print(f"❌ Consultas acima do limite (ou crescendo com as reuniões): {', '.join(failures)}")
+        sys.exit(1)
+    print("✅ Consultas por request dentro do limite")
+
+
+if __name__ == "__main__":
+    main()
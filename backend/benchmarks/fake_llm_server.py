@@ -0,0 +1,108 @@
+# backend/benchmarks/fake_llm_server.py
+#
+# Provedor falso compatível com a API da OpenAI (/v1/chat/completions com e
+# sem stream, /v1/embeddings) para rodar o backend e os benchmarks sem rede
+# e sem custo. Latência de primeiro token e entre tokens é configurável.
+#
+# Uso:
+#   python benchmarks/fake_llm_server.py --port 9100 --ttft-ms 400 --token-ms 25
+#   OPENAI_BASE_URL=http://127.0.0.1:9100/v1 OPENAI_API_KEY=fake-key-para-testes-local uvicorn main:app
+#   python benchmarks/bench_chat_stream.py --token <jwt>
+
+import argparse
+import asyncio
+import hashlib
+import json
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+REPLY = (
+    "📊 Resumo executivo: as reuniões da semana geraram 4 follow-ups, "
+    "2 deles vencem amanhã. ✅ Recomendo priorizar o fechamento com o "
+    "time comercial e revisar os KPIs de entrega na sexta-feira."
+)
+
+app = FastAPI(title="Fake LLM")
+settings = {"ttft_ms": 400.0, "token_ms": 25.0}
+
+
+def _tokens(text: str):
+    """Quebra a resposta em pedaços parecidos com tokens (palavra + espaço)."""
+    words = text.split(" ")
+    return [w + (" " if i < len(words) - 1 else "") for i, w in enumerate(words)]
+
+
+def _chunk(model: str, delta: dict, finish=None) -> str:
+    body = {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+    }
+    return f"data: {json.dumps(body, ensure_ascii=False)}\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model", "gpt-4o-mini")
+
+    if not body.get("stream"):
+        # Sem stream o cliente espera a geração inteira
+        tokens = _tokens(REPLY)
+        await asyncio.sleep((settings["ttft_ms"] + settings["token_ms"] * len(tokens)) / 1000)
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": REPLY}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": len(tokens), "total_tokens": len(tokens)},
+        }
+
+    async def stream():
+        await asyncio.sleep(settings["ttft_ms"] / 1000)
+        yield _chunk(model, {"role": "assistant"})
+        for token in _tokens(REPLY):
+            yield _chunk(model, {"content": token})
+            await asyncio.sleep(settings["token_ms"] / 1000)
+        yield _chunk(model, {}, finish="stop")
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+@app.post("/v1/embeddings")
+async def embeddings(request: Request):
+    body = await request.json()
+    inputs = body.get("input") or []
+    if isinstance(inputs, str):
+        inputs = [inputs]
+
+    data = []
+    for i, text in enumerate(inputs):
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        data.append({"index": i, "object": "embedding", "embedding": [b / 255 for b in digest] * 48})
+    return {"object": "list", "data": data, "model": body.get("model")}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--ttft-ms", type=float, default=400)
+    parser.add_argument("--token-ms", type=float, default=25)
+    args = parser.parse_args()
+
+    settings["ttft_ms"] = args.ttft_ms
+    settings["token_ms"] = args.token_ms
+    print(f"🧪 Fake LLM em http://{args.host}:{args.port}/v1 "
+          f"(TTFT {args.ttft_ms:.0f} ms, {args.token_ms:.0f} ms/token)")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,13 @@
 # backend/controllers/meeting.py
 
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+import base64
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import desc, func, select, true, tuple_
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
@@ -10,7 +16,7 @@ from schemas.meeting import MeetingCreate, MeetingUpdate
 
 # 🔹 AUTOMAÇÃO / EVENTOS
 from core.events.activity_log import ActivityEvent
-from db.repositories.activity_log_repository import ActivityLogRepository
+from db.repositories.outbox_repository import stage_event
 
 
 # ===============================
@@ -18,22 +24,92 @@ from db.repositories.activity_log_repository import ActivityLogRepository
 # ===============================
 def log_event_safe(db: Session, event: ActivityEvent):
     """
-    Registra evento sem quebrar o fluxo principal
+    Registra evento no outbox, na mesma transação da mudança
+    (sai no próximo commit do chamador; o OutboxRelay entrega)
     """
     try:
-        repo = ActivityLogRepository(db)
-        repo.save_sync(event)   # 🔥 síncrono, seguro
+        stage_event(db, event)
     except Exception as e:
         print(f"[WARN] Falha ao registrar evento: {e}")
 
 
+# ===============================
+# CACHE: estatísticas por usuário
+# ===============================
+# Curto: só outros workers enxergam o valor antigo (o próprio processo invalida)
+MEETING_STATS_TTL = float(os.getenv("MEETING_STATS_TTL", "10"))
+MEETING_STATS_CACHE_MAX = int(os.getenv("MEETING_STATS_CACHE_MAX", "5000"))
+
+
+class MeetingStatsCache:
+    """
+    Estatísticas de /meetings/stats/summary por organizador (TTL + LRU).
+    create/update/start/complete/delete invalidam o organizador após o commit.
+    """
+
+    def __init__(self, ttl: float = MEETING_STATS_TTL, max_entries: int = MEETING_STATS_CACHE_MAX):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] <= time.monotonic():
+                self._entries.pop(user_id, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return dict(entry[1])
+
+    def put(self, user_id: int, stats: Dict[str, Any]):
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, dict(stats))
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+meeting_stats_cache = MeetingStatsCache()
+
+
 # ===============================
 # CRUD REUNIÕES
 # ===============================
 
-def get_meeting(db: Session, meeting_id: int) -> Optional[Meeting]:
-    """Busca uma reunião pelo ID"""
-    return db.query(Meeting).filter(Meeting.id == meeting_id).first()
+def get_meeting(db: Session, meeting_id: int, with_participants: bool = False) -> Optional[Meeting]:
+    """Busca uma reunião pelo ID (participantes na mesma ida, se pedidos)"""
+    query = db.query(Meeting)
+    if with_participants:
+        query = query.options(selectinload(Meeting.participants))
+    return query.filter(Meeting.id == meeting_id).first()
+
+
+def encode_cursor(meeting: Meeting) -> str:
+    """Cursor opaco da paginação: (scheduled_time, id) da última reunião da página"""
+    raw = f"{meeting.scheduled_time.isoformat()}|{meeting.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    """(scheduled_time, id); ValueError se o cursor não é válido"""
+    try:
+        scheduled_time, meeting_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(scheduled_time), int(meeting_id)
+    except Exception as e:
+        raise ValueError(f"Cursor inválido: {cursor}") from e
 
 
 def get_meetings(
@@ -41,10 +117,18 @@ def get_meetings(
     user_id: int,
     skip: int = 0,
     limit: int = 100,
-    status: Optional[str] = None
+    status: Optional[str] = None,
+    cursor: Optional[str] = None
 ) -> List[Meeting]:
-    """Busca reuniões de um usuário"""
-    query = db.query(Meeting).filter(
+    """
+    Busca reuniões de um usuário (mais recentes primeiro).
+
+    Com `cursor` a página começa depois da reunião do cursor
+    (keyset em (scheduled_time, id): custo não cresce com a página);
+    `skip` (OFFSET) fica para compatibilidade. Participantes vêm num
+    único SELECT ... IN para a página inteira.
+    """
+    query = db.query(Meeting).options(selectinload(Meeting.participants)).filter(
         (Meeting.organizer_id == user_id) |
         (Meeting.participants.any(user_id=user_id))
     )
@@ -52,7 +136,12 @@ def get_meetings(
     if status:
         query = query.filter(Meeting.status == status)
 
-    return query.order_by(desc(Meeting.scheduled_time)).offset(skip).limit(limit).all()
+    if cursor:
+        query = query.filter(tuple_(Meeting.scheduled_time, Meeting.id) < decode_cursor(cursor))
+    elif skip:
+        query = query.offset(skip)
+
+    return query.order_by(desc(Meeting.scheduled_time), desc(Meeting.id)).limit(limit).all()
 
 
 def create_meeting(db: Session, meeting: MeetingCreate, organizer_id: int) -> Meeting:
@@ -69,8 +158,7 @@ def create_meeting(db: Session, meeting: MeetingCreate, organizer_id: int) -> Me
     )
 
     db.add(db_meeting)
-    db.commit()
-    db.refresh(db_meeting)
+    db.flush()  # gera o id sem fechar a transação
 
     # Adiciona participantes
     if meeting.participants:
@@ -82,8 +170,6 @@ def create_meeting(db: Session, meeting: MeetingCreate, organizer_id: int) -> Me
             )
             db.add(participant)
 
-    db.commit()
-
     # 🔹 EVENTO: reunião criada
     log_event_safe(
         db,
@@ -100,10 +186,16 @@ def create_meeting(db: Session, meeting: MeetingCreate, organizer_id: int) -> Me
         )
     )
 
+    # Reunião, participantes e evento num único commit
+    db.commit()
+    db.refresh(db_meeting)
+    meeting_stats_cache.invalidate(db_meeting.organizer_id)
+
     return db_meeting
 
 
-def update_meeting(db: Session, meeting_id: int, meeting: MeetingUpdate) -> Optional[Meeting]:
+def update_meeting(db: Session, meeting_id: int, meeting: MeetingUpdate,
+                   actor: str = "system") -> Optional[Meeting]:
     """Atualiza uma reunião existente"""
     db_meeting = get_meeting(db, meeting_id)
     if not db_meeting:
@@ -115,8 +207,6 @@ def update_meeting(db: Session, meeting_id: int, meeting: MeetingUpdate) -> Opti
         setattr(db_meeting, field, value)
 
     db_meeting.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(db_meeting)
 
     # 🔹 EVENTO: reunião atualizada
     log_event_safe(
@@ -125,24 +215,27 @@ def update_meeting(db: Session, meeting_id: int, meeting: MeetingUpdate) -> Opti
             type="meeting.updated",
             entity="meeting",
             entity_id=str(db_meeting.id),
-            actor="system",
+            actor=actor,
             payload={
                 "updated_fields": list(update_data.keys())
             }
         )
     )
 
+    db.commit()
+    db.refresh(db_meeting)
+    meeting_stats_cache.invalidate(db_meeting.organizer_id)
+
     return db_meeting
 
 
-def delete_meeting(db: Session, meeting_id: int) -> bool:
+def delete_meeting(db: Session, meeting_id: int, actor: str = "system") -> bool:
     """Deleta uma reunião (soft delete)"""
     db_meeting = get_meeting(db, meeting_id)
     if not db_meeting:
         return False
 
     db_meeting.status = "cancelled"
-    db.commit()
 
     # 🔹 EVENTO: reunião cancelada
     log_event_safe(
@@ -151,15 +244,18 @@ def delete_meeting(db: Session, meeting_id: int) -> bool:
             type="meeting.cancelled",
             entity="meeting",
             entity_id=str(db_meeting.id),
-            actor="system",
+            actor=actor,
             payload={}
         )
     )
 
+    db.commit()
+    meeting_stats_cache.invalidate(db_meeting.organizer_id)
+
     return True
 
 
-def start_meeting(db: Session, meeting_id: int) -> Optional[Meeting]:
+def start_meeting(db: Session, meeting_id: int, actor: str = "system") -> Optional[Meeting]:
     """Inicia uma reunião"""
     db_meeting = get_meeting(db, meeting_id)
     if not db_meeting:
@@ -168,8 +264,6 @@ def start_meeting(db: Session, meeting_id: int) -> Optional[Meeting]:
     db_meeting.status = "in_progress"
     db_meeting.started_at = datetime.utcnow()
     db_meeting.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(db_meeting)
 
     # 🔹 EVENTO: reunião iniciada
     log_event_safe(
@@ -178,17 +272,21 @@ def start_meeting(db: Session, meeting_id: int) -> Optional[Meeting]:
             type="meeting.started",
             entity="meeting",
             entity_id=str(db_meeting.id),
-            actor="system",
+            actor=actor,
             payload={
                 "started_at": db_meeting.started_at.isoformat()
             }
         )
     )
 
+    db.commit()
+    db.refresh(db_meeting)
+    meeting_stats_cache.invalidate(db_meeting.organizer_id)
+
     return db_meeting
 
 
-def complete_meeting(db: Session, meeting_id: int) -> Optional[Meeting]:
+def complete_meeting(db: Session, meeting_id: int, actor: str = "system") -> Optional[Meeting]:
     """Marca uma reunião como concluída"""
     db_meeting = get_meeting(db, meeting_id)
     if not db_meeting:
@@ -197,56 +295,73 @@ def complete_meeting(db: Session, meeting_id: int) -> Optional[Meeting]:
     db_meeting.status = "completed"
     db_meeting.completed_at = datetime.utcnow()
     db_meeting.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(db_meeting)
 
-    # 🔹 EVENTO: reunião concluída
+    # 🔹 EVENTO: reunião concluída (handler do orquestrador usa título/organizador)
     log_event_safe(
         db,
         ActivityEvent(
             type="meeting.completed",
             entity="meeting",
             entity_id=str(db_meeting.id),
-            actor="system",
+            actor=actor,
             payload={
-                "completed_at": db_meeting.completed_at.isoformat()
+                "completed_at": db_meeting.completed_at.isoformat(),
+                "title": db_meeting.title,
+                "organizer_id": db_meeting.organizer_id
             }
         )
     )
 
+    db.commit()
+    db.refresh(db_meeting)
+    meeting_stats_cache.invalidate(db_meeting.organizer_id)
+
     return db_meeting
 
 
 def get_meeting_stats(db: Session, user_id: int) -> Dict[str, Any]:
-    """Retorna estatísticas de reuniões"""
-    scheduled = db.query(Meeting).filter(
-        Meeting.organizer_id == user_id,
-        Meeting.status == "scheduled"
-    ).count()
-
-    in_progress = db.query(Meeting).filter(
-        Meeting.organizer_id == user_id,
-        Meeting.status == "in_progress"
-    ).count()
-
-    completed = db.query(Meeting).filter(
-        Meeting.organizer_id == user_id,
-        Meeting.status == "completed"
-    ).count()
-
-    next_meeting = db.query(Meeting).filter(
-        Meeting.organizer_id == user_id,
-        Meeting.status == "scheduled",
-        Meeting.scheduled_time >= datetime.utcnow()
-    ).order_by(Meeting.scheduled_time).first()
-
-    return {
-        "scheduled": scheduled,
-        "in_progress": in_progress,
-        "completed": completed,
-        "next_meeting": next_meeting.id if next_meeting else None,
-        "next_meeting_time": next_meeting.scheduled_time if next_meeting else None
+    """
+    Retorna estatísticas de reuniões (uma ida ao banco: contagens
+    condicionais + próxima reunião; em cache por MEETING_STATS_TTL)
+    """
+    cached = meeting_stats_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    counts = (
+        select(
+            func.count().filter(Meeting.status == "scheduled").label("scheduled"),
+            func.count().filter(Meeting.status == "in_progress").label("in_progress"),
+            func.count().filter(Meeting.status == "completed").label("completed"),
+        )
+        .where(Meeting.organizer_id == user_id)
+        .subquery()
+    )
+    next_meeting = (
+        select(Meeting.id, Meeting.scheduled_time)
+        .where(
+            Meeting.organizer_id == user_id,
+            Meeting.status == "scheduled",
+            Meeting.scheduled_time >= datetime.utcnow()
+        )
+        .order_by(Meeting.scheduled_time)
+        .limit(1)
+        .subquery()
+    )
+    row = db.execute(
+        select(counts, next_meeting.c.id, next_meeting.c.scheduled_time)
+        .select_from(counts.outerjoin(next_meeting, true()))
+    ).one()
+
+    stats = {
+        "scheduled": row.scheduled,
+        "in_progress": row.in_progress,
+        "completed": row.completed,
+        "next_meeting": row.id,
+        "next_meeting_time": row.scheduled_time
     }
+    meeting_stats_cache.put(user_id, stats)
+    return stats
 
 # ===============================
 # FUNÇÃO DE TESTE PARA AUTOMAÇÃO
@@ -85,19 +85,27 @@ class AlertEngine:
         # REGISTRA ALERTAS COMO EVENTOS
         # ===============================
         for alert in alerts:
-            alert_event = ActivityEvent(
-                type="alert.created",
-                entity="alert",
-                entity_id=alert.id,
-                actor="ALERT_ENGINE",
-                payload={
-                    "level": alert.level,
-                    "title": alert.title,
-                    "description": alert.description,
-                    "source_event_id": alert.source_event_id,
-                    "data": alert.payload
-                }
-            )
-            await self.repo.save(alert_event)
+            await self.save_alert(alert)
 
         return alerts
+
+    async def save_alert(self, alert: Alert, commit: bool = True):
+        """
+        Grava o alerta como evento alert.created (lido por /api/v1/alerts).
+        commit=False só faz flush (transação do chamador, ex.: OutboxRelay).
+        """
+        alert_event = ActivityEvent(
+            type="alert.created",
+            entity="alert",
+            entity_id=alert.id,
+            actor="ALERT_ENGINE",
+            payload={
+                "alert_id": alert.id,  # activity_logs não guarda entity_id
+                "level": alert.level,
+                "title": alert.title,
+                "description": alert.description,
+                "source_event_id": alert.source_event_id,
+                "data": alert.payload
+            }
+        )
+        return await self.repo.save(alert_event, commit=commit)
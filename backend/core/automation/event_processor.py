@@ -161,4 +161,35 @@ def get_event_processor(db: Session) -> EventProcessor:
     global _event_processor_instance
     if _event_processor_instance is None:
         _event_processor_instance = EventProcessor(db)
-    return _event_processor_instance
\ No newline at end of file
+    return _event_processor_instance
+
+
+# =========================
+# HANDLERS DO EVENTBUS
+# =========================
+async def process_event_handler(event: ActivityEvent, db: Session):
+    """Memória + alertas automáticos para cada evento (sessão do worker do bus)"""
+    # Request HTTP do middleware é telemetria: não vira memória nem embedding
+    # (memory_index e insights também ignoram)
+    if event.entity == "http_request":
+        return
+    await EventProcessor(db).process_event(event)
+
+
+def register_event_handlers(bus):
+    """Registra os handlers de automação no EventBus (chamado no lifespan)"""
+    bus.subscribe("*", process_event_handler)
+
+    # Memória em RAM: recebe os eventos de domínio (outbox/EventBus)
+    from core.memory.memory_index import memory_index
+    bus.subscribe("*", memory_index.handle)
+
+    # KPIs semanais de reuniões (meeting_weekly_stats)
+    from core.events.meeting_stats import meeting_stats_handler
+    bus.subscribe("meeting.*", meeting_stats_handler)
+
+    try:
+        from core.orchestrator.automation_orchestrator import meeting_completed_handler
+        bus.subscribe("meeting.completed", meeting_completed_handler)
+    except ImportError:
+        print("[Automation] Módulo de automação não encontrado")
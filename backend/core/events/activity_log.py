@@ -17,6 +17,6 @@ class ActivityEvent(BaseModel):
     def __init__(self, **data):
         super().__init__(**data)
         if not self.id:
-            self.id = f"evt_{uuid4().hex[:8]}"
+            self.id = f"evt_{uuid4().hex}"  # 128 bits: chave de idempotência (outbox, meeting_stats)
         if not self.timestamp:
             self.timestamp = datetime.utcnow()
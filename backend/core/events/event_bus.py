@@ -0,0 +1,373 @@
+#E:\MAWDSLEYS-AGENTE\backend\core\events\event_bus.py
+
+import asyncio
+import inspect
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from core.events.activity_log import ActivityEvent
+
+# =========================
+# CONFIG
+# =========================
+WORKERS = int(os.getenv("EVENT_BUS_WORKERS", "4"))
+QUEUE_SIZE = int(os.getenv("EVENT_BUS_QUEUE_SIZE", "5000"))
+MAX_ATTEMPTS = int(os.getenv("EVENT_BUS_MAX_ATTEMPTS", "5"))
+RETRY_BASE_SECONDS = float(os.getenv("EVENT_BUS_RETRY_SECONDS", "5"))
+RETRY_MAX_SECONDS = float(os.getenv("EVENT_BUS_RETRY_MAX_SECONDS", "600"))
+SHUTDOWN_TIMEOUT = float(os.getenv("EVENT_BUS_SHUTDOWN_TIMEOUT", "10"))
+
+# handler(event, db) — db é a sessão do worker que está entregando;
+# sync ou async, roda numa thread de entrega
+Handler = Callable[[ActivityEvent, Session], Optional[Awaitable[None]]]
+
+# [(handler, erro)] dos handlers que falharam numa entrega
+Failures = List[Tuple[str, str]]
+
+
+def _handler_name(handler) -> str:
+    return f"{handler.__module__}.{getattr(handler, '__qualname__', repr(handler))}"
+
+
+class SavepointEscaped(RuntimeError):
+    """
+    Handler rodando sob savepoint=True fez commit/rollback na sessão do
+    chamador: a transação do lote (e as travas do relay) já não existe
+    """
+
+
+def retry_delay(attempts: int) -> float:
+    """Backoff exponencial entre novas tentativas de um handler."""
+    return min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+
+
+_thread_state = threading.local()
+
+
+def _run_awaitable(awaitable):
+    """
+    Handler async chamado numa thread de entrega: roda no loop próprio da
+    thread (um por thread, reaproveitado entre entregas)
+    """
+    loop = getattr(_thread_state, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = _thread_state.loop = asyncio.new_event_loop()
+
+    async def wait():
+        return await awaitable
+
+    return loop.run_until_complete(wait())
+
+
+def _default_session() -> Session:
+    from database.session import SessionLocal
+    return SessionLocal()
+
+
+# =========================
+# BUS
+# =========================
+class EventBus:
+    """
+    Entrega ActivityEvents aos handlers registrados por tipo.
+
+    - publish() coloca o evento numa fila asyncio limitada (não bloqueia)
+    - N workers consomem a fila; cada um tem a sua própria sessão de banco
+    - Os handlers (e o commit) de cada entrega rodam numa thread, fora do
+      event loop: handler pode fazer I/O síncrono de banco à vontade.
+      Handler async roda no loop da thread de entrega, não no da aplicação
+    - Handlers por tipo exato ("meeting.created"), prefixo ("meeting.*") ou "*"
+    - Entrega pelo menos uma vez: evento que não coube na fila ou ainda
+      estava na fila no shutdown vai para o event_outbox, e handler que
+      falhou ganha uma linha própria lá; o OutboxRelay reentrega
+      (handlers precisam ser idempotentes)
+    """
+
+    def __init__(self, workers: int = WORKERS, max_queue: int = QUEUE_SIZE,
+                 max_attempts: int = MAX_ATTEMPTS,
+                 session_factory: Callable[[], Session] = _default_session):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_attempts = max_attempts
+        self._session_factory = session_factory
+
+        self._handlers: Dict[str, List[Handler]] = defaultdict(list)
+        self._by_name: Dict[str, Handler] = {}
+        self._resolved: Dict[str, List[Handler]] = {}
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: List[asyncio.Task] = []
+        self._closing = False
+        self._spill_lock = threading.Lock()
+        self._spill_buffer: List[ActivityEvent] = []
+        self._spill_scheduled = False
+
+        self.published = 0
+        self.delivered = 0
+        self.failed = 0
+        self.spilled = 0
+        self.max_depth = 0
+        self.lag_ms_last = 0.0
+        self.lag_ms_max = 0.0
+        self._lag_ms_avg = 0.0
+
+    # =========================
+    # REGISTRO
+    # =========================
+    def subscribe(self, pattern: str, handler: Optional[Handler] = None):
+        """
+        Registra handler para um tipo: bus.subscribe("meeting.*", fn)
+        ou como decorator: @bus.subscribe("alert.created")
+        """
+        def register(fn: Handler) -> Handler:
+            self._handlers[pattern].append(fn)
+            self._by_name[_handler_name(fn)] = fn
+            self._resolved.clear()
+            return fn
+
+        return register(handler) if handler is not None else register
+
+    def handlers_for(self, event_type: str) -> List[Handler]:
+        handlers = self._resolved.get(event_type)
+        if handlers is None:
+            handlers = list(self._handlers.get(event_type, ()))
+            for pattern, registered in self._handlers.items():
+                if pattern == "*" or (pattern.endswith(".*") and event_type.startswith(pattern[:-1])):
+                    handlers.extend(registered)
+            self._resolved[event_type] = handlers
+        return handlers
+
+    # =========================
+    # CICLO DE VIDA
+    # =========================
+    def start(self):
+        """Inicia os workers no loop atual (idempotente)."""
+        if self._tasks:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._closing = False
+        self._tasks = [self._loop.create_task(self._worker(i)) for i in range(self.workers)]
+        print(f"[EventBus] ✅ {self.workers} workers, {sum(map(len, self._handlers.values()))} handlers")
+
+    async def close(self, timeout: float = SHUTDOWN_TIMEOUT):
+        """Para de aceitar eventos, drena a fila e guarda o resto no outbox."""
+        if not self._tasks:
+            return
+        self._closing = True
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        leftover = []
+        while not self._queue.empty():
+            leftover.append(self._queue.get_nowait())
+        if leftover:
+            await asyncio.to_thread(self._spill, leftover)
+        print(f"[EventBus] 👋 Encerrado: {self.delivered} entregues, {len(leftover)} guardados no outbox")
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "published": self.published,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "spilled": self.spilled,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_depth": self.max_depth,
+            "max_queue": self.max_queue,
+            "lag_ms_last": self.lag_ms_last,
+            "lag_ms_avg": round(self._lag_ms_avg, 2),
+            "lag_ms_max": self.lag_ms_max,
+            "workers": self.workers,
+            "running": bool(self._tasks),
+        }
+
+    # =========================
+    # PUBLICAÇÃO
+    # =========================
+    def publish(self, event: ActivityEvent) -> bool:
+        """
+        Agenda a entrega do evento. Nunca bloqueia; pode ser chamado do
+        loop ou de rotas sync (threadpool). Sem handler para o tipo, não faz nada.
+        """
+        if not self.handlers_for(event.type):
+            return False
+        self.published += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop is not self._loop and self._loop is not None:
+            # Outra thread (rota sync) ou o loop de uma thread de entrega
+            loop = None
+
+        if loop is None:
+            if self._loop is not None and self._loop.is_running() and not self._closing:
+                self._loop.call_soon_threadsafe(self._put, event)
+            else:
+                # Sem loop (scripts/jobs) ou encerrando: fica no outbox
+                self._spill([event])
+            return True
+
+        if not self._tasks:
+            self.start()
+        self._put(event)
+        return True
+
+    def _put(self, event: ActivityEvent):
+        if self._closing:
+            self._spill_later(event)
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Backpressure: o evento não se perde, vai para o outbox
+            self._spill_later(event)
+            return
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+
+    def _spill_later(self, event: ActivityEvent):
+        # Junta os transbordos num único commit em vez de um por evento
+        with self._spill_lock:
+            self._spill_buffer.append(event)
+            if self._spill_scheduled:
+                return
+            self._spill_scheduled = True
+        self._loop.run_in_executor(None, self._flush_spill)
+
+    def _flush_spill(self):
+        with self._spill_lock:
+            events, self._spill_buffer = self._spill_buffer, []
+            self._spill_scheduled = False
+        self._spill(events)
+
+    def _spill(self, events: List[ActivityEvent]):
+        from database.session import db_session
+        from db.repositories.outbox_repository import OutboxRepository
+
+        try:
+            with db_session() as db:
+                repo = OutboxRepository(db)
+                for event in events:
+                    # Já foi para o activity_logs pelo writer: o relay só entrega
+                    repo.add(event, logged=True)
+            self.spilled += len(events)
+        except Exception as e:
+            print(f"[EventBus] ❌ Erro ao gravar {len(events)} eventos no outbox: {e}")
+
+    # =========================
+    # ENTREGA
+    # =========================
+    async def dispatch(self, event: ActivityEvent, db: Session, only: Optional[str] = None,
+                       savepoint: bool = False) -> Failures:
+        """
+        Roda os handlers do evento (ou só o `only`) na sessão dada.
+        savepoint=True isola cada handler num SAVEPOINT em vez de commit
+        (usado pelo relay, que confirma o lote inteiro no fim). Nesse modo
+        o handler só pode dar flush; se ele encerrar a transação do
+        chamador, levanta SavepointEscaped em vez de seguir com o lote.
+
+        Os handlers rodam numa thread (asyncio.to_thread): o event loop
+        segue atendendo requests enquanto eles usam o banco.
+        """
+        if only is not None:
+            handler = self._by_name.get(only)
+            handlers = [handler] if handler is not None else []
+        else:
+            handlers = self.handlers_for(event.type)
+        if not handlers:
+            return []
+        return await asyncio.to_thread(self._dispatch_sync, event, db, handlers, savepoint)
+
+    def _dispatch_sync(self, event: ActivityEvent, db: Session, handlers: List[Handler],
+                       savepoint: bool) -> Failures:
+        failures: Failures = []
+        for handler in handlers:
+            nested = db.begin_nested() if savepoint else None
+            try:
+                result = handler(event, db)
+                if inspect.isawaitable(result):
+                    _run_awaitable(result)
+                if nested is not None:
+                    if not nested.is_active:
+                        raise SavepointEscaped(
+                            f"{_handler_name(handler)} encerrou a transação do chamador ({event.type})"
+                        )
+                    nested.commit()
+                else:
+                    db.commit()
+            except SavepointEscaped:
+                raise
+            except Exception as e:
+                if nested is not None:
+                    if not nested.is_active:
+                        raise SavepointEscaped(
+                            f"{_handler_name(handler)} encerrou a transação do chamador ({event.type})"
+                        ) from e
+                    nested.rollback()
+                else:
+                    db.rollback()
+                failures.append((_handler_name(handler), f"{type(e).__name__}: {e}"))
+        return failures
+
+    async def _worker(self, index: int):
+        db = self._session_factory()
+        try:
+            while True:
+                event = await self._queue.get()
+                try:
+                    await self._deliver(event, db)
+                finally:
+                    self._queue.task_done()
+        finally:
+            db.close()
+
+    async def _deliver(self, event: ActivityEvent, db: Session):
+        if event.timestamp is not None:
+            lag = max(0.0, (datetime.utcnow() - event.timestamp).total_seconds() * 1000)
+            self.lag_ms_last = round(lag, 2)
+            self.lag_ms_max = max(self.lag_ms_max, self.lag_ms_last)
+            self._lag_ms_avg = lag if not self._lag_ms_avg else 0.9 * self._lag_ms_avg + 0.1 * lag
+
+        failures = await self.dispatch(event, db)
+        if not failures:
+            self.delivered += 1
+            return
+
+        self.failed += 1
+        print(f"[EventBus] ⚠️ {event.type}: {len(failures)} handler(s) falharam")
+        await asyncio.to_thread(self._retry_later, event, failures)
+
+    def _retry_later(self, event: ActivityEvent, failures: Failures):
+        from database.session import db_session
+        from db.repositories.outbox_repository import OutboxRepository
+
+        try:
+            with db_session() as db:
+                OutboxRepository(db).record_failures(
+                    None, event, None, 1, failures, self.max_attempts, retry_delay(1)
+                )
+        except Exception as e:
+            print(f"[EventBus] ❌ Erro ao reagendar {event.type}: {e}")
+
+
+# Instância compartilhada pelo processo (middleware, rotas e jobs)
+event_bus = EventBus()
+
+
+def get_event_bus() -> EventBus:
+    return event_bus
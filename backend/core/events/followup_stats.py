@@ -0,0 +1,99 @@
+#E:\MAWDSLEYS-AGENTE\backend\core\events\followup_stats.py
+
+import asyncio
+import os
+import time
+from typing import Dict, Optional
+
+from db.repositories.followup_stats_repository import FollowupStatsRepository
+
+# =========================
+# CONFIG
+# =========================
+# Intervalo da recontagem do followup_stats no processo da API (0 = desligado)
+RECONCILE_SECONDS = float(os.getenv("FOLLOWUP_STATS_RECONCILE_SECONDS", "900"))
+
+
+def reconcile() -> int:
+    """Recontagem completa do followup_stats numa transação"""
+    from database.session import db_session
+
+    with db_session() as db:
+        rows = FollowupStatsRepository(db).reconcile()
+    print(f"[FollowupStats] ✅ {rows} linhas ritual/status recalculadas")
+    return rows
+
+
+class FollowupStatsReconciler:
+    """
+    A ingestão só soma follow-ups novos; status alterados ou follow-ups
+    removidos por outros caminhos fazem os contadores derivarem. Esta
+    tarefa refaz o followup_stats a cada RECONCILE_SECONDS (iniciada no
+    lifespan) ou por cron: python -m core.events.followup_stats
+    """
+
+    def __init__(self, interval: float = RECONCILE_SECONDS):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+        self.runs = 0
+        self.last_rows = 0
+        self.last_run_ms = 0.0
+        self.last_error: Optional[str] = None
+
+    def start(self):
+        if self.interval <= 0:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "runs": self.runs,
+            "last_rows": self.last_rows,
+            "last_run_ms": self.last_run_ms,
+            "last_error": self.last_error,
+            "running": self._task is not None and not self._task.done(),
+        }
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await asyncio.to_thread(self.run_once)
+
+    def run_once(self) -> bool:
+        started = time.perf_counter()
+        try:
+            self.last_rows = reconcile()
+            self.runs += 1
+            self.last_error = None
+            return True
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"[FollowupStats] ❌ Erro na recontagem: {e}")
+            return False
+        finally:
+            self.last_run_ms = round((time.perf_counter() - started) * 1000, 2)
+
+
+# Instância compartilhada pelo processo (iniciada no lifespan)
+followup_stats_reconciler = FollowupStatsReconciler()
+
+
+def get_followup_stats_reconciler() -> FollowupStatsReconciler:
+    return followup_stats_reconciler
+
+
+if __name__ == "__main__":
+    # python -m core.events.followup_stats
+    reconcile()
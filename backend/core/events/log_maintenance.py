@@ -0,0 +1,370 @@
+#E:\MAWDSLEYS-AGENTE\backend\core\events\log_maintenance.py
+
+import asyncio
+import os
+import re
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+# =========================
+# CONFIG
+# =========================
+# Partições mensais criadas à frente do mês atual
+MONTHS_AHEAD = int(os.getenv("ACTIVITY_LOG_MONTHS_AHEAD", "2"))
+# Eventos HTTP brutos mais velhos que isso viram agregados por hora
+RAW_RETENTION_DAYS = int(os.getenv("ACTIVITY_LOG_RAW_RETENTION_DAYS", "30"))
+# Partições inteiras mais velhas que isso são removidas (0 = nunca)
+RETENTION_MONTHS = int(os.getenv("ACTIVITY_LOG_RETENTION_MONTHS", "0"))
+# Intervalo entre execuções do job no processo da API
+MAINTENANCE_SECONDS = float(os.getenv("ACTIVITY_LOG_MAINTENANCE_SECONDS", "3600"))
+MAINTENANCE_ENABLED = os.getenv("ACTIVITY_LOG_MAINTENANCE", "true").lower() == "true"
+
+# Tipos gerados pelo ActivityLogMiddleware para cada request HTTP
+# (api.get, meeting.post, chat.delete...); eventos de domínio ficam brutos
+HTTP_ACTION_PATTERN = r"^(api|meeting|chat)\.(get|post|put|delete|patch)$"
+
+# Uma instância por vez roda a manutenção (várias réplicas da API)
+LOCK_KEY = 74210016
+
+PARTITION_RE = re.compile(r"^activity_logs_p(\d{4})_(\d{2})$")
+
+
+# =========================
+# PARTIÇÕES
+# =========================
+def month_start(d: date) -> date:
+    return date(d.year, d.month, 1)
+
+
+def add_months(d: date, months: int) -> date:
+    years, month = divmod(d.month - 1 + months, 12)
+    return date(d.year + years, month + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"activity_logs_p{month:%Y_%m}"
+
+
+def create_month_partition(conn: Connection, month: date) -> str:
+    """Cria (se não existir) a partição [mês, mês seguinte) do activity_logs."""
+    month = month_start(month)
+    name = partition_name(month)
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF activity_logs "
+        f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+    ))
+    return name
+
+
+def is_partitioned(conn: Connection) -> bool:
+    return bool(conn.execute(text("""
+        SELECT EXISTS (
+            SELECT 1 FROM pg_partitioned_table p
+            JOIN pg_class c ON c.oid = p.partrelid
+            WHERE c.relname = 'activity_logs'
+        )
+    """)).scalar())
+
+
+def list_partitions(conn: Connection) -> List[date]:
+    """Meses que já têm partição (ignora a default)."""
+    names = conn.execute(text("""
+        SELECT c.relname FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = 'activity_logs'
+    """)).scalars()
+    months = []
+    for name in names:
+        match = PARTITION_RE.match(name)
+        if match:
+            months.append(date(int(match.group(1)), int(match.group(2)), 1))
+    return sorted(months)
+
+
+def partition_activity_logs(conn: Connection) -> bool:
+    """
+    Converte o activity_logs em tabela particionada por mês (created_at).
+
+    A tabela antiga é renomeada para activity_logs_legacy, os dados são
+    copiados e ela fica para ser removida manualmente depois de conferida.
+    Idempotente: retorna False se já estiver particionada.
+    """
+    if is_partitioned(conn):
+        return False
+
+    has_legacy = conn.execute(text("SELECT to_regclass('activity_logs') IS NOT NULL")).scalar()
+    if has_legacy:
+        conn.execute(text("ALTER TABLE activity_logs RENAME TO activity_logs_legacy"))
+        # Libera os nomes usados pela tabela nova
+        conn.execute(text("ALTER SEQUENCE IF EXISTS activity_logs_id_seq RENAME TO activity_logs_legacy_id_seq"))
+        conn.execute(text("ALTER INDEX IF EXISTS activity_logs_pkey RENAME TO activity_logs_legacy_pkey"))
+        conn.execute(text("ALTER INDEX IF EXISTS ix_activity_logs_id RENAME TO ix_activity_logs_legacy_id"))
+
+    # Chave primária precisa conter a chave de partição. Sem FK para users:
+    # user_id 0 = sistema/anônimo e a checagem custaria um lookup por INSERT.
+    conn.execute(text("""
+        CREATE TABLE activity_logs (
+            id BIGSERIAL,
+            user_id INTEGER NOT NULL,
+            action VARCHAR(255) NOT NULL,
+            type VARCHAR(100),
+            details TEXT,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """))
+    # Rede de segurança para linhas fora das partições criadas
+    conn.execute(text("CREATE TABLE IF NOT EXISTS activity_logs_default PARTITION OF activity_logs DEFAULT"))
+
+    # Índices no pai valem para todas as partições (atuais e futuras):
+    # BRIN em created_at (dados chegam em ordem de tempo: índice minúsculo)
+    # e btree compostos para os filtros por tipo/ação/usuário + janela de tempo
+    conn.execute(text("CREATE INDEX IF NOT EXISTS idx_activity_logs_created_brin ON activity_logs USING BRIN (created_at)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS idx_activity_logs_type_created ON activity_logs (type, created_at DESC)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS idx_activity_logs_action_created ON activity_logs (action, created_at DESC)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS idx_activity_logs_user_created ON activity_logs (user_id, created_at DESC)"))
+
+    first = month_start(date.today())
+    if has_legacy:
+        oldest = conn.execute(text("SELECT min(created_at) FROM activity_logs_legacy")).scalar()
+        if oldest is not None:
+            first = min(first, month_start(oldest.date()))
+
+    month = first
+    while month <= add_months(month_start(date.today()), MONTHS_AHEAD):
+        create_month_partition(conn, month)
+        month = add_months(month, 1)
+
+    if has_legacy:
+        conn.execute(text("""
+            INSERT INTO activity_logs (id, user_id, action, type, details, created_at)
+            SELECT id, user_id, action, COALESCE(type, action), details, COALESCE(created_at, now())
+            FROM activity_logs_legacy
+        """))
+        conn.execute(text("""
+            SELECT setval(pg_get_serial_sequence('activity_logs', 'id'),
+                          COALESCE((SELECT max(id) FROM activity_logs), 0) + 1, false)
+        """))
+    return True
+
+
+# =========================
+# ROLLUP HORÁRIO
+# =========================
+# Remove os eventos HTTP brutos da janela e soma nos agregados por hora,
+# num único comando (DELETE ... RETURNING → INSERT ... ON CONFLICT)
+ROLLUP_WINDOW = text("""
+    WITH moved AS (
+        DELETE FROM activity_logs
+        WHERE created_at >= :lo AND created_at < :hi
+          AND action ~ :pattern
+          AND payload IS NOT NULL
+        RETURNING created_at, action, user_id, payload AS d
+    )
+    INSERT INTO activity_log_hourly AS h
+        (bucket, type, user_id, method, path, status_code, requests, errors, total_ms, max_ms)
+    SELECT date_trunc('hour', created_at),
+           action,
+           user_id,
+           COALESCE(d->>'method', ''),
+           COALESCE(regexp_replace(d->>'path', '/[0-9]+', '/{id}', 'g'), ''),
+           COALESCE((d->>'status_code')::int, 0),
+           count(*),
+           count(*) FILTER (WHERE (d->>'status_code')::int >= 500),
+           COALESCE(sum((d->>'response_time_ms')::float), 0),
+           COALESCE(max((d->>'response_time_ms')::float), 0)
+    FROM moved
+    GROUP BY 1, 2, 3, 4, 5, 6
+    ON CONFLICT (bucket, type, user_id, method, path, status_code) DO UPDATE SET
+        requests = h.requests + EXCLUDED.requests,
+        errors = h.errors + EXCLUDED.errors,
+        total_ms = h.total_ms + EXCLUDED.total_ms,
+        max_ms = GREATEST(h.max_ms, EXCLUDED.max_ms)
+""")
+
+
+# =========================
+# JOB
+# =========================
+class ActivityLogMaintenance:
+    """
+    Manutenção do activity_logs particionado:
+
+    - ensure_partitions(): cria as partições do mês atual + MONTHS_AHEAD
+    - rollup(): eventos HTTP brutos mais velhos que RAW_RETENTION_DAYS
+      viram linhas em activity_log_hourly (um dia por transação)
+    - drop_expired(): remove partições inteiras além de RETENTION_MONTHS
+
+    Roda em thread a cada MAINTENANCE_SECONDS (iniciado no lifespan) ou
+    por cron: python -m core.events.log_maintenance
+    """
+
+    def __init__(self, engine: Optional[Engine] = None, interval: float = MAINTENANCE_SECONDS):
+        self._engine = engine
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        # Até onde o rollup já foi feito neste processo (evita revarrer)
+        self._rolled_until: Optional[datetime] = None
+
+        self.runs = 0
+        self.partitions_created = 0
+        self.partitions_dropped = 0
+        self.rolled_up = 0
+        self.last_run_ms = 0.0
+        self.last_error: Optional[str] = None
+
+    @property
+    def engine(self) -> Engine:
+        if self._engine is None:
+            from database.session import engine
+            self._engine = engine
+        return self._engine
+
+    # =========================
+    # CICLO DE VIDA
+    # =========================
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "runs": self.runs,
+            "partitions_created": self.partitions_created,
+            "partitions_dropped": self.partitions_dropped,
+            "rolled_up": self.rolled_up,
+            "rolled_until": self._rolled_until.isoformat() if self._rolled_until else None,
+            "last_run_ms": self.last_run_ms,
+            "last_error": self.last_error,
+            "running": self._task is not None and not self._task.done(),
+        }
+
+    async def _run(self):
+        while True:
+            await asyncio.to_thread(self.run_once)
+            await asyncio.sleep(self.interval)
+
+    # =========================
+    # EXECUÇÃO
+    # =========================
+    def run_once(self) -> bool:
+        """Uma rodada completa; False se outra instância já está rodando."""
+        started = time.perf_counter()
+        try:
+            with self.engine.connect() as conn:
+                if not conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": LOCK_KEY}).scalar():
+                    conn.rollback()
+                    return False
+                conn.commit()
+                try:
+                    if not is_partitioned(conn):
+                        print("[LogMaintenance] ⚠️ activity_logs não é particionada; rode create_missing_tables")
+                        conn.commit()
+                        return False
+                    self.ensure_partitions(conn)
+                    self.rollup(conn)
+                    self.drop_expired(conn)
+                finally:
+                    conn.rollback()
+                    conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": LOCK_KEY})
+                    conn.commit()
+            self.runs += 1
+            self.last_error = None
+            return True
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"[LogMaintenance] ❌ Erro na manutenção do activity_logs: {e}")
+            return False
+        finally:
+            self.last_run_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    def ensure_partitions(self, conn: Connection) -> int:
+        existing = set(list_partitions(conn))
+        current = month_start(date.today())
+        created = 0
+        for offset in range(MONTHS_AHEAD + 1):
+            month = add_months(current, offset)
+            if month in existing:
+                continue
+            try:
+                create_month_partition(conn, month)
+                conn.commit()
+                created += 1
+                print(f"[LogMaintenance] ✅ Partição {partition_name(month)} criada")
+            except Exception as e:
+                # Ex.: a default já tem linhas desse mês
+                conn.rollback()
+                print(f"[LogMaintenance] ❌ Erro ao criar {partition_name(month)}: {e}")
+        self.partitions_created += created
+        return created
+
+    def rollup(self, conn: Connection, max_days: int = 31) -> int:
+        """Agrega os eventos HTTP brutos antigos, um dia por transação."""
+        cutoff = datetime.combine(date.today() - timedelta(days=RAW_RETENTION_DAYS), datetime.min.time())
+
+        lo = self._rolled_until
+        if lo is None:
+            months = list_partitions(conn)
+            lo = datetime.combine(months[0], datetime.min.time()) if months else cutoff
+
+        moved = 0
+        for _ in range(max_days):
+            if lo >= cutoff:
+                break
+            hi = min(lo + timedelta(days=1), cutoff)
+            result = conn.execute(ROLLUP_WINDOW, {"lo": lo, "hi": hi, "pattern": HTTP_ACTION_PATTERN})
+            conn.commit()
+            moved += max(result.rowcount or 0, 0)
+            lo = hi
+
+        self._rolled_until = lo
+        self.rolled_up += moved
+        if moved:
+            print(f"[LogMaintenance] 📦 {moved} grupos horários atualizados (até {lo:%Y-%m-%d})")
+        return moved
+
+    def drop_expired(self, conn: Connection) -> int:
+        """Remove partições que terminaram antes de RETENTION_MONTHS atrás."""
+        if RETENTION_MONTHS <= 0:
+            return 0
+        limit = add_months(month_start(date.today()), -RETENTION_MONTHS)
+        dropped = 0
+        for month in list_partitions(conn):
+            if add_months(month, 1) > limit:
+                break
+            name = partition_name(month)
+            conn.execute(text(f"ALTER TABLE activity_logs DETACH PARTITION {name}"))
+            conn.execute(text(f"DROP TABLE {name}"))
+            conn.commit()
+            dropped += 1
+            print(f"[LogMaintenance] 🗑️ Partição {name} removida")
+        self.partitions_dropped += dropped
+        return dropped
+
+
+# Instância compartilhada pelo processo (iniciada no lifespan)
+activity_log_maintenance = ActivityLogMaintenance()
+
+
+def get_activity_log_maintenance() -> ActivityLogMaintenance:
+    return activity_log_maintenance
+
+
+if __name__ == "__main__":
+    activity_log_maintenance.run_once()
+    print(activity_log_maintenance.stats())
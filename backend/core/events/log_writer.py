@@ -0,0 +1,222 @@
+#E:\MAWDSLEYS-AGENTE\backend\core\events\log_writer.py
+
+import asyncio
+import os
+import time
+from typing import Callable, Dict, List, Optional
+
+from core.events.activity_log import ActivityEvent
+
+# =========================
+# CONFIG
+# =========================
+QUEUE_SIZE = int(os.getenv("ACTIVITY_LOG_QUEUE_SIZE", "10000"))
+BATCH_SIZE = int(os.getenv("ACTIVITY_LOG_BATCH_SIZE", "500"))
+FLUSH_SECONDS = float(os.getenv("ACTIVITY_LOG_FLUSH_SECONDS", "1.0"))
+SHUTDOWN_TIMEOUT = float(os.getenv("ACTIVITY_LOG_SHUTDOWN_TIMEOUT", "10"))
+
+# Fila cheia: "drop_newest" descarta o evento novo, "drop_oldest" o mais antigo
+OVERFLOW_POLICY = os.getenv("ACTIVITY_LOG_OVERFLOW", "drop_newest")
+
+
+def _write_to_db(events: List[ActivityEvent]) -> int:
+    from database.session import db_session
+    from db.repositories.activity_log_repository import ActivityLogRepository
+
+    with db_session() as db:
+        return ActivityLogRepository(db).insert_many(events)
+
+
+# =========================
+# WRITER
+# =========================
+class ActivityLogWriter:
+    """
+    Grava o ActivityLog fora do caminho do request.
+
+    - enqueue() só coloca o evento numa fila asyncio limitada (não toca no banco)
+    - Um worker junta até `batch_size` eventos ou espera `flush_interval`
+      e grava o lote com um INSERT executemany + um commit, numa thread
+    - Fila cheia: descarta conforme a política e conta em `dropped`
+    - close() no shutdown do lifespan grava o que ainda estiver na fila
+    """
+
+    def __init__(self, max_queue: int = QUEUE_SIZE, batch_size: int = BATCH_SIZE,
+                 flush_interval: float = FLUSH_SECONDS, overflow: str = OVERFLOW_POLICY,
+                 write: Optional[Callable[[List[ActivityEvent]], int]] = None):
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self._write = write or _write_to_db
+        self._listeners: List[Callable[[List[ActivityEvent]], None]] = []
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closing = False
+
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self.max_depth = 0
+        self.last_batch_ms = 0.0
+
+    # =========================
+    # CICLO DE VIDA
+    # =========================
+    def start(self):
+        """Inicia o worker no loop atual (idempotente)."""
+        if self._task is not None and not self._task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._closing = False
+        self._task = self._loop.create_task(self._run())
+
+    async def close(self, timeout: float = SHUTDOWN_TIMEOUT):
+        """Para de aceitar eventos e grava o que restou na fila."""
+        if self._task is None:
+            return
+        self._closing = True
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f"[ActivityLogWriter] ⚠️ Shutdown com {self._queue.qsize()} eventos não gravados")
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        print(f"[ActivityLogWriter] 👋 Encerrado: {self.written} gravados, {self.dropped} descartados")
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_depth": self.max_depth,
+            "max_queue": self.max_queue,
+            "last_batch_ms": self.last_batch_ms,
+            "overflow_policy": self.overflow,
+            "running": self._task is not None and not self._task.done(),
+        }
+
+    # =========================
+    # API
+    # =========================
+    def subscribe(self, listener: Callable[[List[ActivityEvent]], None]):
+        """Chamado com cada lote depois de gravado (ex.: MemoryIndex)."""
+        self._listeners.append(listener)
+
+    def enqueue(self, event: ActivityEvent) -> bool:
+        """
+        Agenda o evento para gravação. Nunca bloqueia: retorna False se ele
+        foi descartado. Pode ser chamado do loop ou de threads do threadpool.
+        """
+        if self._closing:
+            self.dropped += 1
+            return False
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop is None:
+            if self._loop is not None and self._loop.is_running():
+                # Rota sync (threadpool): entrega ao loop do worker
+                self._loop.call_soon_threadsafe(self._put, event)
+                return True
+            # Sem loop (scripts/jobs): grava direto
+            return self._write_now([event])
+
+        if self._task is None or self._task.done():
+            self.start()
+        return self._put(event)
+
+    async def put(self, event: ActivityEvent):
+        """Variante com backpressure: espera vaga na fila em vez de descartar."""
+        if self._task is None or self._task.done():
+            self.start()
+        await self._queue.put(event)
+        self.enqueued += 1
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+
+    def _put(self, event: ActivityEvent) -> bool:
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.overflow != "drop_oldest":
+                return False
+            # Abre espaço descartando o evento mais antigo
+            self._queue.get_nowait()
+            self._queue.task_done()
+            self._queue.put_nowait(event)
+
+        self.enqueued += 1
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+        return True
+
+    # =========================
+    # WORKER
+    # =========================
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                remaining = deadline - loop.time()
+                if remaining <= 0 or self._closing:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await asyncio.to_thread(self._write_now, batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_now(self, batch: List[ActivityEvent]) -> bool:
+        started = time.perf_counter()
+        try:
+            self._write(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            print(f"[ActivityLogWriter] ❌ Erro ao gravar lote de {len(batch)} eventos: {e}")
+            return False
+        self.written += len(batch)
+        self.batches += 1
+        self.last_batch_ms = round((time.perf_counter() - started) * 1000, 2)
+
+        for listener in self._listeners:
+            try:
+                listener(batch)
+            except Exception as e:
+                print(f"[ActivityLogWriter] ⚠️ Listener falhou: {e}")
+        return True
+
+
+# Instância compartilhada pelo processo (middleware e rotas)
+activity_log_writer = ActivityLogWriter()
+
+
+def get_activity_log_writer() -> ActivityLogWriter:
+    return activity_log_writer
@@ -0,0 +1,58 @@
+#E:\MAWDSLEYS-AGENTE\backend\core\events\meeting_stats.py
+
+import argparse
+import os
+from datetime import date, timedelta
+
+from sqlalchemy.orm import Session
+
+from core.events.activity_log import ActivityEvent
+from db.repositories.meeting_stats_repository import MeetingStatsRepository, week_start
+
+# =========================
+# CONFIG
+# =========================
+# Semanas de ids de eventos guardados para deduplicar reentregas
+APPLIED_WEEKS = int(os.getenv("MEETING_STATS_APPLIED_WEEKS", "2"))
+
+# Backfill padrão (semanas para trás, contando a atual)
+BACKFILL_WEEKS = int(os.getenv("MEETING_STATS_BACKFILL_WEEKS", "12"))
+
+_pruned_week = None
+
+
+async def meeting_stats_handler(event: ActivityEvent, db: Session):
+    """
+    Handler do EventBus para meeting.*: atualiza meeting_weekly_stats
+    na mesma transação da entrega (relay do outbox ou worker do bus)
+    """
+    global _pruned_week
+
+    repo = MeetingStatsRepository(db)
+    repo.apply(event)
+
+    # Uma limpeza por semana nova vista pelo processo
+    current = week_start()
+    if _pruned_week != current:
+        repo.prune_applied(current - timedelta(weeks=APPLIED_WEEKS))
+        _pruned_week = current
+
+
+def backfill(weeks: int = BACKFILL_WEEKS, since: date = None) -> int:
+    """Recalcula as últimas `weeks` semanas (ou desde `since`) a partir do activity_logs"""
+    from database.session import db_session
+
+    since = since or week_start() - timedelta(weeks=weeks - 1)
+    with db_session() as db:
+        rows = MeetingStatsRepository(db).backfill(since)
+    print(f"[MeetingStats] ✅ {rows} linhas usuário/semana recalculadas desde {week_start(since)}")
+    return rows
+
+
+if __name__ == "__main__":
+    # python -m core.events.meeting_stats --weeks 52
+    parser = argparse.ArgumentParser(description="Backfill de meeting_weekly_stats")
+    parser.add_argument("--weeks", type=int, default=BACKFILL_WEEKS)
+    parser.add_argument("--since", type=date.fromisoformat, default=None)
+    args = parser.parse_args()
+    backfill(args.weeks, args.since)
@@ -0,0 +1,156 @@
+#E:\MAWDSLEYS-AGENTE\backend\core\events\outbox_relay.py
+
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from core.events.event_bus import EventBus, event_bus, retry_delay, _default_session
+
+# =========================
+# CONFIG
+# =========================
+RELAY_BATCH_SIZE = int(os.getenv("OUTBOX_RELAY_BATCH", "200"))
+RELAY_INTERVAL = float(os.getenv("OUTBOX_RELAY_INTERVAL", "1.0"))
+
+
+class OutboxRelay:
+    """
+    Drena o event_outbox em lotes:
+
+        SELECT ... FOR UPDATE SKIP LOCKED  (lote de linhas pendentes)
+        INSERT INTO activity_logs ...      (linhas gravadas pelas rotas)
+        handlers do EventBus               (um SAVEPOINT por handler)
+        UPDATE event_outbox SET status     (done / nova tentativa / dead)
+        COMMIT
+
+    Tudo numa transação: se o processo cair no meio, as travas somem e
+    as linhas voltam a ficar pendentes. Com SKIP LOCKED, cada processo
+    (ou instância) pode rodar o seu relay sem disputar as mesmas linhas.
+    """
+
+    def __init__(self, bus: EventBus = event_bus, batch_size: int = RELAY_BATCH_SIZE,
+                 interval: float = RELAY_INTERVAL,
+                 session_factory: Callable[[], Session] = _default_session):
+        self.bus = bus
+        self.batch_size = batch_size
+        self.interval = interval
+        self._session_factory = session_factory
+        self._task: Optional[asyncio.Task] = None
+
+        self.claimed = 0
+        self.logged = 0
+        self.delivered = 0
+        self.failed = 0
+        self.dead = 0
+        self.batches = 0
+        self.last_batch_ms = 0.0
+        self.lag_ms_last = 0.0
+
+    # =========================
+    # CICLO DE VIDA
+    # =========================
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "claimed": self.claimed,
+            "logged": self.logged,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "dead": self.dead,
+            "batches": self.batches,
+            "last_batch_ms": self.last_batch_ms,
+            "lag_ms_last": self.lag_ms_last,
+            "running": self._task is not None and not self._task.done(),
+        }
+
+    async def _run(self):
+        while True:
+            try:
+                drained = await self.drain_once()
+            except Exception as e:
+                print(f"[OutboxRelay] ❌ Erro ao drenar o outbox: {e}")
+                drained = 0
+            # Lote cheio: provavelmente há mais esperando, segue sem pausa
+            if drained < self.batch_size:
+                await asyncio.sleep(self.interval)
+
+    # =========================
+    # LOTE
+    # =========================
+    async def drain_once(self) -> int:
+        """Processa um lote; retorna quantas linhas foram travadas."""
+        from db.repositories.activity_log_repository import ActivityLogRepository
+        from db.repositories.outbox_repository import OutboxRepository
+
+        started = time.perf_counter()
+        db = self._session_factory()
+        try:
+            repo = OutboxRepository(db)
+            rows = await asyncio.to_thread(repo.claim_batch, self.batch_size)
+            if not rows:
+                db.rollback()
+                return 0
+
+            batch = [(row, repo.to_event(row)) for row in rows]
+            oldest = min(row.occurred_at for row in rows)
+            self.lag_ms_last = round(max(0.0, (datetime.utcnow() - oldest).total_seconds() * 1000), 2)
+
+            # 1. activity_logs: um INSERT executemany para o lote
+            to_log = [event for row, event in batch if not row.logged]
+            if to_log:
+                await asyncio.to_thread(ActivityLogRepository(db).insert_many, to_log, False)
+
+            # 2. handlers (mesma transação, SAVEPOINT por handler)
+            done = []
+            for row, event in batch:
+                failures = await self.bus.dispatch(event, db, only=row.handler, savepoint=True)
+                if not failures:
+                    done.append(row.id)
+                    continue
+                attempts = row.attempts + 1
+                self.failed += 1
+                if repo.record_failures(row.id, event, row.handler, attempts, failures,
+                                        self.bus.max_attempts, retry_delay(attempts)):
+                    self.dead += 1
+                    print(f"[OutboxRelay] ☠️ {event.type} ({row.handler}) desistiu após {attempts} tentativas")
+
+            # 3. confirma o lote (libera as travas)
+            repo.mark_done(done)
+            await asyncio.to_thread(db.commit)
+
+            self.claimed += len(rows)
+            self.logged += len(to_log)
+            self.delivered += len(done)
+            self.batches += 1
+            self.last_batch_ms = round((time.perf_counter() - started) * 1000, 2)
+            return len(rows)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+# Instância compartilhada pelo processo (iniciada no lifespan)
+outbox_relay = OutboxRelay()
+
+
+def get_outbox_relay() -> OutboxRelay:
+    return outbox_relay
@@ -0,0 +1,262 @@
+#E:\MAWDSLEYS-AGENTE\backend\core\llm\gateway.py
+
+import asyncio
+import json
+import os
+import random
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+# =========================
+# CONFIG
+# =========================
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+DEFAULT_MODEL = os.getenv("LLM_DEFAULT_MODEL", "gpt-4o-mini")
+
+# Chamadas simultâneas ao provedor por worker (as demais esperam na fila)
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "32"))
+
+TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT", "60"))
+CONNECT_TIMEOUT_SECONDS = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "8"))
+
+RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    """Falha definitiva do provedor (após as tentativas)."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@dataclass
+class ChatResult:
+    content: str
+    model: str
+    usage: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.usage.get("total_tokens", 0)
+
+
+# =========================
+# GATEWAY
+# =========================
+class LLMGateway:
+    """
+    Ponto único de acesso ao provedor de LLM (API compatível com OpenAI).
+
+    - Um httpx.AsyncClient por processo (pool de conexões keep-alive)
+    - Semáforo limita chamadas simultâneas; o resto aguarda sem bloquear o loop
+    - Timeout por chamada e novas tentativas com backoff exponencial + jitter
+      (respeita Retry-After em 429/503)
+    """
+
+    def __init__(self, api_key: Optional[str] = None, base_url: str = OPENAI_BASE_URL,
+                 max_concurrency: int = MAX_CONCURRENCY, max_retries: int = MAX_RETRIES,
+                 timeout: float = TIMEOUT_SECONDS, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.timeout = httpx.Timeout(timeout, connect=CONNECT_TIMEOUT_SECONDS)
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.in_flight = 0
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key or os.getenv("OPENAI_API_KEY"))
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"Authorization": f"Bearer {self.api_key or os.getenv('OPENAI_API_KEY', '')}"},
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_CONNECTIONS,
+                ),
+                transport=self._transport,
+            )
+        return self._client
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "failures": self.failures,
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+        }
+
+    # =========================
+    # RETRY
+    # =========================
+    def _backoff(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        if response is not None:
+            retry_after = response.headers.get("retry-after")
+            if retry_after:
+                try:
+                    return min(float(retry_after), BACKOFF_MAX)
+                except ValueError:
+                    pass
+        # Full jitter: espalha as novas tentativas de vários requests
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        async with self.semaphore:
+            self.in_flight += 1
+            try:
+                for attempt in range(self.max_retries + 1):
+                    self.requests += 1
+                    try:
+                        response = await self.client.request(method, path, **kwargs)
+                    except (httpx.TimeoutException, httpx.TransportError) as e:
+                        if attempt >= self.max_retries:
+                            self.failures += 1
+                            raise LLMError(f"Falha de conexão com o provedor: {e}") from e
+                        self.retries += 1
+                        await asyncio.sleep(self._backoff(attempt))
+                        continue
+
+                    if response.status_code in RETRY_STATUS and attempt < self.max_retries:
+                        self.retries += 1
+                        await asyncio.sleep(self._backoff(attempt, response))
+                        continue
+
+                    if response.status_code >= 400:
+                        self.failures += 1
+                        raise LLMError(
+                            f"Provedor retornou {response.status_code}: {response.text[:300]}",
+                            status_code=response.status_code,
+                        )
+                    return response
+            finally:
+                self.in_flight -= 1
+
+    # =========================
+    # API
+    # =========================
+    async def chat(self, messages: List[Dict[str, str]], model: str = DEFAULT_MODEL,
+                   temperature: Optional[float] = None, max_tokens: Optional[int] = None,
+                   **params) -> ChatResult:
+        body = {"model": model, "messages": messages, **params}
+        if temperature is not None:
+            body["temperature"] = temperature
+        if max_tokens is not None:
+            body["max_tokens"] = max_tokens
+
+        data = (await self._request("POST", "/chat/completions", json=body)).json()
+        return ChatResult(
+            content=data["choices"][0]["message"].get("content") or "",
+            model=data.get("model", model),
+            usage=data.get("usage") or {},
+        )
+
+    async def chat_stream(self, messages: List[Dict[str, str]], model: str = DEFAULT_MODEL,
+                          temperature: Optional[float] = None, max_tokens: Optional[int] = None,
+                          **params) -> AsyncIterator[str]:
+        """
+        Gera os trechos de texto da resposta conforme chegam (SSE do provedor).
+        Novas tentativas só antes do primeiro trecho; depois disso o erro sobe.
+        """
+        body = {"model": model, "messages": messages, "stream": True, **params}
+        if temperature is not None:
+            body["temperature"] = temperature
+        if max_tokens is not None:
+            body["max_tokens"] = max_tokens
+
+        started = False
+        async with self.semaphore:
+            self.in_flight += 1
+            try:
+                for attempt in range(self.max_retries + 1):
+                    self.requests += 1
+                    try:
+                        async with self.client.stream("POST", "/chat/completions", json=body) as response:
+                            if response.status_code in RETRY_STATUS and attempt < self.max_retries:
+                                self.retries += 1
+                                await asyncio.sleep(self._backoff(attempt, response))
+                                continue
+                            if response.status_code >= 400:
+                                self.failures += 1
+                                await response.aread()
+                                raise LLMError(
+                                    f"Provedor retornou {response.status_code}: {response.text[:300]}",
+                                    status_code=response.status_code,
+                                )
+
+                            async for line in response.aiter_lines():
+                                if not line.startswith("data:"):
+                                    continue
+                                payload = line[5:].strip()
+                                if payload == "[DONE]":
+                                    return
+                                try:
+                                    choices = json.loads(payload).get("choices") or []
+                                    # Trecho sem choices (ex.: uso de tokens no fim): nada a entregar
+                                    delta = (choices[0].get("delta") or {}) if choices else {}
+                                except (ValueError, AttributeError, TypeError) as e:
+                                    self.failures += 1
+                                    raise LLMError(f"Trecho inválido do provedor: {payload[:200]}") from e
+                                if delta.get("content"):
+                                    started = True
+                                    yield delta["content"]
+                            return
+                    except (httpx.TimeoutException, httpx.TransportError) as e:
+                        # Texto já entregue não pode ser repetido: só tenta de novo antes dele
+                        if started or attempt >= self.max_retries:
+                            self.failures += 1
+                            raise LLMError(f"Falha de conexão com o provedor: {e}") from e
+                        self.retries += 1
+                        await asyncio.sleep(self._backoff(attempt))
+            finally:
+                self.in_flight -= 1
+
+    async def transcribe(self, audio: bytes, filename: str, model: str = "whisper-1",
+                         language: Optional[str] = None) -> str:
+        data = {"model": model}
+        if language:
+            data["language"] = language
+        response = await self._request(
+            "POST", "/audio/transcriptions",
+            data=data,
+            files={"file": (filename, audio)},
+        )
+        return response.json().get("text", "")
+
+
+# Instância compartilhada pelo processo (rotas e agentes)
+llm = LLMGateway()
+
+
+def get_llm() -> LLMGateway:
+    return llm
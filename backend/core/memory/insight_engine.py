@@ -1,42 +1,198 @@
 # E:\MAWDSLEYS-AGENTE\backend\core\memory\insight_engine.py
 
-from collections import Counter
+import os
+import re
+import threading
+from collections import Counter, deque
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+# =========================
+# CONFIG
+# =========================
+PRESSURE_THRESHOLD = int(os.getenv("INSIGHT_PRESSURE_THRESHOLD", "3"))
+# Follow-ups contam para a pressão por este número de dias (hoje incluído)
+PRESSURE_WINDOW_DAYS = int(os.getenv("INSIGHT_PRESSURE_WINDOW_DAYS", "7"))
+MEETING_WINDOW_DAYS = int(os.getenv("INSIGHT_MEETING_WINDOW_DAYS", "7"))
+MAX_RISKS = int(os.getenv("INSIGHT_MAX_RISKS", "200"))
+
+# Compilado uma vez (antes: dois str(payload).lower() por evento)
+REGULATORY_RE = re.compile(r"regulator|anvisa")
+
+
+# =========================
+# AGREGADORES
+# =========================
+class FollowupPressure:
+    """
+    Follow-ups por responsável nos últimos `window_days` dias (contadores
+    por dia que expiram como no MeetingOverload); `snapshot` só traz
+    quem está no limite ou acima dentro da janela.
+    """
+
+    def __init__(self, threshold: int = PRESSURE_THRESHOLD, window_days: int = PRESSURE_WINDOW_DAYS):
+        self.threshold = threshold
+        self.window_days = window_days
+        self.per_day: Dict[Any, Counter] = {}
+        self.counts: Counter = Counter()
+
+    def _cutoff(self):
+        return datetime.utcnow().date() - timedelta(days=self.window_days - 1)
+
+    def _expire(self):
+        cutoff = self._cutoff()
+        for day in [d for d in self.per_day if d < cutoff]:
+            for responsible, n in self.per_day.pop(day).items():
+                self.counts[responsible] -= n
+                if self.counts[responsible] <= 0:
+                    del self.counts[responsible]
+
+    def update(self, event):
+        if event.entity != "followup":
+            return
+        responsible = (event.payload or {}).get("responsible")
+        if not responsible:
+            return
+        day = (event.timestamp or datetime.utcnow()).date()
+        if day < self._cutoff():
+            return
+        self.per_day.setdefault(day, Counter())[responsible] += 1
+        self.counts[responsible] += 1
+        self._expire()
+
+    def snapshot(self) -> Dict[str, int]:
+        self._expire()
+        return {r: n for r, n in self.counts.items() if n >= self.threshold}
+
+
+class RegulatoryRisks:
+    """Eventos que citam regulador/ANVISA: total + os mais recentes (limitado)."""
+
+    def __init__(self, max_items: int = MAX_RISKS):
+        self.total = 0
+        self.recent: deque = deque(maxlen=max_items)
+
+    def update(self, event):
+        if not REGULATORY_RE.search(str(event.payload).lower()):
+            return
+        self.total += 1
+        self.recent.append({
+            "id": event.id,
+            "type": event.type,
+            "entity_id": event.entity_id,
+            "timestamp": event.timestamp.isoformat() if event.timestamp else None,
+            "payload": event.payload,
+        })
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"total": self.total, "recent": list(reversed(self.recent))}
+
+
+class MeetingOverload:
+    """meeting.created no total e numa janela deslizante de dias."""
+
+    def __init__(self, window_days: int = MEETING_WINDOW_DAYS):
+        self.window_days = window_days
+        self.total = 0
+        self.per_day: Counter = Counter()
+        self.in_window = 0
+
+    def _cutoff(self):
+        return datetime.utcnow().date() - timedelta(days=self.window_days - 1)
+
+    def _expire(self):
+        cutoff = self._cutoff()
+        for day in [d for d in self.per_day if d < cutoff]:
+            self.in_window -= self.per_day.pop(day)
+
+    def update(self, event):
+        if event.type != "meeting.created":
+            return
+        self.total += 1
+        day = (event.timestamp or datetime.utcnow()).date()
+        if day >= self._cutoff():
+            self.per_day[day] += 1
+            self.in_window += 1
+        self._expire()
+
+    def snapshot(self) -> Dict[str, int]:
+        self._expire()
+        return {"total": self.total, "window_days": self.window_days, "in_window": self.in_window}
+
+
+# =========================
+# INSIGHTS
+# =========================
+class InsightAggregator:
+    """
+    Insights mantidos evento a evento (O(1) por evento).
+    snapshot() devolve o estado atual sem varrer eventos; o snapshot fica
+    em cache até o próximo evento.
+    """
+
+    def __init__(self):
+        self.followups = FollowupPressure()
+        self.risks = RegulatoryRisks()
+        self.meetings = MeetingOverload()
+        self.events = 0
+        self._lock = threading.Lock()
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._snapshot_key = None
+
+    def update(self, event):
+        # Requests HTTP do middleware não entram nos insights
+        if event.entity == "http_request":
+            return
+        with self._lock:
+            self.followups.update(event)
+            self.risks.update(event)
+            self.meetings.update(event)
+            self.events += 1
+
+    def update_many(self, events: Iterable):
+        for event in events:
+            self.update(event)
+
+    async def handle(self, event, db=None):
+        """Handler do EventBus (não usa a sessão)."""
+        self.update(event)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            # As janelas (reuniões, follow-ups) só mudam com eventos novos ou com a virada do dia
+            key = (self.events, datetime.utcnow().date())
+            if self._snapshot is None or self._snapshot_key != key:
+                self._snapshot_key = key
+                self._snapshot = {
+                    "followup_pressure": self.followups.snapshot(),
+                    "regulatory_risks": self.risks.snapshot(),
+                    "meeting_overload": self.meetings.snapshot(),
+                    "events": self.events,
+                    "generated_at": datetime.utcnow().isoformat(),
+                }
+            return self._snapshot
 
 
 class InsightEngine:
-    def __init__(self, events):
-        self.events = events
-
-    def followup_pressure(self):
-        followups = [
-            e for e in self.events
-            if e.entity == "followup"
-        ]
-
-        owners = [
-            e.payload.get("responsible")
-            for e in followups
-            if e.payload.get("responsible")
-        ]
-
-        counter = Counter(owners)
-        critical = {
-            k: v for k, v in counter.items() if v >= 3
-        }
-
-        return critical
-
-    def regulatory_risks(self):
-        return [
-            e for e in self.events
-            if "regulator" in str(e.payload).lower()
-            or "anvisa" in str(e.payload).lower()
-        ]
-
-    def meeting_overload(self):
-        meetings = [
-            e for e in self.events
-            if e.type == "meeting.created"
-        ]
-
-        return len(meetings)
+    """Interface antiga (lista de eventos) sobre os agregadores incrementais."""
+
+    def __init__(self, events: Iterable = ()):
+        self.aggregator = InsightAggregator()
+        self.aggregator.update_many(events)
+
+    def followup_pressure(self) -> Dict[str, int]:
+        return self.aggregator.followups.snapshot()
+
+    def regulatory_risks(self) -> List[Dict[str, Any]]:
+        return self.aggregator.risks.snapshot()["recent"]
+
+    def meeting_overload(self) -> int:
+        return self.aggregator.meetings.total
+
+
+# Instância compartilhada pelo processo (alimentada pelo EventBus/writer)
+insights = InsightAggregator()
+
+
+def get_insights() -> InsightAggregator:
+    return insights
@@ -1,8 +1,10 @@
 # backend/core/memory/memory_engine.py
 
+from sqlalchemy import Text, cast
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Dict, List, Optional
 from db.models.activity_log import ActivityLog
+from core.memory.memory_store import MemoryHit, memory_store
 
 class MemoryEngine:
     def __init__(self, db: Session):
@@ -21,19 +23,54 @@ class MemoryEngine:
 
     def search_events(self, keyword: str, limit: int = 10) -> List[ActivityLog]:
         """
-        Busca eventos por palavra-chave
+        Busca eventos por palavra-chave no tipo ou no payload
+        (activity_logs não tem entity: o domínio já está no tipo)
         """
         return (
             self.db.query(ActivityLog)
             .filter(
                 ActivityLog.type.ilike(f"%{keyword}%") |
-                ActivityLog.entity.ilike(f"%{keyword}%")
+                cast(ActivityLog.payload, Text).ilike(f"%{keyword}%")
             )
             .order_by(ActivityLog.timestamp.desc())
             .limit(limit)
             .all()
         )
 
+    # =========================
+    # MEMÓRIA DO AGENTE (memory_entries)
+    # =========================
+    def add_memory(self, user_id: str, entity_type: str, entity_id: str, content: str,
+                   metadata: Optional[Dict] = None):
+        """
+        Grava a memória na transação do chamador (sem commit aqui); depois
+        do commit ela entra no índice e o embedding é gerado em segundo plano
+        (não atrasa a resposta do chat)
+        """
+        from db.repositories.memory_repository import MemoryRepository
+
+        entry = MemoryRepository(self.db).add(user_id, entity_type, entity_id, content, metadata)
+        memory_store.remember_after_commit(self.db, entry)
+        return entry
+
+    def search(self, query: str, user_id: Optional[str] = None, limit: int = 5,
+               entity_types: Optional[List[str]] = None,
+               entity_id: Optional[str] = None) -> List[MemoryHit]:
+        """
+        Memórias mais relevantes para a pergunta (similaridade + recência),
+        restritas ao usuário e aos tipos pedidos
+        """
+        return memory_store.search(
+            self.db, query, user_id=user_id, limit=limit,
+            entity_types=entity_types, entity_id=entity_id,
+        )
+
+    def get_user_recent_memories(self, user_id: str, limit: int = 5) -> List[MemoryHit]:
+        """
+        Últimas memórias do usuário
+        """
+        return memory_store.recent(self.db, user_id, limit=limit)
+
     def format_for_llm(self, events: List[ActivityLog]) -> str:
         """
         Formata memória para ser enviada ao LLM
@@ -41,6 +78,6 @@ class MemoryEngine:
         lines = []
         for e in events:
             lines.append(
-                f"[{e.timestamp}] {e.type} | {e.entity} | {e.payload}"
+                f"[{e.timestamp}] {e.type} | {(e.type or e.action).split('.', 1)[0]} | {e.payload}"
             )
         return "\n".join(lines)
@@ -0,0 +1,351 @@
+#E:\MAWDSLEYS-AGENTE\backend\core\memory\memory_index.py
+
+import asyncio
+import os
+import re
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from core.events.activity_log import ActivityEvent
+from core.search.bm25_index import tokenize
+
+# =========================
+# CONFIG
+# =========================
+MAX_DAYS = int(os.getenv("MEMORY_INDEX_MAX_DAYS", "120"))
+MAX_EVENTS = int(os.getenv("MEMORY_INDEX_MAX_EVENTS", "200000"))
+WARM_DAYS = int(os.getenv("MEMORY_INDEX_WARM_DAYS", "7"))
+
+# Eventos de request HTTP do middleware são telemetria, não memória
+# (e viram agregados horários no activity_logs)
+HTTP_ACTION_RE = re.compile(r"^(api|meeting|chat)\.(get|post|put|delete|patch)$")
+
+
+class MemoryRecord:
+    """Evento compacto guardado no índice (mesmos campos lidos do ActivityLog)."""
+
+    __slots__ = ("id", "type", "entity", "entity_id", "actor", "timestamp", "payload")
+
+    def __init__(self, id, type, entity, entity_id, actor, timestamp, payload):
+        self.id = id
+        self.type = type
+        self.entity = entity
+        self.entity_id = entity_id
+        self.actor = actor
+        self.timestamp = timestamp
+        self.payload = payload
+
+    @classmethod
+    def from_event(cls, event: ActivityEvent) -> "MemoryRecord":
+        return cls(event.id, event.type, event.entity, event.entity_id, event.actor,
+                   _utc(event.timestamp), event.payload or {})
+
+    @classmethod
+    def from_row(cls, row) -> "MemoryRecord":
+        # activity_logs não guarda entity/entity_id: usa o domínio do tipo
+        return cls(f"log_{row.id}", row.action, row.action.split(".", 1)[0], "",
+                   f"user_{row.user_id}" if row.user_id else "system",
+                   _utc(row.created_at), row.payload or {})
+
+    @property
+    def domain(self) -> str:
+        """meeting.created -> meeting (bucket por entidade)"""
+        return self.type.split(".", 1)[0]
+
+
+def _utc(ts: Optional[datetime]) -> datetime:
+    if ts is None:
+        return datetime.utcnow()
+    if ts.tzinfo is not None:
+        return ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+def _payload_text(value) -> Iterable[str]:
+    if isinstance(value, dict):
+        for v in value.values():
+            yield from _payload_text(v)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            yield from _payload_text(v)
+    elif isinstance(value, str):
+        yield value
+
+
+class _DayBucket:
+    """Eventos de um dia + índices do dia (sai inteiro na evicção)."""
+
+    __slots__ = ("records", "by_domain", "tokens")
+
+    def __init__(self):
+        self.records: Dict[str, MemoryRecord] = {}
+        self.by_domain: Dict[str, List[str]] = {}
+        self.tokens: Dict[str, Set[str]] = {}
+
+    def add(self, record: MemoryRecord) -> bool:
+        if record.id in self.records:
+            return False
+        self.records[record.id] = record
+        self.by_domain.setdefault(record.domain, []).append(record.id)
+        terms = tokenize(record.type.replace(".", " "))
+        for text in _payload_text(record.payload):
+            terms.extend(tokenize(text))
+        for term in set(terms):
+            self.tokens.setdefault(term, set()).add(record.id)
+        return True
+
+
+def _load_days_from_db(start: date, end: date) -> List[MemoryRecord]:
+    """Eventos de [start, end) do activity_logs (sem os de request HTTP)."""
+    from sqlalchemy import select
+    from database.session import db_session
+    from db.models.activity_log import ActivityLog
+
+    with db_session(commit=False) as db:
+        rows = db.execute(
+            select(ActivityLog)
+            .where(ActivityLog.created_at >= datetime.combine(start, datetime.min.time()))
+            .where(ActivityLog.created_at < datetime.combine(end, datetime.min.time()))
+            .where(ActivityLog.action.op("!~")(HTTP_ACTION_RE.pattern))
+        ).scalars().all()
+        return [MemoryRecord.from_row(row) for row in rows]
+
+
+# =========================
+# ÍNDICE
+# =========================
+class MemoryIndex:
+    """
+    Memória institucional em RAM, atualizada por eventos.
+
+    - Buckets por dia (UTC), cada um com o índice por entidade e o índice
+      invertido de tokens do payload: consultas não tocam no banco
+    - Eventos novos chegam pelo EventBus e pelo ActivityLogWriter
+      (add é idempotente pelo id do evento)
+    - Dias fora da memória são carregados do activity_logs na primeira
+      consulta que precisa deles (uma query por faixa contínua)
+    - Memória limitada: acima de `max_days` dias ou `max_events` eventos,
+      sai o dia usado há mais tempo (LRU); ele volta do banco se precisar.
+      Os dias da consulta em andamento e o dia ao vivo nunca saem, e janelas
+      maiores que `max_days` são cortadas (resultado nunca fica parcial)
+    - Virada do dia (UTC): enquanto o dia ao vivo está na memória, o primeiro
+      evento do dia seguinte abre o bucket novo (não depende de consulta)
+    """
+
+    def __init__(self, max_days: int = MAX_DAYS, max_events: int = MAX_EVENTS,
+                 loader: Callable[[date, date], List[MemoryRecord]] = _load_days_from_db):
+        self.max_days = max_days
+        self.max_events = max_events
+        self._loader = loader
+        self._days: "OrderedDict[date, _DayBucket]" = OrderedDict()
+        self._size = 0
+        self._live_day: Optional[date] = None
+        self._lock = threading.RLock()
+
+        self.added = 0
+        self.loaded_days = 0
+        self.evicted_days = 0
+        self.queries = 0
+
+    def __len__(self):
+        return self._size
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "events": self._size,
+            "days": len(self._days),
+            "added": self.added,
+            "loaded_days": self.loaded_days,
+            "evicted_days": self.evicted_days,
+            "queries": self.queries,
+            "max_days": self.max_days,
+            "max_events": self.max_events,
+        }
+
+    # =========================
+    # ATUALIZAÇÃO
+    # =========================
+    def add(self, event: ActivityEvent) -> bool:
+        """Indexa um evento novo (só se o dia dele já está na memória)."""
+        if event.entity == "http_request" or HTTP_ACTION_RE.match(event.type):
+            return False
+        record = MemoryRecord.from_event(event)
+        day = record.timestamp.date()
+        with self._lock:
+            bucket = self._days.get(day)
+            if bucket is None and self._rollover(day):
+                bucket = self._days[day] = _DayBucket()
+            if bucket is None or not bucket.add(record):
+                return False
+            self._size += 1
+            self.added += 1
+            self._evict(keep={day})
+        return True
+
+    def _rollover(self, day: date) -> bool:
+        """
+        Dia novo chegando ao vivo: se o dia ao vivo anterior continua na
+        memória, nenhum evento do dia novo passou sem ser indexado.
+        """
+        if self._live_day is None or self._live_day not in self._days:
+            return False
+        if not self._live_day < day <= datetime.utcnow().date():
+            return False
+        self._live_day = day
+        return True
+
+    def add_many(self, events: Iterable[ActivityEvent]):
+        for event in events:
+            self.add(event)
+
+    async def handle(self, event: ActivityEvent, db=None):
+        """Handler do EventBus (não usa a sessão)."""
+        self.add(event)
+
+    def _install(self, day: date, records: List[MemoryRecord]):
+        bucket = _DayBucket()
+        for record in records:
+            bucket.add(record)
+        old = self._days.pop(day, None)
+        if old is not None:
+            # Eventos ao vivo que chegaram enquanto o dia carregava
+            for record in old.records.values():
+                bucket.add(record)
+            self._size -= len(old.records)
+        self._days[day] = bucket
+        self._size += len(bucket.records)
+        self.loaded_days += 1
+        if day == datetime.utcnow().date() and (self._live_day is None or day >= self._live_day):
+            self._live_day = day
+
+    def _evict(self, keep: Iterable[date] = ()):
+        """Tira os dias menos usados, nunca os de `keep` nem o dia ao vivo."""
+        protected = set(keep)
+        if self._live_day is not None:
+            protected.add(self._live_day)
+        while len(self._days) > self.max_days or self._size > self.max_events:
+            day = next((d for d in self._days if d not in protected), None)
+            if day is None:
+                # Só sobrou o que a consulta em andamento usa: fica acima
+                # do limite até a próxima evicção
+                break
+            bucket = self._days.pop(day)
+            self._size -= len(bucket.records)
+            self.evicted_days += 1
+
+    # =========================
+    # CARGA
+    # =========================
+    def ensure_days(self, start: date, end: date) -> Dict[date, _DayBucket]:
+        """
+        Garante os dias [start, end] na memória (carrega os que faltam) e
+        devolve os buckets deles. Faixas maiores que `max_days` são recusadas.
+        """
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        if len(days) > self.max_days:
+            raise ValueError(f"Faixa de {len(days)} dias excede MEMORY_INDEX_MAX_DAYS={self.max_days}")
+        with self._lock:
+            missing = [d for d in days if d not in self._days]
+            for d in days:
+                if d in self._days:
+                    self._days.move_to_end(d)
+
+        # Faixas contínuas de dias ausentes: uma consulta por faixa
+        ranges, run = [], []
+        for d in missing:
+            if run and d != run[-1] + timedelta(days=1):
+                ranges.append(run)
+                run = []
+            run.append(d)
+        if run:
+            ranges.append(run)
+
+        for run in ranges:
+            records = self._loader(run[0], run[-1] + timedelta(days=1))
+            per_day: Dict[date, List[MemoryRecord]] = {d: [] for d in run}
+            for record in records:
+                per_day.setdefault(record.timestamp.date(), []).append(record)
+            with self._lock:
+                for d in run:
+                    self._install(d, per_day.get(d, []))
+
+        with self._lock:
+            # Evicção só depois de tudo carregado: nenhum dia da faixa sai
+            self._evict(keep=days)
+            if any(d not in self._days for d in days):
+                # Outra consulta tirou um dia entre as cargas: carrega de novo
+                return self.ensure_days(start, end)
+            return {d: self._days[d] for d in days}
+
+    async def warm(self, days: int = WARM_DAYS):
+        """Carrega os últimos `days` dias (startup)."""
+        today = datetime.utcnow().date()
+        await asyncio.to_thread(self.ensure_days, today - timedelta(days=days - 1), today)
+
+    # =========================
+    # CONSULTA
+    # =========================
+    def _window(self, days: int) -> List[_DayBucket]:
+        """Buckets dos últimos `days` dias (no máximo `max_days`), mais novos primeiro."""
+        today = datetime.utcnow().date()
+        start = today - timedelta(days=min(max(days, 1), self.max_days) - 1)
+        buckets = self.ensure_days(start, today)
+        with self._lock:
+            self.queries += 1
+        return [buckets[d] for d in sorted(buckets, reverse=True)]
+
+    def recent(self, days: int = 30) -> List[MemoryRecord]:
+        records = []
+        for bucket in self._window(days):
+            records.extend(bucket.records.values())
+        records.sort(key=lambda r: r.timestamp, reverse=True)
+        return records
+
+    def find_by_entity(self, entity: str, days: int = 90) -> List[MemoryRecord]:
+        """Eventos da entidade (meeting, followup, kpi...), mais recentes primeiro."""
+        records = []
+        for bucket in self._window(days):
+            records.extend(bucket.records[i] for i in bucket.by_domain.get(entity, ()))
+        records.sort(key=lambda r: r.timestamp, reverse=True)
+        return records
+
+    def find_by_keyword(self, text: str, days: int = 90, limit: Optional[int] = None) -> List[MemoryRecord]:
+        """
+        Eventos com algum token do texto no tipo ou no payload; mais tokens
+        em comum primeiro, depois os mais recentes.
+        """
+        terms = set(tokenize(text))
+        if not terms:
+            return []
+        scored = []
+        for bucket in self._window(days):
+            hits: Dict[str, int] = {}
+            for term in terms:
+                for record_id in bucket.tokens.get(term, ()):
+                    hits[record_id] = hits.get(record_id, 0) + 1
+            scored.extend((count, bucket.records[i]) for i, count in hits.items())
+        scored.sort(key=lambda item: (item[0], item[1].timestamp), reverse=True)
+        records = [record for _, record in scored]
+        return records[:limit] if limit else records
+
+    def find_between_dates(self, start: datetime, end: datetime) -> List[MemoryRecord]:
+        start, end = _utc(start), _utc(end)
+        buckets = self.ensure_days(start.date(), end.date())
+        with self._lock:
+            self.queries += 1
+            records = [
+                r for bucket in buckets.values()
+                for r in bucket.records.values() if start <= r.timestamp <= end
+            ]
+        records.sort(key=lambda r: r.timestamp, reverse=True)
+        return records
+
+
+# Instância compartilhada pelo processo (alimentada pelo EventBus/writer)
+memory_index = MemoryIndex()
+
+
+def get_memory_index() -> MemoryIndex:
+    return memory_index
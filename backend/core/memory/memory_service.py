@@ -1,54 +1,54 @@
-from typing import List
-from datetime import datetime, timedelta
+import asyncio
+from typing import List, Optional
 
-from db.models.activity_log import ActivityLog
 from db.repositories.activity_log_repository import ActivityLogRepository
-from core.memory.query_engine import QueryEngine
+from core.memory.memory_index import MemoryIndex, MemoryRecord, memory_index
 
 
 class MemoryService:
     """
     Serviço central de memória institucional.
+
+    Consulta o MemoryIndex (em memória, atualizado por eventos) em vez de
+    carregar e filtrar os últimos 90 dias do banco a cada pergunta.
     """
 
-    def __init__(self, repository: ActivityLogRepository):
+    def __init__(self, repository: Optional[ActivityLogRepository] = None,
+                 index: MemoryIndex = memory_index):
         self.repository = repository
+        self.index = index
 
     async def load_recent_events(
         self,
         days: int = 30
-    ) -> List[ActivityLog]:
+    ) -> List[MemoryRecord]:
         """
         Carrega eventos recentes (default: últimos 30 dias).
         """
-        since = datetime.utcnow() - timedelta(days=days)
-        return await self.repository.list_since(since)
+        return await asyncio.to_thread(self.index.recent, days)
 
     async def query(
         self,
         question: str,
         days: int = 90
-    ) -> List[ActivityLog]:
+    ) -> List[MemoryRecord]:
         """
         Consulta inteligente baseada em texto livre.
         """
-        events = await self.load_recent_events(days=days)
-        engine = QueryEngine(events)
-
         # Estratégia simples (robusta e previsível)
         keyword = question.lower()
 
         if "reuni" in keyword:
-            return engine.find_by_entity("meeting")
-
-        if "follow" in keyword:
-            return engine.find_by_entity("followup")
-
-        if "kpi" in keyword or "indicador" in keyword:
-            return engine.find_by_entity("kpi")
-
-        if "document" in keyword:
-            return engine.find_by_entity("document")
-
-        # fallback semântico
-        return engine.find_by_keyword(keyword)
+            entity = "meeting"
+        elif "follow" in keyword:
+            entity = "followup"
+        elif "kpi" in keyword or "indicador" in keyword:
+            entity = "kpi"
+        elif "document" in keyword:
+            entity = "document"
+        else:
+            # fallback: índice invertido de tokens do payload
+            return await asyncio.to_thread(self.index.find_by_keyword, question, days)
+
+        # Só carrega do banco os dias que não estão na memória
+        return await asyncio.to_thread(self.index.find_by_entity, entity, days)
@@ -0,0 +1,381 @@
+#E:\MAWDSLEYS-AGENTE\backend\core\memory\memory_store.py
+
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+# Motor de embeddings é opcional: sem ele a busca fica só por recência
+try:
+    from ai_engine.embeddings.embedding_loader import embed_query, generate_embeddings
+    from ai_engine.embeddings.vector_index import VectorIndex
+    VECTOR_SEARCH_AVAILABLE = True
+except Exception as e:
+    print(f"⚠️ [MemoryStore] Busca vetorial indisponível: {e}")
+    VECTOR_SEARCH_AVAILABLE = False
+
+# =========================
+# CONFIG
+# =========================
+# Orçamento da busca (embedding da pergunta + ranking); estourou, vai por recência
+SEARCH_BUDGET_MS = float(os.getenv("MEMORY_SEARCH_BUDGET_MS", "150"))
+
+# Peso da recência no score final e meia-vida do decaimento
+RECENCY_WEIGHT = float(os.getenv("MEMORY_RECENCY_WEIGHT", "0.2"))
+RECENCY_HALF_LIFE_DAYS = float(os.getenv("MEMORY_RECENCY_HALF_LIFE_DAYS", "14"))
+
+# Candidatos do ranking vetorial por resultado pedido (antes do decaimento)
+CANDIDATE_FACTOR = int(os.getenv("MEMORY_CANDIDATE_FACTOR", "4"))
+
+# Limites de memória: memórias por usuário e total entre usuários (LRU)
+MAX_ROWS_PER_USER = int(os.getenv("MEMORY_VECTOR_MAX_ROWS_PER_USER", "2000"))
+MAX_ROWS = int(os.getenv("MEMORY_VECTOR_MAX_ROWS", "50000"))
+
+# Intervalo para puxar do banco memórias gravadas por outros workers
+SYNC_SECONDS = float(os.getenv("MEMORY_SYNC_SECONDS", "30"))
+
+
+class MemoryHit:
+    """Memória devolvida pela busca (mesmos campos lidos pelo chat/orquestrador)."""
+
+    __slots__ = ("id", "user_id", "entity_type", "entity_id", "content", "metadata", "created_at", "score")
+
+    def __init__(self, id, user_id, entity_type, entity_id, content, metadata, created_at, score=0.0):
+        self.id = id
+        self.user_id = user_id
+        self.entity_type = entity_type
+        self.entity_id = entity_id
+        self.content = content
+        self.metadata = metadata
+        self.created_at = created_at
+        self.score = score
+
+    @classmethod
+    def from_entry(cls, entry) -> "MemoryHit":
+        return cls(entry.id, entry.user_id, entry.entity_type, entry.entity_id, entry.content,
+                   entry.entry_metadata or {}, entry.created_at or datetime.utcnow())
+
+    def scored(self, score: float) -> "MemoryHit":
+        return MemoryHit(self.id, self.user_id, self.entity_type, self.entity_id, self.content,
+                         self.metadata, self.created_at, round(score, 4))
+
+
+def to_blob(embedding) -> bytes:
+    return np.asarray(embedding, dtype=np.float32).tobytes()
+
+
+def from_blob(blob: bytes) -> np.ndarray:
+    return np.frombuffer(blob, dtype=np.float32)
+
+
+def recency(created_at: datetime, now: datetime, half_life_days: float = RECENCY_HALF_LIFE_DAYS) -> float:
+    """1.0 para agora, 0.5 após uma meia-vida, 0.25 após duas..."""
+    age_days = max(0.0, (now - created_at).total_seconds() / 86400)
+    return math.pow(0.5, age_days / half_life_days)
+
+
+class _UserPartition:
+    """Memórias de um usuário: dados, filtro por entity_type e índice vetorial."""
+
+    __slots__ = ("entries", "by_type", "vectors", "rows", "last_created_at", "last_sync")
+
+    def __init__(self):
+        self.entries: Dict[str, MemoryHit] = {}
+        self.by_type: Dict[str, List[str]] = {}
+        self.vectors = VectorIndex() if VECTOR_SEARCH_AVAILABLE else None
+        self.rows: Dict[str, int] = {}
+        self.last_created_at: Optional[datetime] = None
+        self.last_sync = time.monotonic()
+
+    def add(self, hit: MemoryHit) -> bool:
+        if hit.id in self.entries:
+            return False
+        self.entries[hit.id] = hit
+        self.by_type.setdefault(hit.entity_type, []).append(hit.id)
+        if self.last_created_at is None or hit.created_at > self.last_created_at:
+            self.last_created_at = hit.created_at
+        return True
+
+    def add_vector(self, entry_id: str, embedding) -> bool:
+        if self.vectors is None or entry_id in self.rows or entry_id not in self.entries:
+            return False
+        try:
+            self.vectors.add({"id": entry_id}, embedding)
+        except ValueError:
+            # Dimensão diferente (troca de modelo): fica só na recência
+            return False
+        self.rows[entry_id] = len(self.vectors) - 1
+        return True
+
+    def candidates(self, entity_types: Optional[Sequence[str]], entity_id: Optional[str]) -> List[MemoryHit]:
+        if entity_types:
+            ids = [i for t in entity_types for i in self.by_type.get(t, ())]
+            hits = [self.entries[i] for i in ids]
+        else:
+            hits = list(self.entries.values())
+        if entity_id is not None:
+            hits = [h for h in hits if h.entity_id == str(entity_id)]
+        return hits
+
+
+# =========================
+# STORE
+# =========================
+class MemoryVectorStore:
+    """
+    Busca semântica das memórias do agente (memory_entries) por usuário.
+
+    - Cada usuário tem sua partição em RAM: as memórias e um VectorIndex
+      só com as linhas dele; filtros de entity_type/entity_id viram o
+      subconjunto de linhas ANTES da pontuação
+    - O embedding é gerado depois da gravação (executor próprio), salvo
+      em memory_entries.embedding e somado à partição: a carga seguinte
+      não chama o provedor de novo
+    - score = (1 - RECENCY_WEIGHT) * cosseno + RECENCY_WEIGHT * decaimento
+    - A pergunta tem SEARCH_BUDGET_MS para virar embedding; se estourar
+      (ou sem provedor), o resultado é por recência e o embedding segue
+      em segundo plano (fica no cache de consultas)
+    - Partições em LRU limitadas por MAX_ROWS (voltam do banco se precisar)
+    """
+
+    def __init__(self, budget_ms: float = SEARCH_BUDGET_MS, max_rows: int = MAX_ROWS,
+                 max_rows_per_user: int = MAX_ROWS_PER_USER):
+        self.budget_ms = budget_ms
+        self.max_rows = max_rows
+        self.max_rows_per_user = max_rows_per_user
+        self._users: "OrderedDict[str, _UserPartition]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.RLock()
+        self._query_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="memory-query")
+        self._embed_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="memory-embed")
+
+        self.searches = 0
+        self.vector_searches = 0
+        self.budget_fallbacks = 0
+        self.embedded = 0
+        self.loads = 0
+        self.evictions = 0
+        self.last_search_ms = 0.0
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "available": VECTOR_SEARCH_AVAILABLE,
+            "users": len(self._users),
+            "rows": self._size,
+            "searches": self.searches,
+            "vector_searches": self.vector_searches,
+            "budget_fallbacks": self.budget_fallbacks,
+            "embedded": self.embedded,
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "last_search_ms": self.last_search_ms,
+            "budget_ms": self.budget_ms,
+        }
+
+    # =========================
+    # PARTIÇÕES
+    # =========================
+    def _partition(self, db, user_id: str) -> _UserPartition:
+        with self._lock:
+            partition = self._users.get(user_id)
+            if partition is not None:
+                self._users.move_to_end(user_id)
+                if time.monotonic() - partition.last_sync < SYNC_SECONDS:
+                    return partition
+
+        from db.repositories.memory_repository import MemoryRepository
+        repo = MemoryRepository(db)
+
+        if partition is None:
+            entries = repo.list_for_user(user_id, limit=self.max_rows_per_user)
+            partition = _UserPartition()
+            self.loads += 1
+        else:
+            entries = repo.list_for_user(user_id, since=partition.last_created_at)
+
+        missing = []
+        with self._lock:
+            for entry in reversed(entries):
+                hit = MemoryHit.from_entry(entry)
+                if not partition.add(hit):
+                    continue
+                if entry.embedding:
+                    partition.add_vector(hit.id, from_blob(entry.embedding))
+                else:
+                    missing.append(hit)
+            partition.last_sync = time.monotonic()
+
+            current = self._users.pop(user_id, None)
+            if current is not None:
+                self._size -= len(current.entries)
+            # Cresceu demais: sai do cache e a próxima busca recarrega só as mais recentes
+            if len(partition.entries) <= 2 * self.max_rows_per_user:
+                self._users[user_id] = partition
+                self._size += len(partition.entries)
+                self._evict(keep=user_id)
+
+        if missing:
+            self._schedule_embeddings(user_id, missing)
+        return partition
+
+    def _evict(self, keep: str):
+        while len(self._users) > 1 and self._size > self.max_rows:
+            user_id = next(iter(self._users))
+            if user_id == keep:
+                self._users.move_to_end(user_id)
+                user_id = next(iter(self._users))
+            self._size -= len(self._users.pop(user_id).entries)
+            self.evictions += 1
+
+    # =========================
+    # ESCRITA
+    # =========================
+    def remember_after_commit(self, db, entry):
+        """
+        Memória gravada na transação de `db`: só entra no índice depois do
+        commit (rollback, ou savepoint desfeito, descarta)
+        """
+        db.info.setdefault(_PENDING_KEY, []).append((entry, MemoryHit.from_entry(entry)))
+
+    def remember(self, entry):
+        """Memória já gravada: entra na partição e ganha embedding em segundo plano."""
+        hit = entry if isinstance(entry, MemoryHit) else MemoryHit.from_entry(entry)
+        with self._lock:
+            partition = self._users.get(hit.user_id)
+            if partition is not None and partition.add(hit):
+                self._size += 1
+        self._schedule_embeddings(hit.user_id, [hit])
+
+    def _schedule_embeddings(self, user_id: str, hits: List[MemoryHit]):
+        if VECTOR_SEARCH_AVAILABLE and hits:
+            self._embed_executor.submit(self._embed, user_id, hits)
+
+    def _embed(self, user_id: str, hits: List[MemoryHit]):
+        try:
+            embeddings = generate_embeddings([h.content for h in hits])
+
+            from database.session import db_session
+            from db.repositories.memory_repository import MemoryRepository
+            with db_session() as db:
+                MemoryRepository(db).set_embeddings({
+                    h.id: to_blob(e) for h, e in zip(hits, embeddings)
+                })
+
+            with self._lock:
+                partition = self._users.get(user_id)
+                if partition is not None:
+                    for hit, embedding in zip(hits, embeddings):
+                        partition.add_vector(hit.id, embedding)
+            self.embedded += len(hits)
+        except Exception as e:
+            # Memórias continuam disponíveis pela recência
+            print(f"⚠️ [MemoryStore] Falha ao gerar embeddings: {e}")
+
+    # =========================
+    # CONSULTA
+    # =========================
+    def search(self, db, query: str, user_id: Optional[str] = None, limit: int = 5,
+               entity_types: Optional[Sequence[str]] = None,
+               entity_id: Optional[str] = None) -> List[MemoryHit]:
+        started = time.perf_counter()
+        self.searches += 1
+
+        if user_id is None:
+            # Sem usuário (ex.: ata de uma reunião): filtro direto no banco
+            from db.repositories.memory_repository import MemoryRepository
+            entries = MemoryRepository(db).find(entity_types=entity_types, entity_id=entity_id, limit=limit)
+            return [MemoryHit.from_entry(e) for e in entries]
+
+        # Embedding da pergunta em paralelo com a carga da partição
+        pending = None
+        if VECTOR_SEARCH_AVAILABLE and query:
+            pending = self._query_executor.submit(embed_query, query)
+
+        partition = self._partition(db, str(user_id))
+        with self._lock:
+            candidates = partition.candidates(entity_types, entity_id)
+        if not candidates:
+            return []
+
+        query_embedding = None
+        if pending is not None:
+            remaining = self.budget_ms / 1000 - (time.perf_counter() - started)
+            try:
+                query_embedding = pending.result(timeout=max(remaining, 0))
+            except FutureTimeout:
+                self.budget_fallbacks += 1
+            except Exception as e:
+                print(f"⚠️ [MemoryStore] Embedding da consulta falhou: {e}")
+
+        results = self._rank(partition, candidates, query_embedding, limit)
+        self.last_search_ms = round((time.perf_counter() - started) * 1000, 2)
+        return results
+
+    def _rank(self, partition: _UserPartition, candidates: List[MemoryHit],
+              query_embedding, limit: int) -> List[MemoryHit]:
+        now = datetime.utcnow()
+        by_recency = sorted(candidates, key=lambda h: h.created_at, reverse=True)
+
+        similarity: Dict[str, float] = {}
+        if query_embedding is not None:
+            with self._lock:
+                rows = [partition.rows[h.id] for h in candidates if h.id in partition.rows]
+                if rows:
+                    hits = partition.vectors.search(query_embedding, top_k=limit * CANDIDATE_FACTOR, rows=rows)
+                    similarity = {doc["id"]: score for score, doc in hits}
+            self.vector_searches += 1
+
+        if not similarity:
+            return [h.scored(recency(h.created_at, now)) for h in by_recency[:limit]]
+
+        # Vizinhos mais próximos + as mais recentes (ainda sem embedding ou fora do top)
+        pool = {h.id: h for h in by_recency[:limit]}
+        pool.update({i: partition.entries[i] for i in similarity})
+        scored = [
+            h.scored((1 - RECENCY_WEIGHT) * similarity.get(h.id, 0.0)
+                     + RECENCY_WEIGHT * recency(h.created_at, now))
+            for h in pool.values()
+        ]
+        scored.sort(key=lambda h: h.score, reverse=True)
+        return scored[:limit]
+
+    def recent(self, db, user_id: str, limit: int = 5) -> List[MemoryHit]:
+        partition = self._partition(db, str(user_id))
+        with self._lock:
+            hits = sorted(partition.entries.values(), key=lambda h: h.created_at, reverse=True)
+        return hits[:limit]
+
+
+# Instância compartilhada pelo processo
+memory_store = MemoryVectorStore()
+
+# Memórias aguardando o commit da sessão (Session.info)
+_PENDING_KEY = "memory_store_pending"
+
+
+@event.listens_for(Session, "after_commit")
+def _remember_committed(session):
+    # Commit de savepoint não confirma nada no banco: espera o da transação externa
+    if session.in_nested_transaction():
+        return
+    for entry, hit in session.info.pop(_PENDING_KEY, ()):
+        if inspect(entry).persistent:
+            memory_store.remember(hit)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_rolled_back(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
+
+
+def get_memory_store() -> MemoryVectorStore:
+    return memory_store
@@ -40,11 +40,12 @@ class QueryEngine:
 
     def find_by_entity(self, entity: str) -> List[ActivityLog]:
         """
-        Busca eventos por entidade (meeting, followup, kpi, document, chat).
+        Busca eventos por entidade (meeting, followup, kpi, document, chat):
+        o domínio do tipo, meeting.created -> meeting.
         """
         return [
             e for e in self.events
-            if e.entity == entity
+            if (e.type or e.action).split(".", 1)[0] == entity
         ]
 
     def find_between_dates(
@@ -1,225 +1,186 @@
 # E:\MAWDSLEYS-AGENTE\backend\core\middleware\activity_logger.py
 import time
 import os
-import asyncio
 from typing import Optional
+from urllib.parse import parse_qsl
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
-from sqlalchemy.orm import Session
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from core.events.activity_log import ActivityEvent
-from db.repositories.activity_log_repository import ActivityLogRepository
-from database.session import SessionLocal
+from core.events.log_writer import activity_log_writer
+from core.events.event_bus import event_bus
+
+EXCLUDED_PATHS = (
+    "/health",
+    "/metrics",
+    "/docs",
+    "/redoc",
+    "/openapi.json",
+    "/favicon.ico",
+    "/static/",
+    "/assets/",
+    "/api/v1/chat/health",
+)
+
+LOGGED_METHODS = {"GET", "POST", "PUT", "DELETE", "PATCH"}
+
+
+class ActivityLogMiddleware:
+    """
+    Middleware global para registro automático de eventos (ASGI puro).
+
+    - Status e tempo vêm das mensagens de `send` (não envolve o body:
+      respostas em streaming passam direto)
+    - Usuário vem do resultado do require_any_auth guardado no scope
+      (scope["state"]["auth"]), sem decodificar o JWT de novo
+    - Banco só é tocado quando o evento é registrado: o evento vai para o
+      ActivityLogWriter e para o EventBus (workers com sessão própria)
+    """
 
-class ActivityLogMiddleware(BaseHTTPMiddleware):
-    """Middleware global para registro automático de eventos"""
-    
     def __init__(self, app: ASGIApp):
-        super().__init__(app)
-    
-    async def dispatch(self, request: Request, call_next):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self._should_log_request(scope["method"], scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
         # Início da request
-        start_time = time.time()
-        
-        # Cria sessão do DB
-        db = SessionLocal()
-        request.state.db = db
-        request.state.user_id = None
-        
+        start_time = time.perf_counter()
+        state = scope.setdefault("state", {})
+        response = {"status_code": 500, "ttfb": None}
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                response["status_code"] = message["status"]
+                response["ttfb"] = time.perf_counter() - start_time
+            await send(message)
+
         try:
-            # Extrair user_id do token
-            user_id = await self._extract_user_id(request)
-            request.state.user_id = user_id
-            
-            # Processa a request
-            response = await call_next(request)
-            
-            # Calcula tempo de resposta
-            process_time = time.time() - start_time
-            
-            # Registra evento
-            if self._should_log_request(request, response.status_code):
-                await self._log_event_async(
-                    request=request,
-                    response=response,
-                    process_time=process_time,
-                    user_id=user_id,
-                    db=db
-                )
-            
-            return response
-            
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
             # Log de erro
-            await self._log_error_async(request, str(e), user_id, db)
+            self._log_error(scope, str(e), self._user_id(state))
             raise
-            
-        finally:
-            # Fecha conexão com DB
-            db.close()
-    
-    async def _extract_user_id(self, request: Request) -> Optional[str]:
-        """Extrai user_id do token de autenticação"""
-        auth_header = request.headers.get("Authorization")
-        if auth_header and auth_header.startswith("Bearer "):
-            try:
-                token = auth_header.replace("Bearer ", "")
-                
-                # Tenta decodificar JWT
-                try:
-                    from api.routes.auth import decode_token
-                    payload = decode_token(token)
-                    if payload and "user_id" in payload:
-                        return str(payload["user_id"])
-                except (ImportError, Exception):
-                    pass
-                
-                # Fallback para desenvolvimento
-                if "_" in token:
-                    parts = token.split("_")
-                    if len(parts) > 1 and parts[-1].isdigit():
-                        return f"user_{parts[-1]}"
-                        
-            except Exception as e:
-                print(f"[Middleware] Erro ao decodificar token: {e}")
-        
+
+        # Registra evento (tempo total inclui o envio do body)
+        self._log_event(
+            scope=scope,
+            status_code=response["status_code"],
+            process_time=time.perf_counter() - start_time,
+            ttfb=response["ttfb"],
+            user_id=self._user_id(state),
+        )
+
+    def _user_id(self, state: dict) -> Optional[str]:
+        """Usuário autenticado pelo require_any_auth nesta request (se houve)"""
+        auth = state.get("auth")
+        if auth and auth.get("user_id") is not None:
+            return f"user_{auth['user_id']}"
         return None
-    
-    def _should_log_request(self, request: Request, status_code: int) -> bool:
+
+    def _should_log_request(self, method: str, path: str) -> bool:
         """Define quais requests devem ser logadas"""
-        excluded_paths = [
-            "/health", 
-            "/metrics",
-            "/docs",
-            "/redoc",
-            "/openapi.json",
-            "/favicon.ico",
-            "/static/",
-            "/assets/",
-            "/api/v1/chat/health",
-        ]
-        
-        path = request.url.path
-        
         # Não loga requisições excluídas
-        if any(path.startswith(excluded) for excluded in excluded_paths):
+        if path.startswith(EXCLUDED_PATHS):
             return False
-        
-        # Não loga OPTIONS (CORS preflight)
-        if request.method == "OPTIONS":
-            return False
-        
-        # Loga métodos HTTP importantes
-        return request.method in ["GET", "POST", "PUT", "DELETE", "PATCH"]
-    
-    async def _log_event_async(self, request: Request, response: Response, 
-                              process_time: float, user_id: Optional[str], db: Session):
-        """Registra evento de forma assíncrona"""
+
+        # Loga métodos HTTP importantes (OPTIONS/CORS preflight fica de fora)
+        return method in LOGGED_METHODS
+
+    def _header(self, scope: Scope, name: bytes) -> str:
+        for key, value in scope.get("headers") or ():
+            if key == name:
+                return value.decode("latin-1")
+        return ""
+
+    def _log_event(self, scope: Scope, status_code: int, process_time: float,
+                   ttfb: Optional[float], user_id: Optional[str]):
+        """Monta o evento e entrega ao writer (não bloqueia a request)"""
         try:
+            method = scope["method"]
+            path = scope["path"]
+            client = scope.get("client")
+
             # Prepara payload do evento
             payload = {
-                "method": request.method,
-                "path": request.url.path,
-                "status_code": response.status_code,
+                "method": method,
+                "path": path,
+                "status_code": status_code,
                 "response_time_ms": round(process_time * 1000, 2),
-                "query_params": dict(request.query_params),
-                "user_agent": request.headers.get("user-agent", ""),
-                "ip_address": request.client.host if request.client else None,
+                "ttfb_ms": round(ttfb * 1000, 2) if ttfb is not None else None,
+                "query_params": dict(parse_qsl(scope.get("query_string", b"").decode("latin-1"))),
+                "user_agent": self._header(scope, b"user-agent"),
+                "ip_address": client[0] if client else None,
                 "timestamp": time.time(),
             }
-            
+
             if user_id:
                 payload["user_id"] = user_id
-            
+
             # Tenta pegar ID da entidade da URL
-            path_parts = request.url.path.strip("/").split("/")
+            path_parts = path.strip("/").split("/")
             if len(path_parts) >= 2 and path_parts[-1].isdigit():
                 payload["entity_id"] = path_parts[-1]
-            
+
             # Determina tipo de evento
-            event_type = f"api.{request.method.lower()}"
-            if "meetings" in request.url.path:
-                event_type = f"meeting.{request.method.lower()}"
-            elif "chat" in request.url.path:
-                event_type = f"chat.{request.method.lower()}"
-            
+            event_type = f"api.{method.lower()}"
+            if "meetings" in path:
+                event_type = f"meeting.{method.lower()}"
+            elif "chat" in path:
+                event_type = f"chat.{method.lower()}"
+
             # Cria evento
             event = ActivityEvent(
                 type=event_type,
                 entity="http_request",
-                entity_id=f"{request.method}:{request.url.path}:{int(time.time())}",
+                entity_id=f"{method}:{path}:{int(time.time())}",
                 actor=user_id or "anonymous",
                 payload=payload
             )
-            
-            # 1. Registra no Activity Log
-            repo = ActivityLogRepository(db)
-            await repo.save(event)
-            
+
+            # 1. Registra no Activity Log (em lote, fora do request)
+            activity_log_writer.enqueue(event)
+
             # 2. 🔥 PROCESSAMENTO AUTOMÁTICO (INTEGRAÇÃO COM SEU EVENTPROCESSOR)
-            await self._trigger_automated_processing(event, db)
-            
+            self._trigger_automated_processing(event)
+
             # Log para debug
             if os.getenv("ENVIRONMENT") == "development":
-                print(f"[ActivityLogMiddleware] Evento registrado: {event_type} {request.url.path} - {response.status_code}")
-            
+                print(f"[ActivityLogMiddleware] Evento registrado: {event_type} {path} - {status_code}")
+
         except Exception as e:
             print(f"[ActivityLogMiddleware] Erro ao registrar evento: {e}")
-    
-    async def _trigger_automated_processing(self, event: ActivityEvent, db: Session):
-        """Dispara o processamento automático do evento usando SEU EventProcessor"""
-        try:
-            # ✅ USA O SEU EVENTPROCESSOR EXISTENTE
-            from core.automation.event_processor import EventProcessor
-            
-            processor = EventProcessor(db)
-            
-            # Executa em background (não bloqueia)
-            asyncio.create_task(processor.process_event(event))
-            
-            if os.getenv("ENVIRONMENT") == "development":
-                print(f"[Middleware] ✅ Evento enviado para EventProcessor: {event.type}")
-                
-        except ImportError:
-            # Se não encontrar, apenas avisa
-            if os.getenv("ENVIRONMENT") == "development":
-                print(f"[Middleware] ⚠️ EventProcessor não encontrado em core.automation")
-        except Exception as e:
-            print(f"[Middleware] ⚠️ Erro no EventProcessor: {e}")
-    
-    async def _log_error_async(self, request: Request, error_message: str, 
-                              user_id: Optional[str], db: Session):
-        """Registra erros de forma assíncrona"""
+
+    def _trigger_automated_processing(self, event: ActivityEvent):
+        """Entrega o evento ao SEU EventProcessor via EventBus (não bloqueia)"""
+        event_bus.publish(event)
+
+        if os.getenv("ENVIRONMENT") == "development":
+            print(f"[Middleware] ✅ Evento enviado para EventBus: {event.type}")
+
+    def _log_error(self, scope: Scope, error_message: str, user_id: Optional[str]):
+        """Registra erros sem bloquear a request"""
         try:
+            client = scope.get("client")
             event = ActivityEvent(
                 type="api.error",
                 entity="http_request",
-                entity_id=f"error:{request.method}:{request.url.path}:{int(time.time())}",
+                entity_id=f"error:{scope['method']}:{scope['path']}:{int(time.time())}",
                 actor=user_id or "anonymous",
                 payload={
-                    "method": request.method,
-                    "path": request.url.path,
+                    "method": scope["method"],
+                    "path": scope["path"],
                     "error": error_message,
-                    "ip_address": request.client.host if request.client else None,
+                    "ip_address": client[0] if client else None,
                     "timestamp": time.time(),
                 }
             )
-            
-            repo = ActivityLogRepository(db)
-            await repo.save(event)
-            
+
+            activity_log_writer.enqueue(event)
+
             # Também processa erros automaticamente
-            await self._trigger_automated_processing(event, db)
-            
+            self._trigger_automated_processing(event)
+
         except Exception as e:
             print(f"[ActivityLogMiddleware] Erro ao registrar erro: {e}")
-
-# Função auxiliar
-def get_db_from_request(request: Request) -> Session:
-    """Retorna a sessão do DB injetada pelo middleware"""
-    if hasattr(request.state, 'db'):
-        return request.state.db
-    else:
-        return SessionLocal()
\ No newline at end of file
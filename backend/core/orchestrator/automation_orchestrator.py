@@ -5,6 +5,7 @@ from typing import Optional, Dict, Any
 import asyncio
 
 from core.memory.memory_engine import MemoryEngine
+from core.alerts.alert import Alert
 from core.alerts.alert_engine import AlertEngine
 from core.events.activity_log import ActivityEvent
 from db.repositories.activity_log_repository import ActivityLogRepository
@@ -12,8 +13,13 @@ from db.repositories.activity_log_repository import ActivityLogRepository
 class AutomationOrchestrator:
     """Orquestrador de automações do MAWDSLEYS"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, commit: bool = True):
+        """
+        commit=False: tudo fica na transação do chamador (OutboxRelay, que
+        confirma o lote inteiro de uma vez)
+        """
         self.db = db
+        self.commit = commit
         self.memory_engine = MemoryEngine(db)
         self.alert_engine = AlertEngine(db)
         self.activity_repo = ActivityLogRepository(db)
@@ -34,7 +40,8 @@ class AutomationOrchestrator:
             await self._trigger_no_minutes_alert(
                 user_id=user_id,
                 meeting_id=meeting_id,
-                meeting_title=meeting_title
+                meeting_title=meeting_title,
+                source_event_id=meeting_data.get("event_id")
             )
             
             # 3. AÇÃO: Cria follow-up automático
@@ -50,6 +57,9 @@ class AutomationOrchestrator:
                 meeting_id=meeting_id,
                 action="automation_triggered"
             )
+
+        if self.commit:
+            self.db.commit()
     
     def _check_meeting_minutes(self, meeting_id: int) -> bool:
         """Verifica se a reunião tem ata registrada"""
@@ -63,21 +73,23 @@ class AutomationOrchestrator:
         
         return len(memories) > 0
     
-    async def _trigger_no_minutes_alert(self, user_id: int, meeting_id: int, meeting_title: str):
+    async def _trigger_no_minutes_alert(self, user_id: int, meeting_id: int, meeting_title: str,
+                                        source_event_id: Optional[str] = None):
         """Dispara alerta sobre falta de ata"""
-        self.alert_engine.emit(
-            type="meeting.no_minutes",
-            severity="warning",
+        alert = Alert(
+            level="warning",
             title="Reunião concluída sem ata",
-            message=f"A reunião '{meeting_title}' foi concluída sem registro de ata. Crie o follow-up.",
-            entity="meeting",
-            entity_id=str(meeting_id),
-            actor=str(user_id),
-            metadata={
+            description=f"A reunião '{meeting_title}' foi concluída sem registro de ata. Crie o follow-up.",
+            source_event_id=source_event_id or f"meeting_{meeting_id}",
+            payload={
+                "alert_type": "meeting.no_minutes",
+                "meeting_id": meeting_id,
                 "meeting_title": meeting_title,
+                "organizer_id": user_id,
                 "suggested_action": "Criar ata da reunião"
             }
         )
+        await self.alert_engine.save_alert(alert, commit=self.commit)
         
         # Registra evento
         event = ActivityEvent(
@@ -91,7 +103,7 @@ class AutomationOrchestrator:
                 "timestamp": datetime.utcnow().isoformat()
             }
         )
-        await self.activity_repo.save(event)
+        await self.activity_repo.save(event, commit=self.commit)
     
     async def _create_follow_up_task(self, user_id: int, meeting_id: int, meeting_title: str):
         """Cria tarefa de follow-up automática"""
@@ -139,4 +151,16 @@ def get_orchestrator(db: Session) -> AutomationOrchestrator:
     global _orchestrator_instance
     if _orchestrator_instance is None:
         _orchestrator_instance = AutomationOrchestrator(db)
-    return _orchestrator_instance
\ No newline at end of file
+    return _orchestrator_instance
+
+# =========================
+# HANDLER DO EVENTBUS
+# =========================
+async def meeting_completed_handler(event: ActivityEvent, db: Session):
+    """Reunião concluída (via outbox) → orquestração de ata/alerta/follow-up"""
+    await AutomationOrchestrator(db, commit=False).process_meeting_completion({
+        "id": int(event.entity_id),
+        "organizer_id": event.payload.get("organizer_id"),
+        "title": event.payload.get("title", "Reunião sem título"),
+        "event_id": event.id,
+    })
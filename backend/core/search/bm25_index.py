@@ -0,0 +1,182 @@
+# E:\MAWDSLEYS-AGENTE\backend\core\search\bm25_index.py
+
+import heapq
+import math
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+_token_re = re.compile(r"\w+", re.UNICODE)
+
+# Stopwords pt-BR mais frequentes (já sem acento)
+STOPWORDS = {
+    "a", "o", "as", "os", "de", "da", "do", "das", "dos", "e", "em", "no", "na",
+    "nos", "nas", "um", "uma", "uns", "umas", "para", "por", "com", "sem", "que",
+    "se", "ao", "aos", "ou", "como", "mais", "mas", "sua", "seu", "suas", "seus",
+    "ja", "ha", "pelo", "pela", "the", "of", "and", "to", "in",
+}
+
+
+def fold_accents(text: str) -> str:
+    """'Instalação' -> 'instalacao' (busca insensível a acento e caixa)."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text: str) -> List[str]:
+    return [
+        t for t in _token_re.findall(fold_accents(text))
+        if len(t) > 1 and t not in STOPWORDS
+    ]
+
+
+class BM25Index:
+    """
+    Índice invertido com ranking BM25.
+
+    - postings: termo -> {doc_id: tf}; a busca só visita documentos que
+      contêm algum termo da consulta (sub-linear no tamanho da base)
+    - posting lists de tag, categoria e idioma para filtros
+    - atualização incremental (add/remove), sem reconstruir o índice
+    """
+
+    TITLE_WEIGHT = 2  # tokens do título contam em dobro
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_len: Dict[str, int] = {}
+        self.total_len = 0
+        self.tags: Dict[str, Set[str]] = {}
+        self.categories: Dict[str, Set[str]] = {}
+        self.languages: Dict[str, Set[str]] = {}
+        self._doc_keys: Dict[str, Tuple[List[str], List[str], Optional[str], Optional[str]]] = {}
+
+    def __len__(self):
+        return len(self.doc_len)
+
+    def __contains__(self, doc_id):
+        return doc_id in self.doc_len
+
+    # ==========================
+    # ATUALIZAÇÃO
+    # ==========================
+    def add(self, doc_id: str, title: str = "", content: str = "",
+            tags: Iterable[str] = (), category: Optional[str] = None,
+            language: Optional[str] = None):
+        if doc_id in self.doc_len:
+            self.remove(doc_id)
+
+        tags = [fold_accents(t) for t in (tags or []) if t]
+        terms = tokenize(title) * self.TITLE_WEIGHT + tokenize(content)
+        for tag in tags:
+            terms.extend(tokenize(tag))
+
+        counts = Counter(terms)
+        for term, tf in counts.items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+
+        self.doc_len[doc_id] = len(terms)
+        self.total_len += len(terms)
+
+        category_key = fold_accents(category) if category else None
+        language_key = language.lower() if language else None
+        for tag in tags:
+            self.tags.setdefault(tag, set()).add(doc_id)
+        if category_key:
+            self.categories.setdefault(category_key, set()).add(doc_id)
+        if language_key:
+            self.languages.setdefault(language_key, set()).add(doc_id)
+
+        self._doc_keys[doc_id] = (list(counts), tags, category_key, language_key)
+
+    def remove(self, doc_id: str):
+        keys = self._doc_keys.pop(doc_id, None)
+        if keys is None:
+            return
+        terms, tags, category_key, language_key = keys
+
+        for term in terms:
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self.postings[term]
+
+        self.total_len -= self.doc_len.pop(doc_id, 0)
+
+        for key, lists in ((category_key, self.categories), (language_key, self.languages)):
+            if key and key in lists:
+                lists[key].discard(doc_id)
+        for tag in tags:
+            if tag in self.tags:
+                self.tags[tag].discard(doc_id)
+
+    # ==========================
+    # FILTROS
+    # ==========================
+    def filter_ids(self, categories: Optional[Iterable[str]] = None,
+                   tags: Optional[Iterable[str]] = None,
+                   language: Optional[str] = None) -> Optional[Set[str]]:
+        """
+        Interseção das posting lists dos filtros (None = sem filtro).
+        Categorias e tags são OR entre si; os grupos são AND.
+        """
+        allowed = None
+
+        def restrict(current, ids):
+            return set(ids) if current is None else current & ids
+
+        if categories:
+            ids = set()
+            for c in categories:
+                ids |= self.categories.get(fold_accents(c), set())
+            allowed = restrict(allowed, ids)
+
+        if tags:
+            ids = set()
+            for t in tags:
+                ids |= self.tags.get(fold_accents(t), set())
+            allowed = restrict(allowed, ids)
+
+        if language:
+            allowed = restrict(allowed, self.languages.get(language.lower(), set()))
+
+        return allowed
+
+    # ==========================
+    # BUSCA
+    # ==========================
+    def search(self, query: str, limit: int = 10,
+               allowed: Optional[Set[str]] = None) -> List[Tuple[float, str]]:
+        """Retorna [(score_bm25, doc_id)] em ordem decrescente."""
+        n_docs = len(self.doc_len)
+        if not n_docs or (allowed is not None and not allowed):
+            return []
+
+        avg_len = self.total_len / n_docs if n_docs else 0.0
+        scores: Dict[str, float] = {}
+
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            df = len(posting)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+            # Com filtro seletivo, percorre o menor dos dois conjuntos
+            if allowed is not None and len(allowed) < len(posting):
+                matches = ((d, posting[d]) for d in allowed if d in posting)
+            else:
+                matches = (
+                    (d, tf) for d, tf in posting.items()
+                    if allowed is None or d in allowed
+                )
+
+            for doc_id, tf in matches:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_len[doc_id] / avg_len)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        return heapq.nlargest(limit, ((s, d) for d, s in scores.items()))
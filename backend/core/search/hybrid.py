@@ -0,0 +1,30 @@
+# E:\MAWDSLEYS-AGENTE\backend\core\search\hybrid.py
+
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+# Constante do RRF (Cormack et al.): amortece a diferença entre o 1º e o 2º
+RRF_K = 60
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Iterable[str]], k: int = RRF_K,
+                           limit: int = 10) -> List[Tuple[float, str]]:
+    """
+    Funde listas ordenadas de ids: score(d) = Σ 1 / (k + posição).
+    Só usa a posição, então BM25 e cosseno não precisam estar na mesma escala.
+
+    Retorna [(relevância 0..1, id)]: o score é dividido pelo máximo possível
+    (1º lugar em todas as listas), então 1.0 = topo em todos os rankings.
+    """
+    rankings = [list(r) for r in rankings]
+    active = [r for r in rankings if r]
+    if not active:
+        return []
+
+    fused: Dict[str, float] = {}
+    for ranking in active:
+        for position, doc_id in enumerate(ranking, 1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + position)
+
+    best = len(active) / (k + 1)
+    ordered = sorted(fused.items(), key=lambda x: x[1], reverse=True)[:limit]
+    return [(round(score / best, 4), doc_id) for doc_id, score in ordered]
@@ -71,6 +71,232 @@ def create_missing_tables():
             END $$;
         """))
         
+        # 4. Base de conhecimento (/knowledge)
+        print("📝 Criando tabelas knowledge_bases / knowledge_items...")
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS knowledge_bases (
+                id VARCHAR(50) PRIMARY KEY,
+                name VARCHAR(200) NOT NULL,
+                description TEXT,
+                category VARCHAR(100),
+                tags JSONB NOT NULL DEFAULT '[]',
+                is_public BOOLEAN NOT NULL DEFAULT FALSE,
+                item_count INTEGER NOT NULL DEFAULT 0,
+                metadata JSONB NOT NULL DEFAULT '{}',
+                created_by INTEGER,
+                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+        """))
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS knowledge_items (
+                id VARCHAR(50) PRIMARY KEY,
+                knowledge_base_id VARCHAR(50) NOT NULL REFERENCES knowledge_bases(id) ON DELETE CASCADE,
+                title VARCHAR(500) NOT NULL,
+                content TEXT NOT NULL,
+                content_type VARCHAR(20) NOT NULL DEFAULT 'text',
+                category VARCHAR(100),
+                tags JSONB NOT NULL DEFAULT '[]',
+                source VARCHAR(200),
+                source_url VARCHAR(500),
+                language VARCHAR(10) NOT NULL DEFAULT 'pt-BR',
+                priority INTEGER NOT NULL DEFAULT 1,
+                metadata JSONB NOT NULL DEFAULT '{}',
+                created_by INTEGER,
+                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+        """))
+
+        # Sequência atribuída pelo banco: cursor da sincronização incremental
+        conn.execute(text("ALTER TABLE knowledge_items ADD COLUMN IF NOT EXISTS seq BIGSERIAL"))
+
+        # Índices para knowledge_items
+        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_knowledge_bases_category ON knowledge_bases(category)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_knowledge_items_kb ON knowledge_items(knowledge_base_id)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_knowledge_items_created ON knowledge_items(created_at)"))
+        conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS idx_knowledge_items_seq ON knowledge_items(seq)"))
+        print("✅ Tabelas de conhecimento criadas")
+
+        # 5. Outbox transacional de eventos (entrega pelo menos uma vez)
+        print("📝 Criando tabela event_outbox...")
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS event_outbox (
+                id BIGSERIAL PRIMARY KEY,
+                event_id VARCHAR(50) NOT NULL,
+                type VARCHAR(100) NOT NULL,
+                entity VARCHAR(100),
+                entity_id VARCHAR(255),
+                actor VARCHAR(255),
+                payload JSONB NOT NULL DEFAULT '{}',
+                occurred_at TIMESTAMP NOT NULL,
+                handler VARCHAR(200),
+                logged BOOLEAN NOT NULL DEFAULT FALSE,
+                status VARCHAR(20) NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                available_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                processed_at TIMESTAMP
+            )
+        """))
+
+        # Índices para event_outbox (o relay só olha as pendentes)
+        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_event_outbox_event ON event_outbox(event_id)"))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_event_outbox_pending ON event_outbox(status, available_at) "
+            "WHERE status = 'pending'"
+        ))
+        print("✅ Tabela event_outbox criada")
+
+        # 6. activity_logs particionada por mês + agregados por hora
+        print("📝 Particionando activity_logs...")
+        from core.events.log_maintenance import partition_activity_logs
+        if partition_activity_logs(conn):
+            print("✅ activity_logs particionada (dados antigos em activity_logs_legacy)")
+        else:
+            print("✅ activity_logs já particionada")
+
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS activity_log_hourly (
+                bucket TIMESTAMPTZ NOT NULL,
+                type VARCHAR(255) NOT NULL,
+                user_id INTEGER NOT NULL,
+                method VARCHAR(10) NOT NULL DEFAULT '',
+                path VARCHAR(500) NOT NULL DEFAULT '',
+                status_code INTEGER NOT NULL DEFAULT 0,
+                requests INTEGER NOT NULL DEFAULT 0,
+                errors INTEGER NOT NULL DEFAULT 0,
+                total_ms DOUBLE PRECISION NOT NULL DEFAULT 0,
+                max_ms DOUBLE PRECISION NOT NULL DEFAULT 0,
+                PRIMARY KEY (bucket, type, user_id, method, path, status_code)
+            )
+        """))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_activity_log_hourly_type ON activity_log_hourly(type, bucket DESC)"))
+        print("✅ Tabela activity_log_hourly criada")
+
+        # 7. Payload estruturado (JSONB) no activity_logs + índices
+        print("📝 Migrando payload de activity_logs para JSONB...")
+        conn.execute(text("ALTER TABLE activity_logs ADD COLUMN IF NOT EXISTS payload JSONB"))
+        conn.execute(text("""
+            CREATE OR REPLACE FUNCTION try_jsonb(value TEXT) RETURNS JSONB AS $$
+            BEGIN
+                RETURN value::jsonb;
+            EXCEPTION WHEN others THEN
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql IMMUTABLE
+        """))
+        # details em JSON vira payload; texto livre legado continua em details
+        conn.execute(text("""
+            UPDATE activity_logs
+            SET payload = try_jsonb(details), details = NULL
+            WHERE payload IS NULL AND details LIKE '{%' AND try_jsonb(details) IS NOT NULL
+        """))
+
+        # Índices no pai (valem para todas as partições):
+        # GIN para consultas de contenção (payload @> '{"level": "critical"}')
+        # e expressões nas chaves quentes, sempre com a janela de tempo
+        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_activity_logs_payload_gin ON activity_logs USING GIN (payload jsonb_path_ops)"))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_activity_logs_level ON activity_logs "
+            "(action, (payload->>'level'), created_at DESC) WHERE payload ? 'level'"
+        ))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_activity_logs_status ON activity_logs "
+            "(((payload->>'status_code')::int), created_at DESC) WHERE payload ? 'status_code'"
+        ))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_activity_logs_path ON activity_logs "
+            "((payload->>'path'), created_at DESC) WHERE payload ? 'path'"
+        ))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_activity_logs_payload_user ON activity_logs "
+            "((payload->>'user_id'), created_at DESC) WHERE payload ? 'user_id'"
+        ))
+        print("✅ activity_logs.payload (JSONB) indexado")
+
+        # 8. Embeddings das memórias (float32 em bytes) + índices da busca por usuário
+        print("📝 Preparando memory_entries para busca vetorial...")
+        conn.execute(text("ALTER TABLE memory_entries ADD COLUMN IF NOT EXISTS embedding BYTEA"))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_memory_user_created ON memory_entries (user_id, created_at DESC)"
+        ))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_memory_user_type_created ON memory_entries "
+            "(user_id, entity_type, created_at DESC)"
+        ))
+        print("✅ memory_entries.embedding criada")
+
+        # 9. Resumo de follow-ups por ritual/status (KPIs do dashboard)
+        print("📝 Criando tabela followup_stats...")
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS followup_stats (
+                ritual_id INTEGER NOT NULL DEFAULT 0,
+                status VARCHAR(20) NOT NULL,
+                total INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+                PRIMARY KEY (ritual_id, status)
+            )
+        """))
+        # Ritual dos follow-ups vem da nota de origem
+        conn.execute(text("ALTER TABLE notes ADD COLUMN IF NOT EXISTS ritual_id INTEGER REFERENCES rituals(id)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_notes_ritual_id ON notes(ritual_id)"))
+        # Carga inicial (uma vez): a partir daqui a ingestão soma os novos e
+        # core.events.followup_stats recalcula periodicamente
+        conn.execute(text("""
+            INSERT INTO followup_stats (ritual_id, status, total)
+            SELECT COALESCE(n.ritual_id, 0), f.status, COUNT(*)
+            FROM followups f
+            LEFT JOIN notes n ON n.id = f.note_id
+            GROUP BY 1, 2
+            ON CONFLICT (ritual_id, status) DO NOTHING
+        """))
+        print("✅ Tabela followup_stats criada")
+
+        # 10. Reuniões por usuário/semana (KPI semanal e automação)
+        print("📝 Criando tabela meeting_weekly_stats...")
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS meeting_weekly_stats (
+                user_id INTEGER NOT NULL,
+                week_start DATE NOT NULL,
+                total_meetings INTEGER NOT NULL DEFAULT 0,
+                meetings_started INTEGER NOT NULL DEFAULT 0,
+                meetings_completed INTEGER NOT NULL DEFAULT 0,
+                meetings_cancelled INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+                PRIMARY KEY (user_id, week_start)
+            )
+        """))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_meeting_weekly_stats_week ON meeting_weekly_stats(week_start)"))
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS meeting_weekly_stats_events (
+                event_id VARCHAR(50) PRIMARY KEY,
+                week_start DATE NOT NULL
+            )
+        """))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_meeting_weekly_stats_events_week_start "
+            "ON meeting_weekly_stats_events(week_start)"
+        ))
+        conn.commit()
+        # Carga inicial das últimas semanas (depois: python -m core.events.meeting_stats)
+        from core.events.meeting_stats import backfill
+        backfill()
+        print("✅ Tabela meeting_weekly_stats criada")
+
+        # 11. Estatísticas de reuniões por organizador (/meetings/stats/summary)
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_meetings_organizer_status_time "
+            "ON meetings (organizer_id, status, scheduled_time)"
+        ))
+        # Paginação por cursor (scheduled_time, id) de /meetings
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_meetings_scheduled_id "
+            "ON meetings (scheduled_time DESC, id DESC)"
+        ))
+        print("✅ Índices de meetings criados")
+
         conn.commit()
     
     print("=" * 50)
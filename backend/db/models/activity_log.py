@@ -1,18 +1,26 @@
 #E:\MAWDSLEYS-AGENTE\backend\db\models\activity_log.py
 
-from sqlalchemy import Column, String, DateTime, JSON
+from sqlalchemy import Column, BigInteger, Integer, String, Text, DateTime, JSON
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import synonym
 from datetime import datetime
 from db.base import Base
 
+# JSONB no PostgreSQL (índices GIN/expressão); JSON genérico no sqlite
+JSONPayload = JSONB().with_variant(JSON(), "sqlite")
+
 
 class ActivityLog(Base):
     __tablename__ = "activity_logs"
 
-    id = Column(String, primary_key=True, index=True)
-    type = Column(String, index=True)
-    entity = Column(String, index=True)
-    entity_id = Column(String, index=True)
-    actor = Column(String)
-    timestamp = Column(DateTime, default=datetime.utcnow)
-    payload = Column(JSON)
+    # Mesmas colunas da tabela real (particionada por created_at)
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    action = Column(String(255), nullable=False)
+    type = Column(String(100), index=True)
+    details = Column(Text)              # texto livre legado
+    payload = Column(JSONPayload)       # payload do ActivityEvent
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
 
+    # Nome usado pelo MemoryEngine/QueryEngine
+    timestamp = synonym("created_at")
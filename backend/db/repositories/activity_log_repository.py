@@ -1,53 +1,86 @@
-from datetime import datetime
-from typing import List, Optional
+from datetime import datetime, timedelta
+from typing import List, Optional, Set
 import json
 
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import Integer, select, text
 
 from db.models.activity_log import ActivityLog
 
+# payload vai para a coluna JSONB (índices GIN/expressão), não como texto
+# em details; o literal JSON é convertido pelo próprio PostgreSQL
+INSERT_ACTIVITY_LOG = text("""
+    INSERT INTO activity_logs (user_id, action, type, payload, created_at)
+    VALUES (:user_id, :action, :type, :payload, :created_at)
+""")
+
 
 class ActivityLogRepository:
     def __init__(self, session: Session):
         self.session = session
 
-    async def save(self, event):
-        """Salva evento na SUA estrutura do banco"""
-        try:
-            # Extrai user_id do actor
-            user_id = self._extract_user_id(event.actor)
+    def to_row(self, event) -> dict:
+        """Converte ActivityEvent para as colunas da SUA estrutura do banco"""
+        # Extrai user_id do actor
+        user_id = self._extract_user_id(event.actor)
+
+        # Se não conseguir extrair, usa um default (sistema)
+        if user_id is None:
+            user_id = 0  # ID para sistema/anônimo
+
+        return {
+            "user_id": user_id,
+            "action": event.type,  # Sua coluna 'action' recebe o type
+            "payload": json.dumps(event.payload, ensure_ascii=False, default=str),
+            "created_at": event.timestamp or datetime.utcnow()
+        }
+
+    def insert_many(self, events, commit: bool = True) -> int:
+        """
+        Grava vários eventos num único INSERT executemany + um commit
+        (usado pelo ActivityLogWriter, fora do caminho do request).
+        commit=False deixa na transação do chamador (OutboxRelay).
+        """
+        rows = []
+        for event in events:
+            row = self.to_row(event)
+            row["type"] = event.type
+            rows.append(row)
+        if not rows:
+            return 0
+
+        if not commit:
+            self.session.execute(INSERT_ACTIVITY_LOG, rows)
+            return len(rows)
 
-            # Se não conseguir extrair, usa um default (sistema)
-            if user_id is None:
-                user_id = 0  # ID para sistema/anônimo
+        try:
+            self.session.execute(INSERT_ACTIVITY_LOG, rows)
+            self.session.commit()
+            return len(rows)
+        except Exception:
+            self.session.rollback()
+            raise
 
+    async def save(self, event, commit: bool = True):
+        """
+        Salva evento na SUA estrutura do banco.
+        commit=False só faz flush (transação do chamador, ex.: OutboxRelay).
+        """
+        try:
             # Prepara os dados para SUA estrutura
-            db_data = {
-                "user_id": user_id,
-                "action": event.type,  # Sua coluna 'action' recebe o type
-                "details": json.dumps(event.payload, ensure_ascii=False, default=str),
-                "created_at": event.timestamp or datetime.utcnow()
-            }
-
-            # Adiciona campos extras se existirem no modelo
-            try:
-                if hasattr(ActivityLog, 'type'):
-                    db_data['type'] = event.type
-                if hasattr(ActivityLog, 'entity'):
-                    db_data['entity'] = event.entity
-                if hasattr(ActivityLog, 'entity_id'):
-                    db_data['entity_id'] = event.entity_id
-                if hasattr(ActivityLog, 'payload'):
-                    db_data['payload'] = event.payload
-            except Exception:
-                pass  # Ignora se não existir
+            db_data = self.to_row(event)
+
+            db_data['type'] = event.type
+            db_data['payload'] = json.loads(db_data['payload'])
 
             # Cria o registro
             db_event = ActivityLog(**db_data)
 
             self.session.add(db_event)
-            self.session.commit()   # ✅ commit síncrono
+            if commit:
+                self.session.commit()   # ✅ commit síncrono
+            else:
+                self.session.flush()
 
             # Atualiza o ID no evento original
             event.id = str(db_event.id)
@@ -57,7 +90,8 @@ class ActivityLogRepository:
 
         except Exception as e:
             print(f"[ActivityLogRepository] ❌ Erro ao salvar evento: {e}")
-            self.session.rollback()  # ✅ rollback síncrono
+            if commit:
+                self.session.rollback()  # ✅ rollback síncrono
             raise
 
     def _extract_user_id(self, actor: str) -> Optional[int]:
@@ -89,14 +123,36 @@ class ActivityLogRepository:
         )
         return result.scalars().all()
 
-    async def list_since(self, since: datetime) -> List[ActivityLog]:
-        """Lista eventos desde uma data"""
-        result = self.session.execute(
+    async def list_since(self, since: datetime, action: Optional[str] = None,
+                         level: Optional[str] = None, min_status: Optional[int] = None,
+                         path: Optional[str] = None, user: Optional[str] = None,
+                         limit: Optional[int] = None) -> List[ActivityLog]:
+        """
+        Lista eventos desde uma data. Os filtros opcionais viram predicados
+        sobre o payload JSONB (índices de expressão), não filtros em Python.
+        """
+        query = self._since(since)
+        if action:
+            query = query.where(ActivityLog.action == action)
+        if level:
+            query = query.where(ActivityLog.payload["level"].astext == level)
+        if min_status is not None:
+            query = query.where(ActivityLog.payload["status_code"].astext.cast(Integer) >= min_status)
+        if path:
+            query = query.where(ActivityLog.payload["path"].astext == path)
+        if user:
+            query = query.where(ActivityLog.payload["user_id"].astext == user)
+        if limit:
+            query = query.limit(limit)
+        return self.session.execute(query).scalars().all()
+
+    def _since(self, since: datetime):
+        # created_at no WHERE: o PostgreSQL só visita as partições da janela
+        return (
             select(ActivityLog)
             .where(ActivityLog.created_at >= since)
             .order_by(ActivityLog.created_at.desc())
         )
-        return result.scalars().all()
 
     def to_activity_event(self, db_log: ActivityLog) -> dict:
         """Converte do banco para formato ActivityEvent"""
@@ -125,29 +181,23 @@ class ActivityLogRepository:
     # =====================================================
     # 🔴 LEITURA DE ALERTAS CRÍTICOS (NOVA FUNCIONALIDADE)
     # =====================================================
-    from datetime import timedelta
-
     async def list_critical_alerts(self, days: int = 1):
         """
         Retorna alertas críticos recentes
-        (eventos alert.created com level=critical)
+        (eventos alert.created com level=critical, filtrados no banco)
         """
-        since = datetime.utcnow() - self.timedelta(days=days)
+        since = datetime.utcnow() - timedelta(days=days)
+        return await self.list_since(since, action="alert.created", level="critical")
 
+    def alerted_users_since(self, rule: str, since) -> Set[str]:
+        """
+        Usuários (payload.user_id) que já receberam o alerta `rule` desde
+        `since`: uma consulta só, em vez de uma por usuário.
+        """
         result = self.session.execute(
-            select(ActivityLog)
+            select(ActivityLog.payload["user_id"].astext).distinct()
             .where(ActivityLog.action == "alert.created")
+            .where(ActivityLog.payload["rule"].astext == rule)
             .where(ActivityLog.created_at >= since)
-            .order_by(ActivityLog.created_at.desc())
         )
-
-        alerts = []
-        for row in result.scalars():
-            try:
-                details = json.loads(row.details) if row.details else {}
-                if details.get("level") == "critical":
-                    alerts.append(row)
-            except Exception:
-                continue
-
-        return alerts
+        return {user for user in result.scalars() if user}
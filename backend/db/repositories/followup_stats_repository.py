@@ -0,0 +1,111 @@
+# db/repositories/followup_stats_repository.py
+
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from models.followup import FollowUp
+from models.followup_stats import FollowupStats
+from models.note import Note
+from models.ritual import Ritual
+
+FOLLOWUP_STATUSES = ("ABERTO", "EM_ANDAMENTO", "CONCLUIDO")
+
+# Soma no contador existente (uma linha por ritual/status)
+INCREMENT = text("""
+    INSERT INTO followup_stats (ritual_id, status, total, updated_at)
+    VALUES (:ritual_id, :status, :delta, CURRENT_TIMESTAMP)
+    ON CONFLICT (ritual_id, status) DO UPDATE
+    SET total = followup_stats.total + EXCLUDED.total,
+        updated_at = EXCLUDED.updated_at
+""")
+
+# Recontagem completa: o ritual vem da nota de origem do follow-up
+RECOUNT = text("""
+    INSERT INTO followup_stats (ritual_id, status, total, updated_at)
+    SELECT COALESCE(n.ritual_id, 0), f.status, COUNT(*), CURRENT_TIMESTAMP
+    FROM followups f
+    LEFT JOIN notes n ON n.id = f.note_id
+    GROUP BY 1, 2
+""")
+
+
+class FollowupStatsRepository:
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def increment(self, counts: Dict[Tuple[Optional[int], str], int]):
+        """
+        Aplica deltas {(ritual_id, status): n} (não faz commit): entra na
+        transação que criou/alterou os follow-ups. n negativo = saiu do status.
+        """
+        rows = [
+            {"ritual_id": ritual_id or 0, "status": status, "delta": delta}
+            for (ritual_id, status), delta in counts.items() if delta
+        ]
+        if rows:
+            self.db.execute(INCREMENT, rows)
+
+    def reconcile(self) -> int:
+        """
+        Refaz os contadores a partir da followups (não faz commit). Corrige a
+        deriva de status alterados fora da ingestão; a trava segura os
+        incrementos concorrentes até o commit, que entram por cima da recontagem.
+        """
+        if self.db.get_bind().dialect.name == "postgresql":
+            self.db.execute(text("LOCK TABLE followup_stats IN EXCLUSIVE MODE"))
+        self.db.execute(text("DELETE FROM followup_stats"))
+        return self.db.execute(RECOUNT).rowcount
+
+    def status_counts(self) -> Dict[str, int]:
+        """Totais por status (soma dos rituais)"""
+        rows = (
+            self.db.query(FollowupStats.status, func.sum(FollowupStats.total))
+            .group_by(FollowupStats.status)
+            .all()
+        )
+        return {status: int(total or 0) for status, total in rows}
+
+    def has_rows(self) -> bool:
+        return self.db.query(FollowupStats.status).first() is not None
+
+    def by_ritual(self) -> List[Dict]:
+        """Total por ritual (rituais sem follow-up aparecem com 0)"""
+        total = func.coalesce(func.sum(FollowupStats.total), 0)
+        rows = (
+            self.db.query(Ritual.code.label("ritual"), total.label("total"))
+            .outerjoin(FollowupStats, FollowupStats.ritual_id == Ritual.id)
+            .group_by(Ritual.code)
+            .order_by(total.desc())
+            .all()
+        )
+        return [{"ritual": r.ritual, "total_followups": int(r.total)} for r in rows]
+
+
+def record_followups(db: Session, followups) -> None:
+    """Conta os follow-ups novos no followup_stats (mesma transação)"""
+    note_ids = {fu.note_id for fu in followups if fu.note_id is not None}
+    rituals = dict(
+        db.query(Note.id, Note.ritual_id).filter(Note.id.in_(note_ids)).all()
+    ) if note_ids else {}
+    counts = Counter(
+        (rituals.get(fu.note_id), fu.status or "ABERTO") for fu in followups
+    )
+    FollowupStatsRepository(db).increment(counts)
+
+
+def count_by_ritual(db: Session) -> List[Dict]:
+    """by_ritual direto da followups (ritual da nota de origem), sem o resumo"""
+    total = func.count(FollowUp.id)
+    rows = (
+        db.query(Ritual.code.label("ritual"), total.label("total"))
+        .outerjoin(Note, Note.ritual_id == Ritual.id)
+        .outerjoin(FollowUp, FollowUp.note_id == Note.id)
+        .group_by(Ritual.code)
+        .order_by(total.desc())
+        .all()
+    )
+    return [{"ritual": r.ritual, "total_followups": r.total} for r in rows]
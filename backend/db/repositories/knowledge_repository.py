@@ -0,0 +1,93 @@
+# db/repositories/knowledge_repository.py
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from models.knowledge import KnowledgeBase, KnowledgeItem
+
+
+class KnowledgeRepository:
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def list_bases(self) -> List[KnowledgeBase]:
+        return self.db.query(KnowledgeBase).all()
+
+    def list_items(self, after_seq: Optional[int] = None) -> List[KnowledgeItem]:
+        """Todos os itens, ou só os de seq > `after_seq` (sincronização incremental)."""
+        query = self.db.query(KnowledgeItem)
+        if after_seq is not None:
+            query = query.filter(KnowledgeItem.seq > after_seq)
+        return query.order_by(KnowledgeItem.seq).all()
+
+    def list_item_ids(self) -> Set[str]:
+        return {item_id for (item_id,) in self.db.query(KnowledgeItem.id)}
+
+    def get_items(self, ids: Iterable[str]) -> List[KnowledgeItem]:
+        ids = list(ids)
+        if not ids:
+            return []
+        return self.db.query(KnowledgeItem).filter(KnowledgeItem.id.in_(ids)).order_by(KnowledgeItem.seq).all()
+
+    def add_base(self, data: Dict) -> KnowledgeBase:
+        kb = KnowledgeBase(
+            id=data["id"],
+            name=data["name"],
+            description=data.get("description"),
+            category=data.get("category"),
+            tags=data.get("tags") or [],
+            is_public=data.get("is_public", False),
+            item_count=data.get("item_count", 0),
+            kb_metadata=data.get("metadata") or {},
+            created_by=data.get("created_by"),
+            created_at=data.get("created_at"),
+            updated_at=data.get("updated_at"),
+        )
+        self.db.add(kb)
+        self.db.commit()
+        return kb
+
+    def add_items(self, kb_id: str, items: List[Dict], count: Optional[int] = None) -> int:
+        """
+        Insere os itens e atualiza item_count da base na MESMA transação
+        (incremento atômico, sem recontar a tabela). `count` = itens de
+        origem (partes de um conteúdo dividido contam como um).
+        """
+        if not items:
+            return 0
+        if count is None:
+            count = len(items)
+
+        self.db.add_all([
+            KnowledgeItem(
+                id=item["id"],
+                knowledge_base_id=kb_id,
+                title=item["title"],
+                content=item["content"],
+                content_type=item.get("content_type", "text"),
+                category=item.get("category"),
+                tags=item.get("tags") or [],
+                source=item.get("source"),
+                source_url=item.get("source_url"),
+                language=item.get("language", "pt-BR"),
+                priority=item.get("priority", 1),
+                item_metadata=item.get("metadata") or {},
+                created_by=item.get("created_by"),
+                created_at=item.get("created_at"),
+                updated_at=item.get("updated_at"),
+            )
+            for item in items
+        ])
+
+        self.db.query(KnowledgeBase).filter(KnowledgeBase.id == kb_id).update(
+            {
+                KnowledgeBase.item_count: KnowledgeBase.item_count + count,
+                KnowledgeBase.updated_at: datetime.utcnow(),
+            },
+            synchronize_session=False,
+        )
+        self.db.commit()
+        return len(items)
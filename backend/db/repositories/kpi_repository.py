@@ -1,9 +1,10 @@
 # db/repositories/kpi_repository.py
 
 from sqlalchemy.orm import Session
-from sqlalchemy import func, case
-from datetime import datetime
-from db.models.activity_log import ActivityLog
+from sqlalchemy import func
+from db.repositories.followup_stats_repository import FollowupStatsRepository, count_by_ritual
+from db.repositories.meeting_stats_repository import MeetingStatsRepository
+from models.followup import FollowUp
 
 
 class KPIRepository:
@@ -12,40 +13,48 @@ class KPIRepository:
         self.db = db
 
     def weekly_meetings_by_user(self):
-        start_of_week = func.date_trunc('week', func.now())
-
-        return (
-            self.db.query(
-                ActivityLog.user_id.label("user_id"),
-
-                func.count().filter(
-                    (ActivityLog.type == 'meeting') &
-                    (ActivityLog.action == 'created')
-                ).label("total_meetings"),
-
-                func.count().filter(
-                    (ActivityLog.type == 'meeting') &
-                    (ActivityLog.action == 'started')
-                ).label("meetings_started"),
-
-                func.count().filter(
-                    (ActivityLog.type == 'meeting') &
-                    (ActivityLog.action == 'completed')
-                ).label("meetings_completed"),
-
-                func.count().filter(
-                    (ActivityLog.type == 'meeting') &
-                    (ActivityLog.action == 'cancelled')
-                ).label("meetings_cancelled"),
-            )
-            .filter(
-                ActivityLog.type == 'meeting',
-                ActivityLog.created_at >= start_of_week
-            )
-            .group_by(ActivityLog.user_id)
-            .order_by(func.count().filter(
-                (ActivityLog.type == 'meeting') &
-                (ActivityLog.action == 'created')
-            ).desc())
+        """
+        Reuniões por usuário na semana atual, lidas do
+        meeting_weekly_stats (mantido pelos eventos meeting.*)
+        """
+        return MeetingStatsRepository(self.db).for_week()
+
+    # =========================
+    # FOLLOWUPS
+    # =========================
+    def followup_status_counts(self):
+        """
+        Totais por status: lidos do followup_stats (poucas linhas);
+        sem o resumo (tabela ainda não criada/preenchida), um único
+        GROUP BY status na followups
+        """
+        try:
+            counts = FollowupStatsRepository(self.db).status_counts()
+        except Exception as e:
+            print(f"⚠️ [KPI] followup_stats indisponível: {e}")
+            self.db.rollback()
+            counts = {}
+        if counts:
+            return counts
+
+        rows = (
+            self.db.query(FollowUp.status, func.count(FollowUp.id))
+            .group_by(FollowUp.status)
             .all()
         )
+        return {status: total for status, total in rows}
+
+    def followups_by_ritual(self):
+        """
+        Total por ritual (o da nota de origem): do followup_stats quando o
+        resumo já tem linhas; senão, contagem direta followups → notes
+        """
+        try:
+            repo = FollowupStatsRepository(self.db)
+            if repo.has_rows():
+                return repo.by_ritual()
+        except Exception as e:
+            print(f"⚠️ [KPI] followup_stats indisponível: {e}")
+            self.db.rollback()
+
+        return count_by_ritual(self.db)
@@ -0,0 +1,170 @@
+# db/repositories/meeting_stats_repository.py
+
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import String, and_, cast, delete, exists, func, literal, select, text
+from sqlalchemy.orm import Session
+
+from core.events.activity_log import ActivityEvent
+from db.models.activity_log import ActivityLog
+from models.meeting_weekly_stats import MeetingStatsEvent, MeetingWeeklyStats
+
+# Evento -> coluna do contador
+COUNTERS = {
+    "meeting.created": "total_meetings",
+    "meeting.started": "meetings_started",
+    "meeting.completed": "meetings_completed",
+    "meeting.cancelled": "meetings_cancelled",
+}
+
+UPSERT = text("""
+    INSERT INTO meeting_weekly_stats
+        (user_id, week_start, total_meetings, meetings_started, meetings_completed, meetings_cancelled, updated_at)
+    VALUES
+        (:user_id, :week_start, :total_meetings, :meetings_started, :meetings_completed, :meetings_cancelled, CURRENT_TIMESTAMP)
+    ON CONFLICT (user_id, week_start) DO UPDATE SET
+        total_meetings = meeting_weekly_stats.total_meetings + EXCLUDED.total_meetings,
+        meetings_started = meeting_weekly_stats.meetings_started + EXCLUDED.meetings_started,
+        meetings_completed = meeting_weekly_stats.meetings_completed + EXCLUDED.meetings_completed,
+        meetings_cancelled = meeting_weekly_stats.meetings_cancelled + EXCLUDED.meetings_cancelled,
+        updated_at = EXCLUDED.updated_at
+""")
+
+# Recalcula as semanas a partir de :since direto do activity_logs (PostgreSQL)
+BACKFILL = text("""
+    INSERT INTO meeting_weekly_stats
+        (user_id, week_start, total_meetings, meetings_started, meetings_completed, meetings_cancelled, updated_at)
+    SELECT
+        user_id,
+        date_trunc('week', created_at)::date,
+        COUNT(*) FILTER (WHERE action = 'meeting.created'),
+        COUNT(*) FILTER (WHERE action = 'meeting.started'),
+        COUNT(*) FILTER (WHERE action = 'meeting.completed'),
+        COUNT(*) FILTER (WHERE action = 'meeting.cancelled'),
+        NOW()
+    FROM activity_logs
+    WHERE action IN ('meeting.created', 'meeting.started', 'meeting.completed', 'meeting.cancelled')
+      AND created_at >= :since
+      AND user_id IS NOT NULL
+    GROUP BY 1, 2
+""")
+
+
+def week_start(value: Optional[datetime] = None) -> date:
+    """Segunda-feira da semana (mesmo corte do date_trunc('week'))"""
+    if value is None:
+        value = datetime.utcnow()
+    if isinstance(value, datetime):
+        value = value.date()
+    return value - timedelta(days=value.weekday())
+
+
+def _user_id(actor: Optional[str]) -> Optional[int]:
+    if not actor:
+        return None
+    if actor.startswith("user_"):
+        actor = actor[5:]
+    return int(actor) if actor.isdigit() else None
+
+
+class MeetingStatsRepository:
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # =========================
+    # ATUALIZAÇÃO (handler de eventos)
+    # =========================
+    def apply(self, event: ActivityEvent) -> bool:
+        """
+        Soma o evento no contador da semana (não faz commit: roda na
+        transação/SAVEPOINT da entrega). Idempotente pelo id do evento.
+        """
+        column = COUNTERS.get(event.type)
+        user_id = _user_id(event.actor)
+        if column is None or user_id is None:
+            return False
+
+        week = week_start(event.timestamp)
+        claimed = self.db.execute(
+            text(
+                "INSERT INTO meeting_weekly_stats_events (event_id, week_start) "
+                "VALUES (:event_id, :week_start) ON CONFLICT (event_id) DO NOTHING"
+            ),
+            {"event_id": event.id, "week_start": week},
+        )
+        if claimed.rowcount == 0:
+            return False
+
+        row = {"user_id": user_id, "week_start": week, **{c: 0 for c in COUNTERS.values()}}
+        row[column] = 1
+        self.db.execute(UPSERT, row)
+        return True
+
+    def prune_applied(self, before: date) -> int:
+        """Ids de eventos de semanas antigas (não voltam mais a ser entregues)"""
+        result = self.db.execute(
+            delete(MeetingStatsEvent).where(MeetingStatsEvent.week_start < before)
+        )
+        return result.rowcount or 0
+
+    def backfill(self, since: date) -> int:
+        """
+        Reconstrói as semanas a partir de `since` com um único GROUP BY no
+        activity_logs (não faz commit). A tabela fica travada para escrita
+        até o commit: entregas concorrentes esperam em vez de se perder.
+        """
+        since = week_start(since)
+        self.db.execute(text("LOCK TABLE meeting_weekly_stats IN EXCLUSIVE MODE"))
+        self.db.execute(delete(MeetingWeeklyStats).where(MeetingWeeklyStats.week_start >= since))
+        result = self.db.execute(BACKFILL, {"since": since})
+        return result.rowcount or 0
+
+    # =========================
+    # LEITURA
+    # =========================
+    def for_week(self, week: Optional[date] = None):
+        """Contadores da semana por usuário (mais reuniões criadas primeiro)"""
+        week = week or week_start()
+        return (
+            self.db.query(
+                MeetingWeeklyStats.user_id.label("user_id"),
+                MeetingWeeklyStats.total_meetings.label("total_meetings"),
+                MeetingWeeklyStats.meetings_started.label("meetings_started"),
+                MeetingWeeklyStats.meetings_completed.label("meetings_completed"),
+                MeetingWeeklyStats.meetings_cancelled.label("meetings_cancelled"),
+            )
+            .filter(MeetingWeeklyStats.week_start == week)
+            .order_by(MeetingWeeklyStats.total_meetings.desc())
+            .all()
+        )
+
+    def users_without_meetings(self, rule: str, week: Optional[date] = None) -> List[int]:
+        """
+        Usuários ativos sem reunião criada na semana e que ainda não
+        receberam o alerta `rule` nela — uma única consulta para todos.
+        """
+        from models.user import User
+
+        week = week or week_start()
+        since = datetime.combine(week, datetime.min.time())
+
+        already_alerted = exists().where(
+            ActivityLog.action == "alert.created",
+            ActivityLog.created_at >= since,
+            ActivityLog.payload["rule"].astext == rule,
+            ActivityLog.payload["user_id"].astext == literal("user_") + cast(User.id, String),
+        )
+        rows = self.db.execute(
+            select(User.id)
+            .outerjoin(MeetingWeeklyStats, and_(
+                MeetingWeeklyStats.user_id == User.id,
+                MeetingWeeklyStats.week_start == week,
+            ))
+            .where(User.is_active.is_(True))
+            .where(func.coalesce(MeetingWeeklyStats.total_meetings, 0) == 0)
+            .where(~already_alerted)
+            .order_by(User.id)
+        ).scalars().all()
+        return list(rows)
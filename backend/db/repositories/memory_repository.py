@@ -0,0 +1,61 @@
+# db/repositories/memory_repository.py
+
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+from uuid import uuid4
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from models.memory_entry import MemoryEntry
+
+
+class MemoryRepository:
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def add(self, user_id: str, entity_type: str, entity_id: str, content: str,
+            metadata: Optional[Dict] = None) -> MemoryEntry:
+        entry = MemoryEntry(
+            id=f"mem_{uuid4().hex[:16]}",
+            user_id=str(user_id),
+            entity_type=entity_type,
+            entity_id=str(entity_id),
+            content=content,
+            entry_metadata=metadata or {},
+            created_at=datetime.utcnow(),
+        )
+        # Só flush: o commit é de quem abriu a sessão (request, relay, worker)
+        self.db.add(entry)
+        self.db.flush()
+        return entry
+
+    def list_for_user(self, user_id: str, since: Optional[datetime] = None,
+                      limit: Optional[int] = None) -> List[MemoryEntry]:
+        """Mais recentes primeiro; `since` para sincronização incremental."""
+        query = self.db.query(MemoryEntry).filter(MemoryEntry.user_id == str(user_id))
+        if since is not None:
+            query = query.filter(MemoryEntry.created_at > since)
+        query = query.order_by(MemoryEntry.created_at.desc())
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+
+    def find(self, entity_types: Optional[Sequence[str]] = None, entity_id: Optional[str] = None,
+             user_id: Optional[str] = None, limit: int = 10) -> List[MemoryEntry]:
+        """Filtro direto no banco (sem similaridade), mais recentes primeiro."""
+        query = self.db.query(MemoryEntry)
+        if user_id is not None:
+            query = query.filter(MemoryEntry.user_id == str(user_id))
+        if entity_types:
+            query = query.filter(MemoryEntry.entity_type.in_(list(entity_types)))
+        if entity_id is not None:
+            query = query.filter(MemoryEntry.entity_id == str(entity_id))
+        return query.order_by(MemoryEntry.created_at.desc()).limit(limit).all()
+
+    def set_embeddings(self, embeddings: Dict[str, bytes]):
+        for entry_id, blob in embeddings.items():
+            self.db.execute(
+                update(MemoryEntry).where(MemoryEntry.id == entry_id).values(embedding=blob)
+            )
@@ -0,0 +1,140 @@
+# db/repositories/outbox_repository.py
+
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from core.events.activity_log import ActivityEvent
+from models.event_outbox import EventOutbox
+
+
+class OutboxRepository:
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def add(self, event: ActivityEvent, handler: Optional[str] = None, attempts: int = 0,
+            error: Optional[str] = None, available_at: Optional[datetime] = None,
+            logged: bool = False) -> EventOutbox:
+        """
+        Adiciona o evento à sessão (não faz commit): entra na mesma
+        transação da mudança de domínio que o gerou.
+        """
+        row = EventOutbox(
+            event_id=event.id,
+            type=event.type,
+            entity=event.entity,
+            entity_id=event.entity_id,
+            actor=event.actor,
+            payload=event.payload,
+            occurred_at=event.timestamp or datetime.utcnow(),
+            handler=handler,
+            logged=logged,
+            attempts=attempts,
+            last_error=error,
+            available_at=available_at or datetime.utcnow(),
+        )
+        self.db.add(row)
+        return row
+
+    def add_many(self, events: Iterable[ActivityEvent]) -> int:
+        rows = [
+            {
+                "event_id": e.id,
+                "type": e.type,
+                "entity": e.entity,
+                "entity_id": e.entity_id,
+                "actor": e.actor,
+                "payload": e.payload,
+                "occurred_at": e.timestamp or datetime.utcnow(),
+                "logged": False,
+                "status": "pending",
+                "attempts": 0,
+                "available_at": datetime.utcnow(),
+            }
+            for e in events
+        ]
+        if rows:
+            self.db.bulk_insert_mappings(EventOutbox, rows)
+        return len(rows)
+
+    def claim_batch(self, limit: int = 200) -> List[EventOutbox]:
+        """
+        Pendentes já disponíveis, mais antigos primeiro, travados com
+        FOR UPDATE SKIP LOCKED: vários relays (processos/instâncias) drenam
+        em paralelo sem pegar a mesma linha. As travas valem até o commit.
+        """
+        return (
+            self.db.query(EventOutbox)
+            .filter(EventOutbox.status == "pending")
+            .filter(EventOutbox.available_at <= datetime.utcnow())
+            .order_by(EventOutbox.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+
+    def mark_done(self, ids: List[int]):
+        if ids:
+            self.db.execute(
+                update(EventOutbox)
+                .where(EventOutbox.id.in_(ids))
+                .values(status="done", processed_at=datetime.utcnow(), last_error=None)
+            )
+
+    def record_failures(self, outbox_id: Optional[int], event: ActivityEvent, only: Optional[str],
+                        attempts: int, failures: List[Tuple[str, str]], max_attempts: int,
+                        retry_in: float) -> bool:
+        """
+        Reagenda os handlers que falharam. Linha de um handler só: a própria
+        linha volta para a fila (ou vira "dead" após `max_attempts`; retorna True).
+        Evento inteiro: uma linha nova por handler, reentrega só para ele.
+        """
+        available_at = datetime.utcnow() + timedelta(seconds=retry_in)
+
+        if outbox_id is not None and only is not None:
+            dead = attempts >= max_attempts
+            self.db.execute(
+                update(EventOutbox)
+                .where(EventOutbox.id == outbox_id)
+                .values(
+                    status="dead" if dead else "pending",
+                    attempts=attempts,
+                    last_error=failures[0][1][:2000],
+                    available_at=available_at,
+                )
+            )
+            return dead
+
+        if outbox_id is not None:
+            self.mark_done([outbox_id])
+        for name, error in failures:
+            self.add(event, handler=name, attempts=attempts, error=error[:2000],
+                     available_at=available_at, logged=True)
+        return False
+
+    def count_pending(self) -> int:
+        return self.db.query(EventOutbox).filter(EventOutbox.status == "pending").count()
+
+    @staticmethod
+    def to_event(row: EventOutbox) -> ActivityEvent:
+        return ActivityEvent(
+            id=row.event_id,
+            type=row.type,
+            entity=row.entity or "",
+            entity_id=row.entity_id or "",
+            actor=row.actor or "system",
+            timestamp=row.occurred_at,
+            payload=row.payload or {},
+        )
+
+
+def stage_event(db: Session, event: ActivityEvent) -> EventOutbox:
+    """
+    Grava o evento no outbox dentro da transação de `db`: sai junto com
+    o commit da mudança de domínio (ou some junto no rollback). O
+    OutboxRelay leva para o activity_logs e para os handlers do EventBus.
+    """
+    return OutboxRepository(db).add(event)
@@ -4,7 +4,6 @@ from fastapi import FastAPI, APIRouter, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import uvicorn
-import openai
 import os
 import sys
 from pathlib import Path
@@ -13,6 +12,16 @@ from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from api.routes.meetings import router as meetings_router
 from api.routes.automations import router as automations_router
+from core.llm.gateway import llm
+from core.events.log_writer import activity_log_writer
+from core.events.event_bus import event_bus
+from core.events.outbox_relay import outbox_relay
+from core.events.log_maintenance import activity_log_maintenance, MAINTENANCE_ENABLED
+from core.events.followup_stats import followup_stats_reconciler
+from core.memory.memory_index import memory_index, WARM_DAYS
+from core.memory.memory_store import memory_store
+from core.memory.insight_engine import insights
+from security.auth_cache import auth_cache
 
 
 # =====================================================
@@ -34,8 +43,7 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not OPENAI_API_KEY or len(OPENAI_API_KEY) < 20:
     raise RuntimeError("❌ OPENAI_API_KEY não encontrada ou inválida")
 
-openai.api_key = OPENAI_API_KEY
-print("🤖 OpenAI configurada com sucesso (SDK CLÁSSICO)")
+print("🤖 OpenAI configurada com sucesso (gateway assíncrono)")
 
 # =====================================================
 # LIFESPAN
@@ -43,8 +51,43 @@ print("🤖 OpenAI configurada com sucesso (SDK CLÁSSICO)")
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("🔄 Inicializando aplicação...")
+    # Writer do ActivityLog (grava em lote, fora do caminho do request)
+    activity_log_writer.start()
+    # MemoryIndex: eventos gravados pelo writer entram na memória em RAM
+    activity_log_writer.subscribe(memory_index.add_many)
+    # EventBus: handlers de automação + workers (sessão própria por worker)
+    try:
+        from core.automation.event_processor import register_event_handlers
+        register_event_handlers(event_bus)
+    except ImportError as e:
+        print(f"⚠️ EventProcessor não disponível: {e}")
+    event_bus.start()
+    # OutboxRelay: eventos gravados nas transações das rotas → activity_logs + handlers
+    outbox_relay.start()
+    # Partições do activity_logs + rollup horário dos eventos HTTP antigos
+    if MAINTENANCE_ENABLED:
+        activity_log_maintenance.start()
+    # Recontagem periódica do followup_stats (a ingestão só soma os novos)
+    followup_stats_reconciler.start()
+    # Memória institucional: últimos dias em RAM (o resto sob demanda)
+    try:
+        await memory_index.warm()
+        # Insights incrementais: partem do que já está na memória e seguem por evento
+        insights.update_many(memory_index.recent(days=WARM_DAYS))
+    except Exception as e:
+        print(f"⚠️ MemoryIndex não carregado: {e}")
+    activity_log_writer.subscribe(insights.update_many)
+    event_bus.subscribe("*", insights.handle)
     yield
     print("👋 Encerrando aplicação...")
+    # Entrega (ou guarda no outbox) e grava os eventos que ainda estão nas filas
+    await activity_log_maintenance.close()
+    await followup_stats_reconciler.close()
+    await outbox_relay.close()
+    await event_bus.close()
+    await activity_log_writer.close()
+    # Fecha o pool de conexões do gateway de LLM
+    await llm.aclose()
 
 # =====================================================
 # APP
@@ -78,6 +121,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # paginação por cursor de /meetings
 )
 
 print("✅ Middlewares configurados na ordem correta")
@@ -130,7 +174,16 @@ async def health():
         "middleware": {
             "activity_log": "active",
             "cors": "active"
-        }
+        },
+        "activity_log_writer": activity_log_writer.stats(),
+        "event_bus": event_bus.stats(),
+        "outbox_relay": outbox_relay.stats(),
+        "activity_log_maintenance": activity_log_maintenance.stats(),
+        "followup_stats": followup_stats_reconciler.stats(),
+        "memory_index": memory_index.stats(),
+        "insights_events": insights.events,
+        "memory_store": memory_store.stats(),
+        "auth_cache": auth_cache.stats()
     }
 
 # =====================================================
@@ -266,7 +319,7 @@ async def chat_health_legacy():
 @chat_router_legacy.post("/")
 async def chat_handler_legacy(data: ChatRequestLegacy):
     try:
-        response = openai.ChatCompletion.create(
+        response = await llm.chat(
             model=data.model,
             messages=[
                 {"role": "system", "content": "Você é o assistente corporativo MAWDSLEYS. Responda de forma profissional e útil."},
@@ -276,9 +329,9 @@ async def chat_handler_legacy(data: ChatRequestLegacy):
             max_tokens=800
         )
         return {
-            "reply": response.choices[0].message["content"],
+            "reply": response.content,
             "model": data.model,
-            "tokens_used": response.usage.total_tokens if hasattr(response, 'usage') else None
+            "tokens_used": response.total_tokens
         }
     except Exception as e:
         raise HTTPException(
@@ -1,6 +1,7 @@
 # backend/models/activity_log.py
 from  sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
 from  sqlalchemy.orm import relationship
+from  sqlalchemy.dialects.postgresql import JSONB
 from  sqlalchemy.sql import func
 from  database.session import Base
 
@@ -10,7 +11,9 @@ class ActivityLog(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     action = Column(String(255), nullable=False)
+    type = Column(String(100))
     details = Column(Text)
+    payload = Column(JSONB)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     user = relationship("User", back_populates="activity_logs")
@@ -0,0 +1,54 @@
+# backend/models/event_outbox.py
+from sqlalchemy import (
+    Column,
+    BigInteger,
+    Boolean,
+    Integer,
+    String,
+    Text,
+    DateTime,
+    JSON,
+    Index,
+)
+from sqlalchemy.sql import func
+
+from database.session import Base
+
+
+class EventOutbox(Base):
+    """
+    Eventos ainda não entregues (transactional outbox).
+    Uma linha só sai de "pending" quando o OutboxRelay gravou no
+    activity_logs e o(s) handler(s) rodaram (entrega pelo menos uma vez);
+    após o máximo de tentativas vira "dead".
+    """
+    __tablename__ = "event_outbox"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    event_id = Column(String(50), nullable=False, index=True)
+    type = Column(String(100), nullable=False)
+    entity = Column(String(100), nullable=True)
+    entity_id = Column(String(255), nullable=True)
+    actor = Column(String(255), nullable=True)
+    payload = Column(JSON, default=dict, nullable=False)
+    occurred_at = Column(DateTime, nullable=False)
+
+    # Handler que falhou (reentrega só para ele); NULL = todos os handlers
+    handler = Column(String(200), nullable=True)
+
+    # False = gravado na transação da rota; o relay ainda leva ao activity_logs
+    logged = Column(Boolean, default=False, nullable=False)
+
+    status = Column(String(20), default="pending", nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text, nullable=True)
+    available_at = Column(DateTime, server_default=func.now(), nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    processed_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("idx_event_outbox_pending", "status", "available_at"),
+    )
+
+    def __repr__(self):
+        return f"<EventOutbox(id={self.id}, type={self.type}, status={self.status})>"
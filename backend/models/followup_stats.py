@@ -0,0 +1,24 @@
+# backend/models/followup_stats.py
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+
+from database.session import Base
+
+
+class FollowupStats(Base):
+    """
+    Contagem de follow-ups por ritual (o da nota de origem) e status,
+    incrementada pela ingestão (mesma transação que cria os follow-ups) e
+    recalculada periodicamente (core.events.followup_stats). O dashboard
+    lê daqui em vez de contar a tabela followups.
+    """
+    __tablename__ = "followup_stats"
+
+    # 0 = follow-up sem ritual (chave primária não aceita NULL)
+    ritual_id = Column(Integer, primary_key=True, default=0)
+    status = Column(String(20), primary_key=True)
+    total = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<FollowupStats(ritual_id={self.ritual_id}, status={self.status}, total={self.total})>"
@@ -0,0 +1,109 @@
+# backend/models/knowledge.py
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    FetchedValue,
+    String,
+    Text,
+    Boolean,
+    DateTime,
+    Integer,
+    ForeignKey,
+    JSON,
+)
+from sqlalchemy.sql import func
+
+from database.session import Base
+
+
+class KnowledgeBase(Base):
+    __tablename__ = "knowledge_bases"
+
+    id = Column(String(50), primary_key=True)
+    name = Column(String(200), nullable=False)
+    description = Column(Text, nullable=True)
+    category = Column(String(100), nullable=True, index=True)
+    tags = Column(JSON, default=list, nullable=False)
+    is_public = Column(Boolean, default=False, nullable=False)
+
+    # Contador mantido na inserção (evita COUNT(*) a cada upload)
+    item_count = Column(Integer, default=0, nullable=False)
+
+    # "metadata" é reservado no SQLAlchemy declarativo
+    kb_metadata = Column("metadata", JSON, default=dict, nullable=False)
+
+    created_by = Column(Integer, nullable=True)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "description": self.description or "",
+            "category": self.category or "",
+            "tags": self.tags or [],
+            "is_public": self.is_public,
+            "item_count": self.item_count or 0,
+            "metadata": self.kb_metadata or {},
+            "created_by": self.created_by,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+    def __repr__(self):
+        return f"<KnowledgeBase id={self.id} name={self.name}>"
+
+
+class KnowledgeItem(Base):
+    __tablename__ = "knowledge_items"
+
+    id = Column(String(50), primary_key=True)
+    knowledge_base_id = Column(
+        String(50),
+        ForeignKey("knowledge_bases.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    title = Column(String(500), nullable=False)
+    content = Column(Text, nullable=False)
+    content_type = Column(String(20), default="text", nullable=False)
+    category = Column(String(100), nullable=True)
+    tags = Column(JSON, default=list, nullable=False)
+    source = Column(String(200), nullable=True)
+    source_url = Column(String(500), nullable=True)
+    language = Column(String(10), default="pt-BR", nullable=False)
+    priority = Column(Integer, default=1, nullable=False)
+
+    item_metadata = Column("metadata", JSON, default=dict, nullable=False)
+
+    created_by = Column(Integer, nullable=True)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False, index=True)
+
+    # BIGSERIAL preenchido pelo banco (cursor da sincronização entre workers;
+    # created_at vem da aplicação e não serve para isso)
+    seq = Column(BigInteger, server_default=FetchedValue(), unique=True)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "title": self.title,
+            "content": self.content,
+            "content_type": self.content_type,
+            "category": self.category,
+            "tags": self.tags or [],
+            "source": self.source,
+            "source_url": self.source_url,
+            "language": self.language,
+            "priority": self.priority,
+            "knowledge_base_id": self.knowledge_base_id,
+            "metadata": self.item_metadata or {},
+            "created_by": self.created_by,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+    def __repr__(self):
+        return f"<KnowledgeItem id={self.id} kb={self.knowledge_base_id}>"
@@ -1,6 +1,6 @@
 #/e/MAWDSLEYS-AGENTE/backend/models/meeting.py << 'EOF'
 # backend/models/meeting.py
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database.base import Base
@@ -26,6 +26,13 @@ class Meeting(Base):
     # Relationships
     organizer = relationship("User", back_populates="organized_meetings")
     participants = relationship("MeetingParticipant", back_populates="meeting", cascade="all, delete-orphan")
+
+    # Contagens por status + próxima reunião do organizador numa só consulta
+    __table_args__ = (
+        Index("idx_meetings_organizer_status_time", "organizer_id", "status", "scheduled_time"),
+        # Paginação por cursor (scheduled_time, id)
+        Index("idx_meetings_scheduled_id", "scheduled_time", "id"),
+    )
     
     def __repr__(self):
         return f"<Meeting(id={self.id}, title='{self.title}', status='{self.status}')>"
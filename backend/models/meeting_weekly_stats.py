@@ -0,0 +1,37 @@
+# backend/models/meeting_weekly_stats.py
+from sqlalchemy import Column, Integer, String, Date, DateTime, Index
+from sqlalchemy.sql import func
+
+from database.session import Base
+
+
+class MeetingWeeklyStats(Base):
+    """
+    Reuniões por usuário e semana (segunda-feira), atualizadas pelo
+    handler de eventos meeting.* na entrega do EventBus/outbox.
+    Substitui a contagem sobre activity_logs a cada request.
+    """
+    __tablename__ = "meeting_weekly_stats"
+
+    user_id = Column(Integer, primary_key=True)
+    week_start = Column(Date, primary_key=True)
+    total_meetings = Column(Integer, default=0, nullable=False)
+    meetings_started = Column(Integer, default=0, nullable=False)
+    meetings_completed = Column(Integer, default=0, nullable=False)
+    meetings_cancelled = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("idx_meeting_weekly_stats_week", "week_start"),
+    )
+
+    def __repr__(self):
+        return f"<MeetingWeeklyStats(user_id={self.user_id}, week_start={self.week_start}, total={self.total_meetings})>"
+
+
+class MeetingStatsEvent(Base):
+    """Eventos já contados (a entrega é pelo menos uma vez: evita contar duas vezes)"""
+    __tablename__ = "meeting_weekly_stats_events"
+
+    event_id = Column(String(50), primary_key=True)
+    week_start = Column(Date, nullable=False, index=True)
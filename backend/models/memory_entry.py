@@ -0,0 +1,42 @@
+# backend/models/memory_entry.py
+from sqlalchemy import (
+    Column,
+    String,
+    Text,
+    DateTime,
+    JSON,
+    LargeBinary,
+    Index,
+)
+from sqlalchemy.sql import func
+
+from database.session import Base
+
+
+class MemoryEntry(Base):
+    """
+    Memória do agente por usuário (chat, follow-ups, automações).
+    O embedding (float32 em bytes) é gerado depois da gravação e alimenta
+    o índice vetorial por usuário do MemoryStore.
+    """
+    __tablename__ = "memory_entries"
+
+    id = Column(String(50), primary_key=True)
+    user_id = Column(String(50), nullable=False)
+    entity_type = Column(String(100), nullable=False)
+    entity_id = Column(String(100), nullable=False)
+    content = Column(Text, nullable=False)
+
+    # "metadata" é reservado no SQLAlchemy declarativo
+    entry_metadata = Column("metadata", JSON, nullable=True)
+
+    embedding = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("idx_memory_user_created", "user_id", "created_at"),
+    )
+
+    def __repr__(self):
+        return f"<MemoryEntry(id={self.id}, user_id={self.user_id}, entity_type={self.entity_type})>"
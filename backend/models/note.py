@@ -13,6 +13,8 @@ class Note(Base):
     title = Column(String(200), nullable=True)
     capture_id = Column(Integer, ForeignKey("captures.id"), nullable=False, index=True, unique=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    # Ritual de origem (definido na ingestão); follow-ups herdam pela nota
+    ritual_id = Column(Integer, ForeignKey("rituals.id"), nullable=True, index=True)
     note_type = Column(String(50), default="general", nullable=False)
     priority = Column(String(20), default="medium", nullable=False)
     status = Column(String(20), default="draft", nullable=False)
@@ -38,6 +40,7 @@ class Note(Base):
             "priority": self.priority,
             "capture_id": self.capture_id,
             "user_id": self.user_id,
+            "ritual_id": self.ritual_id,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
             "published_at": self.published_at.isoformat() if self.published_at else None,
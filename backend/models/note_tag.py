@@ -1,6 +1,5 @@
 # backend/models/note_tag.py
 from sqlalchemy import Column, Integer, ForeignKey
-from sqlalchemy.orm import relationship
 from database.session import Base  # ⚠️ MESMO BASE DOS OUTROS MODELS
 
 class NoteTag(Base):
@@ -25,22 +24,10 @@ class NoteTag(Base):
         index=True
     )
     
-    # =========================
-    # RELACIONAMENTOS
-    # =========================
-    
-    # Relação com Note
-    note = relationship(
-        "Note",
-        back_populates="note_tags"  # Adicione no modelo Note
-    )
-    
-    # Relação com Tag
-    tag = relationship(
-        "Tag",
-        back_populates="note_tags"  # Adicione no modelo Tag
-    )
-    
+    # Sem relationship(): Note não declara relacionamentos (models/note.py)
+    # e Tag está no registry do database.base, que este Base não enxerga;
+    # o back_populates quebrava o configure de todos os mappers
+
     # =========================
     # MÉTODOS
     # =========================
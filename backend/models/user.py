@@ -1,7 +1,8 @@
 # backend/models/user.py - VERSÃO MÍNIMA SEM RELAÇÕES
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, event
 from sqlalchemy.sql import func
 from database.session import Base
+from security.auth_cache import auth_cache
 
 class User(Base):
     __tablename__ = "users"
@@ -24,3 +25,11 @@ class User(Base):
 
     def __repr__(self) -> str:
         return f"<User id={self.id} email={self.email}>"
+
+
+# Usuário alterado/desativado/removido: tokens dele saem do cache de autenticação
+# (UPDATE em massa via query.update() não passa por aqui; vale o TTL do cache)
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_auth_cache(mapper, connection, target):
+    auth_cache.invalidate_user(target.id)
@@ -0,0 +1,159 @@
+# backend/security/auth_cache.py
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+# Validade de um usuário autenticado em cache (limita a defasagem entre workers)
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "60"))
+
+# Tokens recusados (inválidos, expirados, usuário inativo) ficam menos tempo
+AUTH_NEGATIVE_TTL = float(os.getenv("AUTH_NEGATIVE_TTL", "30"))
+
+AUTH_CACHE_MAX = int(os.getenv("AUTH_CACHE_MAX", "10000"))
+
+# Recusas têm LRU próprio: uma rajada de tokens inválidos não expulsa
+# os usuários autenticados
+AUTH_NEGATIVE_MAX = int(os.getenv("AUTH_NEGATIVE_MAX", "2000"))
+
+
+def token_key(token: str) -> str:
+    """O token em si não fica na memória do cache, só o hash"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class _Entry:
+    __slots__ = ("expires_at", "principal", "error", "user_id")
+
+    def __init__(self, expires_at: float, principal: Optional[Dict[str, Any]],
+                 error: Optional[str], user_id: Optional[str]):
+        self.expires_at = expires_at
+        self.principal = principal
+        self.error = error
+        self.user_id = user_id
+
+
+class AuthCache:
+    """
+    Cache TTL + LRU de autenticação: hash do token -> usuário autenticado
+    (ou o motivo da recusa).
+
+    - Acerto: nenhuma decodificação de JWT nem consulta ao banco
+    - Entrada positiva nunca passa do `exp` do próprio token
+    - Recusas ficam num LRU separado (`max_negative`), sem disputar
+      espaço com os usuários autenticados
+    - invalidate_user() derruba todos os tokens de um usuário (alterado,
+      desativado, removido); ligado aos eventos do ORM em models.user
+    """
+
+    def __init__(self, ttl: float = AUTH_CACHE_TTL, negative_ttl: float = AUTH_NEGATIVE_TTL,
+                 max_entries: int = AUTH_CACHE_MAX, max_negative: int = AUTH_NEGATIVE_MAX):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.max_negative = max_negative
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._negative: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._by_user: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "entries": len(self._entries),
+            "negative_entries": len(self._negative),
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+    # =========================
+    # LEITURA
+    # =========================
+    def get(self, token: str) -> Tuple[bool, Optional[Dict[str, Any]], Optional[str]]:
+        """(encontrado, usuário, erro): usuário None + erro = recusa em cache"""
+        key = token_key(token)
+        now = time.monotonic()
+        with self._lock:
+            entries = self._entries if key in self._entries else self._negative
+            entry = entries.get(key)
+            if entry is None or entry.expires_at <= now:
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return False, None, None
+            entries.move_to_end(key)
+            if entry.principal is None:
+                self.negative_hits += 1
+                return True, None, entry.error
+            self.hits += 1
+            return True, dict(entry.principal), None
+
+    # =========================
+    # ESCRITA
+    # =========================
+    def put(self, token: str, principal: Dict[str, Any], exp: Optional[float] = None):
+        ttl = self.ttl
+        if exp is not None:
+            ttl = min(ttl, exp - time.time())
+        if ttl <= 0:
+            return
+        cached = {k: v for k, v in principal.items() if k != "token"}
+        self._store(token, _Entry(time.monotonic() + ttl, cached, None, str(principal["user_id"])))
+
+    def put_negative(self, token: str, error: str, user_id: Optional[str] = None):
+        self._store(token, _Entry(time.monotonic() + self.negative_ttl, None, error,
+                                  str(user_id) if user_id is not None else None))
+
+    def _store(self, token: str, entry: _Entry):
+        key = token_key(token)
+        if entry.principal is None:
+            entries, limit = self._negative, self.max_negative
+        else:
+            entries, limit = self._entries, self.max_entries
+        with self._lock:
+            self._remove(key)
+            entries[key] = entry
+            if entry.user_id is not None:
+                self._by_user.setdefault(entry.user_id, set()).add(key)
+            while len(entries) > limit:
+                self._remove(next(iter(entries)))
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None) or self._negative.pop(key, None)
+        if entry is not None and entry.user_id is not None:
+            keys = self._by_user.get(entry.user_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_user[entry.user_id]
+
+    # =========================
+    # INVALIDAÇÃO
+    # =========================
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for key in list(self._by_user.get(str(user_id), ())):
+                self._remove(key)
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._negative.clear()
+            self._by_user.clear()
+
+
+# Instância compartilhada pelo processo
+auth_cache = AuthCache()
+
+
+def get_auth_cache() -> AuthCache:
+    return auth_cache
@@ -11,15 +11,20 @@ from models.note import Note
 from models.followup import FollowUp
 from models.tag import Tag
 from models.ritual import Ritual
-from models.person import Person
 from models.note_tag import NoteTag
 
+# EVENTOS (outbox na mesma transação)
+from core.events.activity_log import ActivityEvent
+from db.repositories.outbox_repository import stage_event
+from db.repositories.followup_stats_repository import record_followups
 
 
-def process_ingest(db: Session, raw_text: str, source: str = "api"):
+
+def process_ingest(db: Session, raw_text: str, user_id: int, source: str = "api"):
     """
     Pipeline completo de ingestão:
     raw_text -> capture -> note -> tags -> followups
+    (tudo em nome de `user_id`, o usuário autenticado que enviou o texto)
     """
 
     try:
@@ -37,6 +42,7 @@ def process_ingest(db: Session, raw_text: str, source: str = "api"):
         capture = Capture(
             source=source,
             raw_text=raw_text,
+            user_id=user_id,
             summary=analysis.get("summary"),
             processed=False,
         )
@@ -58,6 +64,7 @@ def process_ingest(db: Session, raw_text: str, source: str = "api"):
         # =====================================================
         note = Note(
             capture_id=capture.id,
+            user_id=user_id,
             ritual_id=ritual.id if ritual else None,
             content=analysis.get("summary") or raw_text,
         )
@@ -77,33 +84,46 @@ def process_ingest(db: Session, raw_text: str, source: str = "api"):
         # =====================================================
         # 6. FOLLOW-UPS
         # =====================================================
-        followups_created = 0
+        followups = []
 
         for fu in analysis.get("followups", []):
-            owner = None
+            # followups não tem coluna de responsável: o nome vai no título
             owner_name = fu.get("owner")
 
-            if owner_name:
-                owner = db.query(Person).filter(
-                    Person.name.ilike(owner_name)
-                ).first()
-
             followup = FollowUp(
+                user_id=user_id,
+                note_id=note.id,  # ritual vem da nota
+                title=f"Responsável: {owner_name}" if owner_name else None,
                 description=fu.get("description"),
-                owner_id=owner.id if owner else None,
-                ritual_id=ritual.id if ritual else None,
-                source_note_id=note.id,
                 due_date=date.today() + timedelta(days=7),
                 status="ABERTO",
             )
             db.add(followup)
-            followups_created += 1
+            followups.append(followup)
             print("📌 Follow-up criado")
 
+        # Resumo do dashboard atualizado na mesma transação
+        followups_created = len(followups)
+        record_followups(db, followups)
+
         # =====================================================
         # 7. FINALIZA
         # =====================================================
         capture.processed = True
+
+        # Evento vai no mesmo commit do ingest (o OutboxRelay entrega)
+        stage_event(db, ActivityEvent(
+            type="ingest.processed",
+            entity="capture",
+            entity_id=str(capture.id),
+            actor=source,
+            payload={
+                "note_id": note.id,
+                "ritual": ritual.code if ritual else None,
+                "followups_created": followups_created,
+                "source": source,
+            },
+        ))
         db.commit()
 
         print("✅ Ingest finalizado com sucesso")
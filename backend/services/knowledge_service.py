@@ -0,0 +1,507 @@
+# backend/services/knowledge_service.py
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from core.search.bm25_index import BM25Index
+from core.search.hybrid import reciprocal_rank_fusion
+
+# Motor de embeddings é opcional: sem ele a busca fica só lexical (BM25)
+from ai_engine import AI_ENGINE_DIR
+
+try:
+    from ai_engine.embeddings.embedding_loader import embed_query, generate_embeddings
+    from ai_engine.embeddings.vector_store import EmbeddingStore
+    VECTOR_SEARCH_AVAILABLE = True
+except Exception as e:
+    print(f"⚠️ [Knowledge] Busca vetorial indisponível: {e}")
+    VECTOR_SEARCH_AVAILABLE = False
+
+# Mesmo divisor de trechos dos embeddings de documentos (ai-engine)
+try:
+    from ai_engine.embeddings.chunker import split_text
+except Exception as e:
+    print(f"⚠️ [Knowledge] Divisão de conteúdos longos indisponível: {e}")
+    split_text = None
+
+# Intervalo para puxar do banco itens criados por outros workers
+SYNC_SECONDS = float(os.getenv("KNOWLEDGE_SYNC_SECONDS", "30"))
+
+# Intervalo da conferência completa de ids (itens que o cursor não pegou)
+RECONCILE_SECONDS = float(os.getenv("KNOWLEDGE_RECONCILE_SECONDS", "300"))
+
+# Embeddings dos itens (store binário append-only do ai-engine)
+EMBED_STORE_PATH = os.path.join(AI_ENGINE_DIR, "embeddings",
+                                os.getenv("KNOWLEDGE_EMBED_STORE", "knowledge_store"))
+
+# Candidatos de cada ranking (BM25 e vetorial) antes da fusão
+HYBRID_DEPTH = int(os.getenv("KNOWLEDGE_HYBRID_DEPTH", "50"))
+
+# Conteúdo acima deste tamanho (tokens estimados) vira vários itens na ingestão em lote
+CHUNK_TOKENS = int(os.getenv("KNOWLEDGE_CHUNK_TOKENS", "1000"))
+
+
+# ==========================
+# DADOS DE EXEMPLO (banco indisponível em desenvolvimento)
+# ==========================
+SEED_BASES = [
+    {
+        "id": "kb_001",
+        "name": "Manual do Produto X",
+        "description": "Documentação completa do produto X",
+        "category": "Produtos",
+        "tags": ["produto", "manual", "documentação"],
+        "is_public": True,
+        "item_count": 2,
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow(),
+        "created_by": 1
+    },
+    {
+        "id": "kb_002",
+        "name": "FAQ Suporte",
+        "description": "Perguntas frequentes de suporte",
+        "category": "Suporte",
+        "tags": ["faq", "suporte", "ajuda"],
+        "is_public": True,
+        "item_count": 1,
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow(),
+        "created_by": 2
+    }
+]
+
+SEED_ITEMS = [
+    {
+        "id": "ki_001",
+        "title": "Como instalar o produto X",
+        "content": "Passo 1: Desembale o produto. Passo 2: Conecte na energia. Passo 3: Siga o assistente de configuração.",
+        "content_type": "text",
+        "category": "Instalação",
+        "tags": ["instalação", "setup", "início"],
+        "source": "Manual do Fabricante",
+        "source_url": "https://exemplo.com/manual",
+        "language": "pt-BR",
+        "priority": 1,
+        "knowledge_base_id": "kb_001",
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow(),
+        "created_by": 1
+    },
+    {
+        "id": "ki_002",
+        "title": "Solução para erro 'Dispositivo não encontrado'",
+        "content": "1. Verifique a conexão USB. 2. Reinicie o computador. 3. Atualize os drivers.",
+        "content_type": "text",
+        "category": "Troubleshooting",
+        "tags": ["erro", "suporte", "solução"],
+        "source": "Base de Conhecimento Interna",
+        "source_url": None,
+        "language": "pt-BR",
+        "priority": 2,
+        "knowledge_base_id": "kb_002",
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow(),
+        "created_by": 2
+    },
+    {
+        "id": "ki_003",
+        "title": "Configuração de rede avançada",
+        "content": "Para configurar rede avançada, acesse Configurações > Rede > Avançado.",
+        "content_type": "text",
+        "category": "Configuração",
+        "tags": ["rede", "configuração", "avançado"],
+        "source": None,
+        "source_url": None,
+        "language": "pt-BR",
+        "priority": 3,
+        "knowledge_base_id": "kb_001",
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow(),
+        "created_by": 1
+    }
+]
+
+
+class KnowledgeService:
+    """
+    Base de conhecimento persistida (knowledge_bases / knowledge_items)
+    com cache em memória, índice invertido BM25 e índice vetorial,
+    ambos atualizados a cada inserção.
+
+    - O banco é a fonte da verdade; o processo carrega tudo uma vez e
+      depois só puxa itens novos (seq > maior seq lido do banco)
+    - seq é atribuído no INSERT, não no commit: uma transação longa pode
+      confirmar um seq menor depois do cursor passar dele. A cada
+      RECONCILE_SECONDS a lista de ids do banco é conferida e os que
+      faltam são carregados
+    - Sem banco (desenvolvimento), usa os dados de exemplo em memória
+    """
+
+    _knowledge_bases: List[Dict] = []
+    _knowledge_items: List[Dict] = []
+    _bases_by_id: Dict[str, Dict] = {}
+    _items_by_id: Dict[str, Dict] = {}
+    _index = BM25Index()
+
+    # Índice vetorial: linha do VectorIndex por item
+    _store = None
+    _vectors = None
+    _vector_rows: Dict[str, int] = {}
+    _executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="knowledge-search")
+
+    _lock = threading.RLock()
+    _loaded = False
+    _persistent = False
+    _last_sync = 0.0
+    _last_reconcile = 0.0
+    # Só avança com linhas lidas do banco (gravações locais não mexem)
+    _last_seq: Optional[int] = None
+
+    # ==========================
+    # CARGA / SINCRONIZAÇÃO
+    # ==========================
+    @classmethod
+    def _ensure_loaded(cls):
+        if cls._loaded and (not cls._persistent or time.monotonic() - cls._last_sync < SYNC_SECONDS):
+            return
+
+        with cls._lock:
+            if not cls._loaded:
+                cls._load()
+            elif cls._persistent and time.monotonic() - cls._last_sync >= SYNC_SECONDS:
+                cls._sync()
+
+    @classmethod
+    def _load(cls):
+        try:
+            from database.session import db_session
+            from db.repositories.knowledge_repository import KnowledgeRepository
+
+            with db_session(commit=False) as db:
+                repo = KnowledgeRepository(db)
+                bases = [kb.to_dict() for kb in repo.list_bases()]
+                rows = repo.list_items()
+                items = [item.to_dict() for item in rows]
+            cls._advance_cursor(rows)
+            cls._persistent = True
+            print(f"📚 [Knowledge] {len(bases)} bases / {len(items)} itens carregados do banco")
+        except Exception as e:
+            print(f"⚠️ [Knowledge] Banco indisponível, usando dados de exemplo: {e}")
+            bases = [dict(kb) for kb in SEED_BASES]
+            items = [dict(item) for item in SEED_ITEMS]
+            cls._persistent = False
+
+        cls._knowledge_bases.clear()
+        cls._knowledge_items.clear()
+        cls._bases_by_id.clear()
+        cls._items_by_id.clear()
+        cls._index = BM25Index()
+
+        for kb in bases:
+            cls._remember_base(kb)
+        for item in items:
+            cls._remember_item(item)
+
+        cls._load_vectors(items)
+
+        cls._loaded = True
+        cls._last_sync = cls._last_reconcile = time.monotonic()
+
+    @classmethod
+    def _sync(cls):
+        """Puxa apenas o que outros workers gravaram desde a última sincronização."""
+        reconcile = time.monotonic() - cls._last_reconcile >= RECONCILE_SECONDS
+        try:
+            from database.session import db_session
+            from db.repositories.knowledge_repository import KnowledgeRepository
+
+            with db_session(commit=False) as db:
+                repo = KnowledgeRepository(db)
+                bases = [kb.to_dict() for kb in repo.list_bases()]
+                rows = repo.list_items(after_seq=cls._last_seq)
+                if reconcile:
+                    seen = {row.id for row in rows}
+                    missing = repo.list_item_ids() - cls._items_by_id.keys() - seen
+                    rows += repo.get_items(missing)
+                items = [item.to_dict() for item in rows]
+            cls._advance_cursor(rows)
+            if reconcile:
+                cls._last_reconcile = time.monotonic()
+        except Exception as e:
+            print(f"⚠️ [Knowledge] Falha ao sincronizar: {e}")
+            cls._last_sync = time.monotonic()
+            return
+
+        for kb in bases:
+            if kb["id"] in cls._bases_by_id:
+                cls._bases_by_id[kb["id"]].update(kb)
+            else:
+                cls._remember_base(kb)
+        new_items = [item for item in items if item["id"] not in cls._items_by_id]
+        for item in new_items:
+            cls._remember_item(item)
+
+        if new_items:
+            # Outros workers já gravaram os embeddings no store: recarrega
+            cls._load_vectors(new_items)
+
+        cls._last_sync = time.monotonic()
+
+    @classmethod
+    def _advance_cursor(cls, rows):
+        seqs = [row.seq for row in rows if row.seq is not None]
+        if seqs and (cls._last_seq is None or max(seqs) > cls._last_seq):
+            cls._last_seq = max(seqs)
+
+    @classmethod
+    def _remember_base(cls, kb: Dict):
+        cls._knowledge_bases.append(kb)
+        cls._bases_by_id[kb["id"]] = kb
+
+    @classmethod
+    def _remember_item(cls, item: Dict):
+        cls._knowledge_items.append(item)
+        cls._items_by_id[item["id"]] = item
+        cls._index.add(
+            item["id"],
+            title=item.get("title", ""),
+            content=item.get("content", ""),
+            tags=item.get("tags") or [],
+            category=item.get("category"),
+            language=item.get("language"),
+        )
+
+    @classmethod
+    def _load_vectors(cls, items: List[Dict]):
+        """Carrega o store de embeddings e gera só os dos itens que faltam."""
+        if not VECTOR_SEARCH_AVAILABLE:
+            return
+        try:
+            store = cls._store or EmbeddingStore(EMBED_STORE_PATH)
+            vectors = store.load_index()
+            cls._store = store
+            cls._vectors = vectors
+            cls._vector_rows = {doc["id"]: row for row, doc in enumerate(vectors.docs)}
+        except Exception as e:
+            print(f"⚠️ [Knowledge] Falha ao carregar embeddings: {e}")
+            cls._vectors = None
+            return
+
+        missing = [item for item in items if item["id"] not in cls._vector_rows]
+        if missing:
+            print(f"📚 [Knowledge] Gerando embeddings de {len(missing)} itens")
+            cls._embed_items(missing)
+
+    @classmethod
+    def _embed_items(cls, items: List[Dict]):
+        if cls._vectors is None or not items:
+            return
+        try:
+            embeddings = generate_embeddings([f"{i['title']}\n{i['content']}" for i in items])
+            with cls._lock:
+                cls._store.append_many([
+                    {"id": item["id"], "embedding": embedding}
+                    for item, embedding in zip(items, embeddings)
+                ])
+                for item, embedding in zip(items, embeddings):
+                    cls._vector_rows[item["id"]] = len(cls._vectors)
+                    cls._vectors.add({"id": item["id"]}, embedding)
+        except Exception as e:
+            # Itens continuam buscáveis pelo BM25
+            print(f"⚠️ [Knowledge] Falha ao gerar embeddings: {e}")
+
+    # ==========================
+    # ESCRITA
+    # ==========================
+    @classmethod
+    def add_base(cls, kb: Dict, db=None) -> Dict:
+        cls._ensure_loaded()
+        with cls._lock:
+            if db is not None and cls._persistent:
+                from db.repositories.knowledge_repository import KnowledgeRepository
+                KnowledgeRepository(db).add_base(kb)
+            cls._remember_base(kb)
+        return kb
+
+    @classmethod
+    def add_items(cls, kb: Dict, items: List[Dict], db=None, count: Optional[int] = None) -> int:
+        """
+        Persiste os itens, indexa incrementalmente e incrementa item_count
+        (O(len(items)), sem recontar a base). `count` = itens de origem
+        quando `items` traz as partes de conteúdos divididos.
+        """
+        if count is None:
+            count = len(items)
+        cls._ensure_loaded()
+        if cls._persistent:
+            from db.repositories.knowledge_repository import KnowledgeRepository
+            if db is not None:
+                KnowledgeRepository(db).add_items(kb["id"], items, count)
+            else:
+                # Ingestão em streaming: uma transação por lote
+                from database.session import db_session
+                with db_session() as session:
+                    KnowledgeRepository(session).add_items(kb["id"], items, count)
+
+        with cls._lock:
+            for item in items:
+                cls._remember_item(item)
+
+            kb["item_count"] = kb.get("item_count", 0) + count
+            kb["updated_at"] = datetime.utcnow()
+
+        # Fora do lock: a chamada ao provedor não bloqueia as buscas
+        cls._embed_items(items)
+        return len(items)
+
+    @staticmethod
+    def split_item(item: Dict, max_tokens: int = CHUNK_TOKENS) -> List[Dict]:
+        """
+        Divide um item de conteúdo longo em partes de até `max_tokens`
+        (chunker do ai-engine: frases/parágrafos com sobreposição). Cada
+        parte vira um item próprio com referência ao original em metadata.
+        """
+        if split_text is None:
+            return [item]
+        parts = split_text(item["content"], max_tokens=max_tokens)
+        if len(parts) <= 1:
+            return [item]
+
+        chunks = []
+        for i, part in enumerate(parts, 1):
+            chunk = dict(item)
+            chunk["id"] = f"{item['id']}_{i}"
+            chunk["title"] = f"{item['title'][:480]} ({i}/{len(parts)})"
+            chunk["content"] = part
+            chunk["metadata"] = {
+                **(item.get("metadata") or {}),
+                "parent_id": item["id"],
+                "chunk": i,
+                "chunks": len(parts),
+            }
+            chunks.append(chunk)
+        return chunks
+
+    # ==========================
+    # LEITURA
+    # ==========================
+    @classmethod
+    def list_bases(cls) -> List[Dict]:
+        cls._ensure_loaded()
+        return cls._knowledge_bases
+
+    @classmethod
+    def list_items(cls) -> List[Dict]:
+        cls._ensure_loaded()
+        return cls._knowledge_items
+
+    @classmethod
+    def vector_search_available(cls) -> bool:
+        cls._ensure_loaded()
+        return cls._vectors is not None
+
+    @classmethod
+    def search_knowledge(cls, query: str, limit: int = 10,
+                         threshold: Optional[float] = None, **filters) -> List[Dict]:
+        """
+        Busca híbrida: BM25 e vetorial em paralelo, fundidos por RRF.
+
+        Os filtros (category, tags, language) viram um conjunto de ids
+        permitidos ANTES da pontuação, aplicado nos dois índices.
+        `threshold` é a relevância mínima (0..1) do score fundido; os
+        candidatos vetoriais entram na fusão sem corte de cosseno.
+        """
+        cls._ensure_loaded()
+
+        categories = filters.get("category")
+        if isinstance(categories, str):
+            categories = [categories]
+
+        depth = max(limit, HYBRID_DEPTH)
+
+        with cls._lock:
+            allowed = cls._index.filter_ids(
+                categories=categories,
+                tags=filters.get("tags"),
+                language=filters.get("language"),
+            )
+            if allowed is not None and not allowed:
+                return []
+
+            rows = None
+            if allowed is not None and cls._vectors is not None:
+                rows = [cls._vector_rows[i] for i in allowed if i in cls._vector_rows]
+
+        semantic = None
+        if cls._vectors is not None and (rows is None or rows):
+            semantic = cls._executor.submit(cls._vector_search, query, depth, rows)
+
+        with cls._lock:
+            lexical = [doc_id for _, doc_id in cls._index.search(query, limit=depth, allowed=allowed)]
+
+        fused = reciprocal_rank_fusion(
+            [lexical, semantic.result() if semantic else []],
+            limit=limit,
+        )
+
+        results = []
+        for score, item_id in fused:
+            if threshold is not None and score < threshold:
+                break
+            item = cls._items_by_id.get(item_id)
+            if item is None:
+                continue
+            item_with_score = item.copy()
+            item_with_score["relevance_score"] = score
+            results.append(item_with_score)
+        return results
+
+    @classmethod
+    def _vector_search(cls, query: str, depth: int, rows) -> List[str]:
+        try:
+            query_embedding = embed_query(query)
+            with cls._lock:
+                hits = cls._vectors.search(query_embedding, top_k=depth, rows=rows)
+        except Exception as e:
+            print(f"⚠️ [Knowledge] Busca vetorial falhou: {e}")
+            return []
+        return [doc["id"] for _, doc in hits]
+
+    @classmethod
+    def chat_with_knowledge(cls, question: str, max_results: int = 5) -> Dict:
+        """Chat com base de conhecimento (resposta montada a partir da busca)"""
+        results = cls.search_knowledge(question, limit=max_results)
+
+        # Gera resposta baseada nos resultados
+        if results:
+            answer = f"Baseado na nossa base de conhecimento sobre '{question}':\n\n"
+            for i, result in enumerate(results[:3], 1):
+                answer += f"{i}. {result['title']}: {result['content'][:100]}...\n"
+            answer += "\nPara mais detalhes, consulte os itens completos."
+            confidence = 0.8
+        else:
+            answer = "Desculpe, não encontrei informações específicas sobre isso na base de conhecimento. Posso ajudar com outras questões?"
+            confidence = 0.2
+
+        return {
+            "answer": answer,
+            "sources": results,
+            "confidence": confidence
+        }
+
+    @classmethod
+    def get_knowledge_base(cls, kb_id: str) -> Optional[Dict]:
+        """Obtém uma base de conhecimento"""
+        cls._ensure_loaded()
+        return cls._bases_by_id.get(kb_id)
+
+    @classmethod
+    def get_knowledge_item(cls, item_id: str) -> Optional[Dict]:
+        """Obtém um item de conhecimento"""
+        cls._ensure_loaded()
+        return cls._items_by_id.get(item_id)
@@ -0,0 +1,71 @@
+# backend/tests/conftest.py
+#
+# Testes rodam com SQLite em memória (sem PostgreSQL):
+#   cd backend && python -m pytest -q tests
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "tests")
+# Embeddings determinísticos e sem cache em disco (nada de rede nem arquivos)
+os.environ.setdefault("EMBED_PROVIDER", "stub")
+os.environ.setdefault("EMBED_CACHE_PATH", "")
+
+import pytest  # noqa: E402
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+import models.capture  # noqa: E402,F401
+import models.event_outbox  # noqa: E402,F401
+import models.followup  # noqa: E402,F401
+import models.followup_stats  # noqa: E402,F401
+import models.meeting  # noqa: E402,F401
+import models.meeting_weekly_stats  # noqa: E402,F401
+import models.memory_entry  # noqa: E402,F401
+import models.note  # noqa: E402,F401
+import models.ritual  # noqa: E402,F401
+import db.models.activity_log  # noqa: E402,F401
+from benchmarks.orm_stubs import configure_user_stubs  # noqa: E402
+
+configure_user_stubs()
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+
+    # pysqlite: BEGIN/SAVEPOINT emitidos pelo SQLAlchemy, não pelo driver
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def create_tables(engine):
+    def create(*models):
+        for model in models:
+            model.__table__.create(engine)
+    return create
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
@@ -0,0 +1,31 @@
+# backend/tests/test_activity_log_readers.py
+
+from core.memory.memory_engine import MemoryEngine
+from core.memory.query_engine import QueryEngine
+from db.models.activity_log import ActivityLog
+
+
+def _logs(db, create_tables):
+    create_tables(ActivityLog)
+    db.add_all([
+        ActivityLog(user_id=1, action="meeting.created", type="meeting.created",
+                    payload={"title": "Comitê regulatório"}),
+        ActivityLog(user_id=1, action="kpi.updated", type="kpi.updated", payload={"area": "Vendas"}),
+    ])
+    db.commit()
+
+
+def test_memory_engine_reads_type_and_payload(db, create_tables):
+    _logs(db, create_tables)
+    memory = MemoryEngine(db)
+
+    assert [e.type for e in memory.search_events("regulat")] == ["meeting.created"]
+    assert [e.type for e in memory.search_events("kpi")] == ["kpi.updated"]
+    assert "| meeting |" in memory.format_for_llm(memory.recent_events())
+
+
+def test_query_engine_entity_is_the_type_domain(db, create_tables):
+    _logs(db, create_tables)
+    events = MemoryEngine(db).recent_events()
+
+    assert [e.type for e in QueryEngine(events).find_by_entity("kpi")] == ["kpi.updated"]
@@ -0,0 +1,25 @@
+# backend/tests/test_ai_engine_import.py
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("httpx")
+
+
+def test_vector_search_is_available_from_backend():
+    from core.memory import memory_store
+    from services import knowledge_service
+
+    assert knowledge_service.VECTOR_SEARCH_AVAILABLE
+    assert knowledge_service.split_text is not None
+    assert memory_store.VECTOR_SEARCH_AVAILABLE
+
+
+def test_ai_engine_files_do_not_depend_on_cwd(monkeypatch, tmp_path):
+    from ai_engine import AI_ENGINE_DIR
+    from ai_engine.embeddings import embedding_loader
+    from services import knowledge_service
+
+    monkeypatch.chdir(tmp_path)
+    assert embedding_loader.STORE_PATH.startswith(AI_ENGINE_DIR)
+    assert knowledge_service.EMBED_STORE_PATH.startswith(AI_ENGINE_DIR)
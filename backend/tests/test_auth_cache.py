@@ -0,0 +1,78 @@
+# backend/tests/test_auth_cache.py
+
+import time
+
+from models.user import User
+from security.auth_cache import AuthCache, auth_cache
+
+
+def _principal(user_id):
+    return {"user_id": user_id, "email": f"u{user_id}@mawdsleys.com", "authenticated": True, "token": "x"}
+
+
+def test_hit_returns_copy_without_token():
+    cache = AuthCache(ttl=60)
+    cache.put("tok-1", _principal(1))
+
+    found, principal, error = cache.get("tok-1")
+    assert found and error is None
+    assert principal["user_id"] == 1 and "token" not in principal
+
+    principal["user_id"] = 99
+    assert cache.get("tok-1")[1]["user_id"] == 1
+
+
+def test_entry_never_outlives_token_exp():
+    cache = AuthCache(ttl=60)
+    cache.put("expired", _principal(1), exp=time.time() - 1)
+    assert cache.get("expired") == (False, None, None)
+
+
+def test_negative_entry_and_expiry():
+    cache = AuthCache(ttl=60, negative_ttl=0.01)
+    cache.put_negative("bad", "Token inválido")
+    assert cache.get("bad") == (True, None, "Token inválido")
+    time.sleep(0.02)
+    assert cache.get("bad") == (False, None, None)
+
+
+def test_invalidate_user_drops_all_tokens():
+    cache = AuthCache(ttl=60)
+    cache.put("a", _principal(1))
+    cache.put("b", _principal(1))
+    cache.put("c", _principal(2))
+
+    cache.invalidate_user(1)
+
+    assert not cache.get("a")[0]
+    assert not cache.get("b")[0]
+    assert cache.get("c")[0]
+
+
+def test_user_update_invalidates_cache(db, create_tables):
+    create_tables(User)
+    user = User(name="Ana", email="ana@mawdsleys.com", password="x", is_active=True)
+    db.add(user)
+    db.commit()
+
+    auth_cache.clear()
+    auth_cache.put("ana-token", _principal(user.id))
+    assert auth_cache.get("ana-token")[0]
+
+    user.is_active = False
+    db.commit()
+
+    assert auth_cache.get("ana-token") == (False, None, None)
+
+
+def test_negative_entries_do_not_evict_principals():
+    cache = AuthCache(ttl=60, max_entries=2, max_negative=2)
+    cache.put("a", _principal(1))
+    cache.put("b", _principal(2))
+    for n in range(10):
+        cache.put_negative(f"bad-{n}", "Token inválido")
+
+    assert cache.get("a")[0] and cache.get("b")[0]
+    assert not cache.get("bad-0")[0]
+    assert cache.get("bad-9") == (True, None, "Token inválido")
+    assert cache.stats()["entries"] == 2 and cache.stats()["negative_entries"] == 2
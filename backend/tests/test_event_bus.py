@@ -0,0 +1,35 @@
+# backend/tests/test_event_bus.py
+
+import asyncio
+import threading
+
+from core.events.activity_log import ActivityEvent
+from core.events.event_bus import EventBus
+
+
+def test_deliveries_run_off_the_event_loop(session_factory):
+    threads = []
+
+    def sync_handler(event, db):
+        threads.append(("sync", threading.get_ident()))
+
+    async def async_handler(event, db):
+        threads.append(("async", threading.get_ident()))
+
+    bus = EventBus(workers=2, session_factory=session_factory)
+    bus.subscribe("meeting.*", sync_handler)
+    bus.subscribe("meeting.created", async_handler)
+
+    async def run():
+        loop_thread = threading.get_ident()
+        for n in range(3):
+            bus.publish(ActivityEvent(type="meeting.created", entity="meeting", entity_id=str(n),
+                                      actor="user_1", payload={}))
+        await bus.close()
+        return loop_thread
+
+    loop_thread = asyncio.run(run())
+
+    assert sorted(kind for kind, _ in threads) == ["async"] * 3 + ["sync"] * 3
+    assert all(ident != loop_thread for _, ident in threads)
+    assert bus.stats()["delivered"] == 3
@@ -0,0 +1,24 @@
+# backend/tests/test_event_processor.py
+
+import asyncio
+
+from core.automation import event_processor
+from core.events.activity_log import ActivityEvent
+
+
+def test_only_domain_events_become_memories(monkeypatch):
+    processed = []
+
+    async def process_event(self, event):
+        processed.append(event.type)
+
+    monkeypatch.setattr(event_processor.EventProcessor, "process_event", process_event)
+
+    http = ActivityEvent(type="api.get", entity="http_request", entity_id="GET:/meetings", actor="user_1",
+                         payload={"method": "GET", "path": "/meetings", "status_code": 200})
+    meeting = ActivityEvent(type="meeting.created", entity="meeting", entity_id="1", actor="user_1",
+                            payload={"title": "Daily"})
+    asyncio.run(event_processor.process_event_handler(http, db=None))
+    asyncio.run(event_processor.process_event_handler(meeting, db=None))
+
+    assert processed == ["meeting.created"]
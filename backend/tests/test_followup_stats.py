@@ -0,0 +1,67 @@
+# backend/tests/test_followup_stats.py
+
+from sqlalchemy import text
+
+from db.repositories.followup_stats_repository import FollowupStatsRepository, record_followups
+from db.repositories.kpi_repository import KPIRepository
+from models.followup import FollowUp
+from models.followup_stats import FollowupStats
+from models.note import Note
+from models.ritual import Ritual
+
+
+def _followup_tables(db, create_tables):
+    create_tables(Ritual, Note, FollowUp, FollowupStats)
+    db.add_all([Ritual(id=1, code="DAILY", name="Daily"), Ritual(id=2, code="WEEKLY", name="Weekly")])
+    db.add_all([
+        Note(id=1, content="daily", capture_id=1, user_id=1, ritual_id=1),
+        Note(id=2, content="sem ritual", capture_id=2, user_id=1),
+    ])
+    db.flush()
+
+
+def _followups(db, *note_ids):
+    followups = [FollowUp(user_id=1, note_id=n, description=f"fu {i}", status="ABERTO")
+                 for i, n in enumerate(note_ids)]
+    db.add_all(followups)
+    db.flush()
+    record_followups(db, followups)
+    db.commit()
+
+
+def test_followup_increments_accumulate_by_note_ritual(db, create_tables):
+    _followup_tables(db, create_tables)
+    _followups(db, 1, 1, 2)
+    _followups(db, 1)
+
+    totals = {(r.ritual_id, r.status): r.total for r in db.query(FollowupStats)}
+    assert totals == {(1, "ABERTO"): 3, (0, "ABERTO"): 1}
+
+    kpis = KPIRepository(db)
+    assert kpis.followup_status_counts() == {"ABERTO": 4}
+    assert kpis.followups_by_ritual() == [
+        {"ritual": "DAILY", "total_followups": 3},
+        {"ritual": "WEEKLY", "total_followups": 0},
+    ]
+
+
+def test_followups_by_ritual_without_summary_counts_through_notes(db, create_tables):
+    _followup_tables(db, create_tables)
+    db.add(FollowUp(user_id=1, note_id=1, description="fora da ingestão", status="ABERTO"))
+    db.commit()
+
+    assert KPIRepository(db).followups_by_ritual()[0] == {"ritual": "DAILY", "total_followups": 1}
+
+
+def test_followup_reconcile_fixes_drift(db, create_tables):
+    _followup_tables(db, create_tables)
+    _followups(db, 1, 1, 2)
+    # Status alterado fora da ingestão: o contador incremental não vê
+    db.execute(text("UPDATE followups SET status = 'CONCLUIDO' WHERE id = 1"))
+    db.commit()
+    assert KPIRepository(db).followup_status_counts() == {"ABERTO": 3}
+
+    FollowupStatsRepository(db).reconcile()
+    db.commit()
+
+    assert KPIRepository(db).followup_status_counts() == {"ABERTO": 2, "CONCLUIDO": 1}
@@ -0,0 +1,34 @@
+# backend/tests/test_ingest_service.py
+
+from models.capture import Capture
+from models.event_outbox import EventOutbox
+from models.followup import FollowUp
+from models.followup_stats import FollowupStats
+from models.note import Note
+from models.ritual import Ritual
+from services import ingest_service
+
+
+def test_ingest_creates_followups_and_counts_them(db, create_tables, monkeypatch):
+    create_tables(Ritual, Capture, Note, FollowUp, FollowupStats, EventOutbox)
+    db.add(Ritual(id=1, code="ONE_ON_ONE_ELSA", name="1:1 Elsa"))
+    db.commit()
+
+    monkeypatch.setattr(ingest_service, "analyze_text", lambda text: {
+        "summary": "Cobrar relatório",
+        "ritual_code": "ONE_ON_ONE_ELSA",
+        "tags": [],
+        "followups": [{"description": "Cobrar relatório", "owner": "Elsa"}, {"description": "Checar prazo"}],
+    })
+
+    result = ingest_service.process_ingest(db, "cobrar relatório com a Elsa", user_id=3)
+
+    assert result["ritual"] == "ONE_ON_ONE_ELSA" and result["followups_created"] == 2
+    followups = db.query(FollowUp).order_by(FollowUp.id).all()
+    assert [(f.user_id, f.status, f.title) for f in followups] == [
+        (3, "ABERTO", "Responsável: Elsa"), (3, "ABERTO", None),
+    ]
+    assert db.query(Note).one().ritual_id == 1
+    # Resumo incremental da ingestão, pelo ritual da nota
+    assert {(r.ritual_id, r.status): r.total for r in db.query(FollowupStats)} == {(1, "ABERTO"): 2}
+    assert db.query(EventOutbox).one().type == "ingest.processed"
@@ -0,0 +1,39 @@
+# backend/tests/test_knowledge_batch_stream.py
+
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.routes import knowledge
+from api.routes.auth import require_any_auth
+from services.knowledge_service import KnowledgeService
+
+
+def test_batch_stream_reports_the_stored_item_ids(monkeypatch):
+    stored = []
+    kb = {"id": "kb_1", "is_public": True, "created_by": 1, "item_count": 0}
+    monkeypatch.setattr(KnowledgeService, "get_knowledge_base", staticmethod(lambda kb_id: kb))
+    monkeypatch.setattr(KnowledgeService, "add_items",
+                        staticmethod(lambda kb, items, db=None, count=None: stored.extend(items)))
+    # Um item curto e um que o chunker divide
+    monkeypatch.setattr(KnowledgeService, "split_item", staticmethod(
+        lambda item: [item] if len(item["content"]) < 20
+        else [dict(item, id=f"{item['id']}_{i}") for i in (1, 2)]
+    ))
+
+    app = FastAPI()
+    app.include_router(knowledge.router)
+    app.dependency_overrides[require_any_auth] = lambda: {"user_id": 1}
+    body = "\n".join(json.dumps({"title": t, "content": c}) for t, c in
+                     (("curto", "pouco texto"), ("longo", "texto bem maior que o limite")))
+
+    response = TestClient(app).post("/knowledge/batch/stream?kb_id=kb_1", content=body,
+                                    headers={"content-type": "application/x-ndjson"})
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    short, long_, summary = lines
+    assert short["item_ids"] == [short["id"]]
+    assert long_["item_ids"] == [f"{long_['id']}_1", f"{long_['id']}_2"]
+    assert {i for line in (short, long_) for i in line["item_ids"]} == {item["id"] for item in stored}
+    assert summary["items_created"] == 2
@@ -0,0 +1,40 @@
+# backend/tests/test_meeting_queries.py
+
+from benchmarks.check_meeting_queries import BUDGETS, build_client, run
+from controllers.meeting import meeting_stats_cache
+
+
+def test_query_budgets_do_not_grow_with_meetings():
+    small = run(5)
+    large = run(200)
+    for name, budget in BUDGETS.items():
+        measured = [counts[name] for counts in (small, large) if name in counts]
+        assert measured, name
+        assert max(measured) <= budget, (name, measured)
+        assert len(set(measured)) == 1, (name, measured)
+
+
+def test_keyset_pages_match_full_listing():
+    client, _ = build_client(50)
+    meeting_stats_cache.clear()
+    full = [m["id"] for m in client.get("/meetings/?limit=100").json()]
+
+    seen = []
+    cursor = None
+    while True:
+        url = "/meetings/?limit=7" + (f"&cursor={cursor}" if cursor else "")
+        page = client.get(url)
+        assert page.status_code == 200
+        seen.extend(m["id"] for m in page.json())
+        cursor = page.headers.get("x-next-cursor")
+        if not cursor:
+            break
+
+    # Horários repetidos no conjunto: o desempate pelo id não pula nem repete
+    assert seen == full
+    assert len(seen) == 50
+
+
+def test_invalid_cursor_is_rejected():
+    client, _ = build_client(3)
+    assert client.get("/meetings/?cursor=nao-e-um-cursor").status_code == 400
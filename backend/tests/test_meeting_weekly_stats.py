@@ -0,0 +1,50 @@
+# backend/tests/test_meeting_weekly_stats.py
+
+from datetime import date, datetime
+
+from core.events.activity_log import ActivityEvent
+from db.repositories.meeting_stats_repository import MeetingStatsRepository, week_start
+from models.meeting_weekly_stats import MeetingStatsEvent, MeetingWeeklyStats
+
+
+def _meeting_event(type_, actor="user_7", event_id=None, when=datetime(2026, 3, 4, 10)):
+    return ActivityEvent(id=event_id, type=type_, entity="meeting", entity_id="1", actor=actor,
+                         timestamp=when, payload={})
+
+
+def test_meeting_stats_apply_is_idempotent_per_event(db, create_tables):
+    create_tables(MeetingWeeklyStats, MeetingStatsEvent)
+    repo = MeetingStatsRepository(db)
+
+    created = _meeting_event("meeting.created", event_id="evt_1")
+    assert repo.apply(created)
+    assert not repo.apply(created)  # reentrega do mesmo evento
+    assert repo.apply(_meeting_event("meeting.created", event_id="evt_2"))
+    assert repo.apply(_meeting_event("meeting.completed", event_id="evt_3"))
+    db.commit()
+
+    row = db.query(MeetingWeeklyStats).one()
+    assert (row.user_id, row.week_start) == (7, date(2026, 3, 2))
+    assert (row.total_meetings, row.meetings_completed, row.meetings_started) == (2, 1, 0)
+
+
+def test_meeting_stats_ignore_unknown_events_and_actors(db, create_tables):
+    create_tables(MeetingWeeklyStats, MeetingStatsEvent)
+    repo = MeetingStatsRepository(db)
+
+    assert not repo.apply(_meeting_event("meeting.updated"))
+    assert not repo.apply(_meeting_event("meeting.created", actor="system"))
+    assert db.query(MeetingWeeklyStats).count() == 0
+
+
+def test_week_start_is_monday():
+    assert week_start(datetime(2026, 3, 8, 23, 59)) == date(2026, 3, 2)
+    assert week_start(date(2026, 3, 9)) == date(2026, 3, 9)
+
+
+def test_event_ids_are_wide_enough_to_dedupe_on():
+    # meeting_stats_events deduplica pelo id do evento: 32 bits colidiam
+    ids = {ActivityEvent(type="meeting.created", entity="meeting", entity_id="1", actor="user_1",
+                         payload={}).id for _ in range(1000)}
+    assert len(ids) == 1000
+    assert all(len(i) == len("evt_") + 32 and len(i) <= MeetingStatsEvent.event_id.type.length for i in ids)
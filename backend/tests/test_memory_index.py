@@ -0,0 +1,54 @@
+# backend/tests/test_memory_index.py
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.events.activity_log import ActivityEvent
+from core.memory.memory_index import MemoryIndex, MemoryRecord
+
+
+def _loader(start, end):
+    """5 eventos por dia em [start, end)."""
+    records, day = [], start
+    while day < end:
+        midnight = datetime.combine(day, datetime.min.time())
+        records.extend(
+            MemoryRecord(f"{day}-{i}", "meeting.created", "meeting", "", "system",
+                         midnight + timedelta(hours=i), {"title": "alpha"})
+            for i in range(5)
+        )
+        day += timedelta(days=1)
+    return records
+
+
+def test_window_over_event_limit_is_complete():
+    index = MemoryIndex(max_days=10, max_events=20, loader=_loader)
+
+    # 50 eventos numa janela com limite de 20: nenhum dia da consulta sai
+    assert len(index.recent(days=10)) == 50
+    assert len(index.find_by_keyword("alpha", days=8)) == 40
+    assert index.stats()["days"] == 8
+
+
+def test_window_is_clipped_and_long_ranges_refused():
+    index = MemoryIndex(max_days=10, loader=_loader)
+    assert len(index.recent(days=30)) == 50
+
+    today = datetime.utcnow().date()
+    with pytest.raises(ValueError):
+        index.ensure_days(today - timedelta(days=20), today)
+
+
+def test_live_events_open_the_next_day_bucket():
+    index = MemoryIndex(max_days=10, loader=lambda start, end: [])
+    today = datetime.utcnow().date()
+    index.ensure_days(today, today)
+    # Simula a virada: o dia ao vivo era ontem
+    index._days[today - timedelta(days=1)] = index._days.pop(today)
+    index._live_day = today - timedelta(days=1)
+
+    event = ActivityEvent(type="followup.created", entity="followup", entity_id="1", actor="user_1",
+                          payload={"description": "ligar"})
+    assert index.add(event)
+    assert [r.id for r in index.find_by_entity("followup", days=1)] == [event.id]
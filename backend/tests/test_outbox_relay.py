@@ -0,0 +1,122 @@
+# backend/tests/test_outbox_relay.py
+
+import asyncio
+
+import pytest
+from sqlalchemy import func, text
+
+from core.automation.event_processor import register_event_handlers
+from core.events.activity_log import ActivityEvent
+from core.events.event_bus import EventBus, SavepointEscaped
+from core.events.outbox_relay import OutboxRelay
+from db.models.activity_log import ActivityLog
+from db.repositories.outbox_repository import OutboxRepository
+from models.event_outbox import EventOutbox
+from models.meeting_weekly_stats import MeetingStatsEvent, MeetingWeeklyStats
+from models.memory_entry import MemoryEntry
+
+
+@pytest.fixture
+def outbox(engine, create_tables):
+    create_tables(EventOutbox, ActivityLog)
+    # O que os handlers gravaram (na transação do relay)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE handled (event_id VARCHAR(50))"))
+
+
+def _event(n):
+    return ActivityEvent(type="meeting.created", entity="meeting", entity_id=str(n), actor=f"user_{n}",
+                         payload={"title": f"Reunião {n}"})
+
+
+def _stage(session_factory, events):
+    db = session_factory()
+    repo = OutboxRepository(db)
+    for event in events:
+        repo.add(event)
+    db.commit()
+    db.close()
+
+
+def _statuses(db):
+    return dict(db.query(EventOutbox.status, func.count()).group_by(EventOutbox.status).all())
+
+
+def test_drain_logs_and_delivers_batch(db, session_factory, outbox):
+    def handler(event, session):
+        session.execute(text("INSERT INTO handled (event_id) VALUES (:id)"), {"id": event.id})
+
+    bus = EventBus()
+    bus.subscribe("meeting.*", handler)
+    _stage(session_factory, [_event(n) for n in range(1, 4)])
+
+    relay = OutboxRelay(bus=bus, session_factory=session_factory)
+    assert asyncio.run(relay.drain_once()) == 3
+
+    assert _statuses(db) == {"done": 3}
+    assert db.query(ActivityLog).count() == 3
+    assert db.execute(text("SELECT COUNT(*) FROM handled")).scalar() == 3
+    db.rollback()
+    # Nada pendente: a próxima rodada não trava nenhuma linha
+    assert asyncio.run(relay.drain_once()) == 0
+
+
+def test_failed_handler_is_rescheduled_without_undoing_the_others(db, session_factory, outbox):
+    def ok(event, session):
+        session.execute(text("INSERT INTO handled (event_id) VALUES (:id)"), {"id": event.id})
+
+    def broken(event, session):
+        session.execute(text("INSERT INTO handled (event_id) VALUES ('descartado')"))
+        raise RuntimeError("falhou")
+
+    bus = EventBus()
+    bus.subscribe("meeting.*", ok)
+    bus.subscribe("meeting.*", broken)
+    _stage(session_factory, [_event(1)])
+
+    relay = OutboxRelay(bus=bus, session_factory=session_factory)
+    asyncio.run(relay.drain_once())
+
+    # Linha do evento concluída + uma linha nova só para o handler que falhou
+    rows = db.query(EventOutbox).order_by(EventOutbox.id).all()
+    assert [r.status for r in rows] == ["done", "pending"]
+    assert rows[1].handler.endswith("broken") and rows[1].attempts == 1 and rows[1].logged
+    # SAVEPOINT do handler que falhou desfeito; o do outro ficou
+    assert [r[0] for r in db.execute(text("SELECT event_id FROM handled"))] == [rows[0].event_id]
+    assert db.query(ActivityLog).count() == 1
+
+
+def test_handler_commit_aborts_the_batch(db, session_factory, outbox):
+    def committing(event, session):
+        session.commit()
+
+    bus = EventBus()
+    bus.subscribe("meeting.*", committing)
+    _stage(session_factory, [_event(1), _event(2)])
+
+    relay = OutboxRelay(bus=bus, session_factory=session_factory)
+    with pytest.raises(SavepointEscaped):
+        asyncio.run(relay.drain_once())
+
+    assert _statuses(db) == {"pending": 2}
+
+
+def test_meeting_completed_runs_all_registered_handlers(db, session_factory, outbox, create_tables):
+    create_tables(MemoryEntry, MeetingWeeklyStats, MeetingStatsEvent)
+    bus = EventBus()
+    register_event_handlers(bus)
+    _stage(session_factory, [ActivityEvent(type="meeting.completed", entity="meeting", entity_id="42",
+                                           actor="user_7", payload={"title": "Comitê", "organizer_id": 7})])
+
+    relay = OutboxRelay(bus=bus, session_factory=session_factory)
+    assert asyncio.run(relay.drain_once()) == 1
+
+    # Nenhum handler falhou: nada reagendado
+    assert _statuses(db) == {"done": 1}
+    # Reunião sem ata: alerta gravado como alert.created + follow-up na memória
+    alert = db.query(ActivityLog).filter(ActivityLog.type == "alert.created").one()
+    assert alert.payload["title"] == "Reunião concluída sem ata"
+    assert alert.payload["data"]["meeting_id"] == 42
+    types = {entry.entity_type for entry in db.query(MemoryEntry)}
+    assert {"follow_up_task", "automation_log", "meeting"} <= types
+    assert db.query(MeetingWeeklyStats).one().meetings_completed == 1